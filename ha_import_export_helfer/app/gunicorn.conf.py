@@ -0,0 +1,15 @@
+import os
+bind = '0.0.0.0:8099'
+workers = int(os.environ.get('SERVER_WORKERS', '2'))
+threads = int(os.environ.get('SERVER_THREADS', '4'))
+worker_class = 'gthread'
+timeout = 300
+graceful_timeout = 30
+def on_starting(server):
+    import main
+    main.reset_metrics_store()
+    main.recover_import_transactions()
+    main.recover_jobs()
+def post_worker_init(worker):
+    import main
+    main.start_worker_tasks()
@@ -1,35 +1,359 @@
 import os
+import sys
 import json
 import glob
 import zipfile
+import tarfile
+import zlib
+import gzip
+import shutil
 import io
 import time
 import threading
+import fcntl
+import select
+import struct
+import ctypes
+import ctypes.util
 import uuid
-from flask import Flask, jsonify, request, send_file, render_template
+import re
+import hashlib
+import sqlite3
+import bisect
+import tempfile
+import copy
+import fnmatch
+import multiprocessing
+import atexit
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import Flask, Response, g, jsonify, request, send_file, render_template, stream_with_context
 from ruamel.yaml import YAML
+from ruamel.yaml.constructor import SafeConstructor
+from ruamel.yaml.nodes import ScalarNode, SequenceNode
 import logging
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
 app = Flask(__name__)
 yaml = YAML()
 yaml.preserve_quotes = True
 yaml.width = 1024
+class HomeAssistantSafeConstructor(SafeConstructor):
+    def construct_home_assistant_tag(self, node):
+        if isinstance(node, ScalarNode):
+            return self.construct_scalar(node)
+        elif isinstance(node, SequenceNode):
+            return self.construct_sequence(node, deep=True)
+        return self.construct_mapping(node, deep=True)
+HomeAssistantSafeConstructor.add_constructor(None, HomeAssistantSafeConstructor.construct_home_assistant_tag)
+safe_yaml = YAML(typ='safe')
+safe_yaml.Constructor = HomeAssistantSafeConstructor
 logging.basicConfig(level=logging.INFO)
 gunicorn_logger = logging.getLogger('gunicorn.error')
 app.logger.handlers = gunicorn_logger.handlers
 app.logger.setLevel(logging.INFO)
-CONFIG_PATH = '/config'
+CONFIG_PATH = os.environ.get('IMPORT_EXPORT_CONFIG_PATH', '/config')
 STORAGE_PATH = os.path.join(CONFIG_PATH, '.storage')
+DATA_PATH = os.environ.get('IMPORT_EXPORT_DATA_PATH', '/data')
+OPTIONS_PATH = os.path.join(DATA_PATH, 'options.json')
+addon_options = None
+INVENTORY_INDEX_PATH = os.path.join(DATA_PATH, 'inventory_index.db')
+INVENTORY_INDEX_VERSION = 1
+INVENTORY_INDEX_LOCK = threading.Lock()
+inventory_index_db = None
+inventory_index_disabled = False
+INVENTORY_STATE_LOCK = threading.Lock()
+inventory_state = {'fingerprint': None, 'generation': 0, 'items': None, 'sources': None}
+INVENTORY_SECTIONS = ['yaml_files', 'legacy_helpers', 'config_entries', 'storage_files', 'yaml_lists', 'blueprints']
+INVENTORY_SNAPSHOT_LOCK = threading.Lock()
+inventory_snapshot = None
+inventory_watch_mode = None
+INVENTORY_WATCH_DEBOUNCE = 2.0
+INVENTORY_WATCH_MAX_DELAY = 10.0
+SCAN_PROCESS_POOL_LOCK = threading.Lock()
+scan_process_pool = None
+CONFIG_SCAN_EXCLUDES = ['custom_components', 'www', 'deps', 'tts', 'media', 'backups', 'image', 'node_modules', '__pycache__']
+CONFIG_SCAN_DEFAULT_MAX_DEPTH = 10
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+INOTIFY_WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MOVE_SELF
+INOTIFY_EVENT_SIZE = struct.calcsize('iIII')
+ENTITY_REGISTRY_PATH = os.path.join(STORAGE_PATH, 'core.entity_registry')
+DEVICE_REGISTRY_PATH = os.path.join(STORAGE_PATH, 'core.device_registry')
+ENTITY_REGISTRY_INDEX_LOCK = threading.Lock()
+entity_registry_index = None
+ITEM_SEARCH_INDEX_LOCK = threading.Lock()
+item_search_index = None
+ITEM_SORT_FIELDS = ['type', 'name', 'source', 'id']
+ITEMS_PAGE_DEFAULT_LIMIT = 100
+ITEMS_PAGE_MAX_LIMIT = 1000
+ITEMS_RESPONSE_LOCK = threading.Lock()
+items_response_cache = None
+ITEMS_RESPONSE_ENCODINGS = ['br', 'gzip']
+ITEMS_RESPONSE_MIN_COMPRESS = 1024
+JOBS_PATH = os.path.join(DATA_PATH, 'jobs')
+JOB_TTL_SECONDS = 6 * 60 * 60
+JOB_MAX_PENDING = 8
+JOB_PROGRESS_SAVE_INTERVAL = 1.0
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+JOBS_LOCK = threading.Lock()
+jobs = {}
+job_executor = None
+IMPORT_DONE_MESSAGE = "Import abgeschlossen. Bitte starten Sie Home Assistant neu."
+EXPORT_CHUNK_SIZE = 64 * 1024
+EXPORT_SPOOL_MAX_MEMORY = 16 * 1024 * 1024
+EXPORT_MODES = ['buffer', 'stream']
+EXPORT_FORMATS = {
+    'zip': {'extension': '.zip', 'mimetype': 'application/zip'},
+    'tar.zst': {'extension': '.tar.zst', 'mimetype': 'application/zstd'}
+}
+EXPORT_COMPRESSION_LEVELS = {'zip': (0, 9, 6), 'tar.zst': (1, 19, 3)}
+EXPORT_PARALLEL_MAX_ENTRY = 16 * 1024 * 1024
+EXPORT_PARALLEL_MAX_PENDING_BYTES = 32 * 1024 * 1024
+ZIP64_LIMIT = (1 << 31) - 1
+EXPORT_MANIFEST_VERSION = 2
+IMPORT_ARCHIVE_EXTENSIONS = ('.zip', '.tar.zst', '.tzst')
+ZSTD_FRAME_MAGIC = b'\x28\xb5\x2f\xfd'
+EXPORT_BASELINES_PATH = os.path.join(DATA_PATH, 'export_baselines')
+EXPORT_BASELINE_PATTERN = re.compile(r'^[a-z0-9_-]{1,32}$')
+EXPORT_DEFAULT_BASELINE = 'manual'
+SCHEDULED_BACKUP_BASELINE = 'scheduled'
+BACKUP_TARGET_PATHS = {'backup': '/backup', 'share': '/share'}
+BACKUP_SCHEDULER_CHECK_INTERVAL = 300
+BACKUP_ARCHIVE_PATTERN = re.compile(r'^Sicherung_\d{8}_\d{6}_(voll|inkrementell)\.(?:zip|tar\.zst)$')
+DOCUMENT_CACHE_KINDS = ['json', 'yaml', 'yaml_safe']
+YAML_SPLICE_ID_PATTERN = re.compile(r'^(?:- |  )id:(?:[ \t]+(.*?))?[ \t]*\r?$')
+YAML_SPLICE_ALIAS_PATTERN = re.compile(r'(?:^|[\s\[{,])\*[^\s,\[\]{}]')
+YAML_SPLICE_KEY_PATTERN = re.compile(r'''^("(?:[^"\\]|\\.)*"|'(?:[^']|'')*'|[^\s#'"?:\[\]{},&*!|>%@`-][^#]*?)[ \t]*:(?:[ \t]|\r?$)''')
+DOCUMENT_CACHE_LOCK = threading.Lock()
+document_cache = OrderedDict()
+document_cache_size = 0
+UPLOADS_PATH = os.path.join(DATA_PATH, 'uploads')
+IMPORT_DEFAULT_POLICY = {'new': 'skip', 'conflict': 'skip', 'unchanged': 'skip'}
+IMPORT_POLICY_ACTIONS = ['skip', 'overwrite']
+IMPORT_OVERRIDE_ACTIONS = ['skip', 'overwrite', 'rename']
+UPLOAD_SESSION_TTL_SECONDS = 2 * 60 * 60
+UPLOAD_SESSION_MEMORY_MAX_BYTES = 64 * 1024 * 1024
+UPLOAD_SESSION_ID_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+UPLOAD_SESSIONS_LOCK = threading.Lock()
+upload_sessions = OrderedDict()
+METRICS_LOCK = threading.Lock()
+METRICS_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+METRICS_DEFINITIONS = {
+    'ieh_http_request_duration_seconds': ('histogram', 'Latenz der HTTP-Endpunkte bis zum Ende der Antwort'),
+    'ieh_phase_duration_seconds': ('histogram', 'Dauer einzelner Verarbeitungsphasen'),
+    'ieh_file_lock_wait_seconds': ('histogram', 'Wartezeit beim Erwerb eines FILE_LOCKS'),
+    'ieh_file_lock_hold_seconds': ('histogram', 'Haltedauer eines FILE_LOCKS'),
+    'ieh_file_read_bytes_total': ('counter', 'Gelesene Bytes je Quelldatei'),
+    'ieh_file_written_bytes_total': ('counter', 'Geschriebene Bytes je Zieldatei'),
+    'ieh_items_processed_total': ('counter', 'Verarbeitete Elemente je Vorgang und Typ'),
+    'ieh_document_cache_requests_total': ('counter', 'Zugriffe auf den Cache geparster Dokumente')
+}
+metrics = {name: {} for name in METRICS_DEFINITIONS}
+METRICS_PATH = os.path.join(DATA_PATH, 'metrics')
+METRICS_FLUSH_INTERVAL = 15
+metrics_store = {'pid': None, 'name': None}
+def observe_metric(name, labels, value):
+    bucket = bisect.bisect_left(METRICS_BUCKETS, value)
+    with METRICS_LOCK:
+        histogram = metrics[name].get(labels)
+        if histogram is None:
+            histogram = metrics[name][labels] = [[0] * (len(METRICS_BUCKETS) + 1), 0.0, 0]
+        histogram[0][bucket] += 1
+        histogram[1] += value
+        histogram[2] += 1
+def inc_metric(name, labels, value=1):
+    with METRICS_LOCK:
+        metrics[name][labels] = metrics[name].get(labels, 0) + value
+def get_metric_file_label(filepath):
+    if filepath.startswith(JOBS_PATH + os.sep):
+        return 'data/jobs'
+    if filepath.startswith(CONFIG_PATH + os.sep):
+        return os.path.relpath(filepath, CONFIG_PATH)
+    if filepath.startswith(DATA_PATH + os.sep):
+        return f"data/{os.path.relpath(filepath, DATA_PATH)}"
+    return filepath
+def count_file_read(filepath, size):
+    inc_metric('ieh_file_read_bytes_total', (('file', get_metric_file_label(filepath)),), size)
+def count_file_written(filepath, size):
+    inc_metric('ieh_file_written_bytes_total', (('file', get_metric_file_label(filepath)),), size)
+def count_processed_items(operation, item_ids, extra_labels=None):
+    counts = {}
+    for n, item_id in enumerate(item_ids):
+        key = (('operation', operation), ('type', item_id.split('::', 1)[0]))
+        if extra_labels:
+            key += extra_labels[n]
+        counts[key] = counts.get(key, 0) + 1
+    for labels, value in counts.items():
+        inc_metric('ieh_items_processed_total', labels, value)
+class PhaseTimer:
+    def __init__(self, phase):
+        self.labels = (('phase', phase),)
+        self.started = None
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    def __exit__(self, exc_type, exc_value, traceback):
+        observe_metric('ieh_phase_duration_seconds', self.labels, time.perf_counter() - self.started)
+def iter_timed(phase, iterator):
+    busy = 0.0
+    iterator = iter(iterator)
+    while True:
+        started = time.perf_counter()
+        try:
+            value = next(iterator)
+        except StopIteration as stop:
+            observe_metric('ieh_phase_duration_seconds', (('phase', phase),), busy + time.perf_counter() - started)
+            return stop.value
+        busy += time.perf_counter() - started
+        yield value
+def format_metric_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = [(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for key, value in pairs]
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+def snapshot_metrics():
+    with METRICS_LOCK:
+        return {name: {labels: (value if not isinstance(value, list) else [list(value[0]), value[1], value[2]]) for labels, value in series.items()} for name, series in metrics.items()}
+def get_metrics_store_path():
+    if metrics_store['pid'] != os.getpid():
+        metrics_store['pid'] = os.getpid()
+        metrics_store['name'] = f"{os.getpid()}_{uuid.uuid4().hex[:8]}.json"
+    return os.path.join(METRICS_PATH, metrics_store['name'])
+def write_metrics_store(snapshot=None):
+    path = get_metrics_store_path()
+    data = {name: [[list(labels), value] for labels, value in series.items()] for name, series in (snapshot or snapshot_metrics()).items()}
+    os.makedirs(METRICS_PATH, exist_ok=True)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(f"{path}.tmp", path)
+def merge_metric_series(target, name, labels, value):
+    current = target[name].get(labels)
+    if current is None:
+        target[name][labels] = value
+    elif METRICS_DEFINITIONS[name][0] == 'counter':
+        target[name][labels] = current + value
+    else:
+        target[name][labels] = [[a + b for a, b in zip(current[0], value[0])], current[1] + value[1], current[2] + value[2]]
+def collect_metrics():
+    snapshot = snapshot_metrics()
+    try:
+        write_metrics_store(snapshot)
+    except OSError as e:
+        app.logger.warning(f"Kennzahlen konnten nicht gespeichert werden: {e}")
+    own_path = get_metrics_store_path()
+    for path in glob.glob(os.path.join(METRICS_PATH, '*.json')):
+        if path == own_path:
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            app.logger.warning(f"Kennzahlen aus {path} konnten nicht gelesen werden: {e}")
+            continue
+        for name, series in data.items():
+            if name in METRICS_DEFINITIONS:
+                for labels, value in series:
+                    merge_metric_series(snapshot, name, tuple(tuple(pair) for pair in labels), value)
+    return snapshot
+def run_metrics_flusher():
+    while True:
+        time.sleep(METRICS_FLUSH_INTERVAL)
+        try:
+            write_metrics_store()
+        except Exception as e:
+            app.logger.warning(f"Kennzahlen konnten nicht gespeichert werden: {e}")
+def start_metrics_flusher():
+    threading.Thread(target=run_metrics_flusher, name='metrics-flusher', daemon=True).start()
+    atexit.register(write_metrics_store)
+def reset_metrics_store():
+    shutil.rmtree(METRICS_PATH, ignore_errors=True)
+def render_metrics():
+    snapshot = collect_metrics()
+    lines = []
+    for name, (metric_type, help_text) in METRICS_DEFINITIONS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in sorted(snapshot[name].items()):
+            if metric_type == 'counter':
+                lines.append(f"{name}{format_metric_labels(labels)} {value}")
+                continue
+            bucket_counts, total, count = value
+            cumulative = 0
+            for bound, bucket_count in zip(METRICS_BUCKETS, bucket_counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{format_metric_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_bucket{format_metric_labels(labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{name}_sum{format_metric_labels(labels)} {total}")
+            lines.append(f"{name}_count{format_metric_labels(labels)} {count}")
+    return '\n'.join(lines) + '\n'
+LOCKS_PATH = os.path.join(DATA_PATH, 'locks')
+TRANSACTIONS_PATH = os.path.join(DATA_PATH, 'transactions')
+import_transaction_state = threading.local()
+class FileLock:
+    def __init__(self, name):
+        self.name = name
+        self.thread_lock = threading.Lock()
+        self.lock_file = None
+        self.labels = (('lock', name),)
+        self.acquired = None
+    def __enter__(self):
+        started = time.perf_counter()
+        self.thread_lock.acquire()
+        try:
+            os.makedirs(LOCKS_PATH, exist_ok=True)
+            self.lock_file = open(os.path.join(LOCKS_PATH, f"{self.name}.lock"), 'a')
+            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX)
+        except Exception:
+            if self.lock_file is not None:
+                self.lock_file.close()
+                self.lock_file = None
+            self.thread_lock.release()
+            raise
+        self.acquired = time.perf_counter()
+        observe_metric('ieh_file_lock_wait_seconds', self.labels, self.acquired - started)
+        return self
+    def __exit__(self, exc_type, exc_value, traceback):
+        observe_metric('ieh_file_lock_hold_seconds', self.labels, time.perf_counter() - self.acquired)
+        try:
+            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_UN)
+            self.lock_file.close()
+        finally:
+            self.lock_file = None
+            self.thread_lock.release()
 FILE_LOCKS = {
-    'core.entity_registry': threading.Lock(),
-    'core.config_entries': threading.Lock(),
-    'core.automation': threading.Lock(),
-    'core.script': threading.Lock(),
-    'core.scene': threading.Lock(),
-    'automations.yaml': threading.Lock(),
-    'scripts.yaml': threading.Lock(),
-    'scenes.yaml': threading.Lock(),
-    'generic_yaml': threading.Lock(),
-    'generic_helper': threading.Lock(),
+    'core.entity_registry': FileLock('core.entity_registry'),
+    'core.config_entries': FileLock('core.config_entries'),
+    'core.automation': FileLock('core.automation'),
+    'core.script': FileLock('core.script'),
+    'core.scene': FileLock('core.scene'),
+    'automations.yaml': FileLock('automations.yaml'),
+    'scripts.yaml': FileLock('scripts.yaml'),
+    'scenes.yaml': FileLock('scenes.yaml'),
+    'generic_yaml': FileLock('generic_yaml'),
+    'generic_helper': FileLock('generic_helper'),
+    'export_baselines': FileLock('export_baselines'),
+    'import_transaction': FileLock('import_transaction'),
 }
 HELPER_PLATFORMS = [
     'input_boolean', 'input_text', 'input_number', 'input_datetime', 
@@ -44,7 +368,7 @@ INTEGRATION_HELPER_PLATFORMS = [
 ]
 LEGACY_HELPER_PLATFORMS = [p for p in HELPER_PLATFORMS if p not in INTEGRATION_HELPER_PLATFORMS]
 for platform in LEGACY_HELPER_PLATFORMS:
-    FILE_LOCKS[platform] = threading.Lock()
+    FILE_LOCKS[platform] = FileLock(platform)
 STORAGE_FILES_MAP = {
     'Automation': {
         'file_key': 'core.automation',
@@ -76,23 +400,105 @@ YAML_LIST_MAP = {
         'name_key': 'name'
     }
 }
-def load_json(filepath):
+def json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+def json_dumps_bytes(data, mode='standard'):
+    if orjson is not None and mode in ('homeassistant', 'compact'):
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 if mode == 'homeassistant' else 0)
+        except TypeError:
+            pass
+    if mode == 'homeassistant':
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    elif mode == 'compact':
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, indent=4).encode('utf-8')
+def copy_document(data):
+    if type(data) is dict:
+        return {key: copy_document(value) for key, value in data.items()}
+    elif type(data) is list:
+        return [copy_document(value) for value in data]
+    elif isinstance(data, (dict, list)):
+        return copy.deepcopy(data)
+    return data
+def estimate_document_size(data):
+    size = 0
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        size += sys.getsizeof(value)
+        if isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return size
+def get_cached_document(filepath, kind, reader, readonly=False):
+    global document_cache_size
+    key = (filepath, kind)
+    signature = get_file_signature(filepath)
+    data = None
+    if signature is not None:
+        with DOCUMENT_CACHE_LOCK:
+            entry = document_cache.get(key)
+            if entry is not None and entry[0] == signature:
+                document_cache.move_to_end(key)
+                data = entry[1]
+    inc_metric('ieh_document_cache_requests_total', (('kind', kind), ('result', 'miss' if data is None else 'hit')))
+    if data is None:
+        data = reader(filepath)
+        max_bytes = int(get_addon_option('document_cache_mb', 16)) * 1024 * 1024
+        size = estimate_document_size(data) if data is not None and signature is not None and signature[1] <= max_bytes else None
+        if size is not None and size <= max_bytes and get_file_signature(filepath) == signature:
+            with DOCUMENT_CACHE_LOCK:
+                previous = document_cache.pop(key, None)
+                if previous is not None:
+                    document_cache_size -= previous[2]
+                document_cache[key] = (signature, data, size)
+                document_cache_size += size
+                while document_cache_size > max_bytes:
+                    _, (_, _, evicted_size) = document_cache.popitem(last=False)
+                    document_cache_size -= evicted_size
+    return data if readonly else copy_document(data)
+def invalidate_cached_document(filepath):
+    global document_cache_size
+    with DOCUMENT_CACHE_LOCK:
+        for kind in DOCUMENT_CACHE_KINDS:
+            entry = document_cache.pop((filepath, kind), None)
+            if entry is not None:
+                document_cache_size -= entry[2]
+def read_json_file(filepath):
     try:
         if os.path.exists(filepath):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(filepath, 'rb') as f:
+                raw = f.read()
+            count_file_read(filepath, len(raw))
+            with PhaseTimer('json_parse'):
+                return json_loads(raw)
     except Exception as e:
         app.logger.error(f"Fehler beim Laden von JSON {filepath}: {e}")
     return None
+def load_json(filepath, readonly=False):
+    return get_cached_document(filepath, 'json', read_json_file, readonly)
 def save_json(filepath, data):
     tmp_path = f"{filepath}.tmp"
     bak_path = f"{filepath}.bak"
     try:
-        with open(tmp_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4)
+        with PhaseTimer('json_serialize'):
+            json_bytes = json_dumps_bytes(data, get_addon_option('json_write_mode', 'standard'))
+        transaction = get_import_transaction(filepath)
+        if transaction is not None:
+            transaction.stage(filepath, json_bytes)
+            return True
+        with open(tmp_path, 'wb') as f:
+            f.write(json_bytes)
+        count_file_written(filepath, len(json_bytes))
         if os.path.exists(filepath):
             os.rename(filepath, bak_path)
         os.rename(tmp_path, filepath)
+        invalidate_cached_document(filepath)
         if os.path.exists(bak_path):
             os.remove(bak_path)
         return True
@@ -103,23 +509,48 @@ def save_json(filepath, data):
         if os.path.exists(bak_path) and not os.path.exists(filepath):
             os.rename(bak_path, filepath)
         return False
-def load_yaml(filepath):
+def get_addon_option(name, default):
+    global addon_options
+    if addon_options is None:
+        addon_options = read_json_file(OPTIONS_PATH) or {}
+    value = addon_options.get(name)
+    return default if value is None else value
+def read_yaml_file(filepath):
     try:
         if os.path.exists(filepath):
             with open(filepath, 'r', encoding='utf-8') as f:
-                return yaml.load(f)
+                count_file_read(filepath, os.fstat(f.fileno()).st_size)
+                with PhaseTimer('yaml_load'):
+                    return yaml.load(f)
     except Exception as e:
         app.logger.error(f"Fehler beim Laden von YAML {filepath}: {e}")
     return None
+def load_yaml(filepath, readonly=False):
+    return get_cached_document(filepath, 'yaml', read_yaml_file, readonly)
 def save_yaml(filepath, data):
+    try:
+        stream = io.StringIO()
+        with PhaseTimer('yaml_dump'):
+            yaml.dump(data, stream)
+    except Exception as e:
+        app.logger.error(f"Fehler beim Speichern von YAML {filepath}: {e}")
+        return False
+    return save_yaml_text(filepath, stream.getvalue())
+def save_yaml_text(filepath, text):
     tmp_path = f"{filepath}.tmp"
     bak_path = f"{filepath}.bak"
     try:
-        with open(tmp_path, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f)
+        transaction = get_import_transaction(filepath)
+        if transaction is not None:
+            transaction.stage(filepath, text.encode('utf-8'))
+            return True
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        count_file_written(filepath, os.path.getsize(tmp_path))
         if os.path.exists(filepath):
             os.rename(filepath, bak_path)
         os.rename(tmp_path, filepath)
+        invalidate_cached_document(filepath)
         if os.path.exists(bak_path):
             os.remove(bak_path)
         return True
@@ -130,6 +561,128 @@ def save_yaml(filepath, data):
         if os.path.exists(bak_path) and not os.path.exists(filepath):
             os.rename(bak_path, filepath)
         return False
+def get_import_transaction(filepath):
+    transaction = getattr(import_transaction_state, 'transaction', None)
+    if transaction is not None and filepath.startswith(CONFIG_PATH + os.sep):
+        return transaction
+    return None
+def sync_directories(paths):
+    for directory in sorted({os.path.dirname(path) for path in paths}):
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+def write_transaction_journal(journal_path, journal):
+    tmp_path = f"{journal_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(journal, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, journal_path)
+    sync_directories([journal_path])
+def get_missing_directories(paths):
+    missing = set()
+    for path in paths:
+        directory = os.path.dirname(path)
+        while directory and directory not in missing and not os.path.isdir(directory):
+            missing.add(directory)
+            directory = os.path.dirname(directory)
+    return sorted(missing)
+def discard_transaction_journal(journal_path, journal):
+    for entry in journal['files']:
+        if os.path.exists(entry['staged']):
+            os.remove(entry['staged'])
+    for directory in reversed(journal.get('directories', [])):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+    os.remove(journal_path)
+def apply_transaction_journal(journal_path, journal):
+    for entry in journal['files']:
+        if os.path.exists(entry['staged']):
+            os.replace(entry['staged'], entry['path'])
+        invalidate_cached_document(entry['path'])
+    sync_directories([entry['path'] for entry in journal['files']])
+    os.remove(journal_path)
+class ImportTransaction:
+    def __init__(self):
+        self.transaction_id = uuid.uuid4().hex
+        self.writes = OrderedDict()
+    def __enter__(self):
+        import_transaction_state.transaction = self
+        return self
+    def __exit__(self, exc_type, exc, tb):
+        import_transaction_state.transaction = None
+        if exc_type is None:
+            self.commit()
+    def stage(self, filepath, data):
+        self.writes[filepath] = data
+        count_file_written(filepath, len(data))
+    def commit(self):
+        if not self.writes:
+            return
+        os.makedirs(TRANSACTIONS_PATH, exist_ok=True)
+        journal_path = os.path.join(TRANSACTIONS_PATH, f"{self.transaction_id}.json")
+        journal = {'id': self.transaction_id, 'state': 'prepared', 'created': time.time(), 'files': [{'path': path, 'staged': f"{path}.{self.transaction_id}.tmp"} for path in self.writes], 'directories': get_missing_directories(self.writes)}
+        with PhaseTimer('import_commit_stage'):
+            write_transaction_journal(journal_path, journal)
+            try:
+                for directory in journal['directories']:
+                    os.makedirs(directory, exist_ok=True)
+                for entry in journal['files']:
+                    with open(entry['staged'], 'wb') as f:
+                        f.write(self.writes[entry['path']])
+                        f.flush()
+                        os.fsync(f.fileno())
+                sync_directories(list(self.writes) + journal['directories'])
+            except Exception as e:
+                app.logger.error(f"Import-Transaktion {self.transaction_id} konnte nicht vorbereitet werden, nichts wurde geändert: {e}")
+                discard_transaction_journal(journal_path, journal)
+                raise
+        journal['state'] = 'committed'
+        with PhaseTimer('import_commit_apply'):
+            write_transaction_journal(journal_path, journal)
+            apply_transaction_journal(journal_path, journal)
+        app.logger.info(f"Import-Transaktion {self.transaction_id}: {len(self.writes)} Dateien geschrieben.")
+def recover_import_transactions():
+    if not os.path.isdir(TRANSACTIONS_PATH):
+        return
+    with FILE_LOCKS['import_transaction']:
+        for tmp_path in glob.glob(os.path.join(TRANSACTIONS_PATH, '*.json.tmp')):
+            os.remove(tmp_path)
+        for journal_path in glob.glob(os.path.join(TRANSACTIONS_PATH, '*.json')):
+            try:
+                with open(journal_path, 'r', encoding='utf-8') as f:
+                    journal = json.load(f)
+                if journal.get('state') == 'committed':
+                    apply_transaction_journal(journal_path, journal)
+                    app.logger.warning(f"Unterbrochene Import-Transaktion {journal['id']} wurde abgeschlossen ({len(journal['files'])} Dateien).")
+                else:
+                    discard_transaction_journal(journal_path, journal)
+                    app.logger.warning(f"Unterbrochene Import-Transaktion {journal['id']} wurde zurückgerollt.")
+            except Exception as e:
+                app.logger.error(f"Import-Transaktion {journal_path} konnte nicht wiederhergestellt werden: {e}")
+def read_yaml_safe_file(filepath):
+    try:
+        if os.path.exists(filepath):
+            with open(filepath, 'rb') as f:
+                raw = f.read()
+            count_file_read(filepath, len(raw))
+            with PhaseTimer('yaml_load_safe'):
+                return safe_yaml.load(raw)
+    except Exception as e:
+        app.logger.error(f"Fehler beim Laden von YAML {filepath}: {e}")
+    return None
+def load_yaml_safe(filepath, readonly=False):
+    return get_cached_document(filepath, 'yaml_safe', read_yaml_safe_file, readonly)
+def load_yaml_safe_from_string(yaml_string):
+    try:
+        return safe_yaml.load(yaml_string)
+    except Exception as e:
+        app.logger.error(f"Fehler beim Parsen von YAML-String: {e}")
+    return None
 def load_yaml_from_string(yaml_string):
     try:
         return yaml.load(yaml_string)
@@ -137,7 +690,7 @@ def load_yaml_from_string(yaml_string):
         app.logger.error(f"Fehler beim Parsen von YAML-String: {e}")
     return None
 def scan_yaml_list_file(items, item_type, file_path, name_key, item_ids_set=None):
-    data = load_yaml(file_path)
+    data = load_yaml_safe(file_path, readonly=True)
     if isinstance(data, list):
         for entry in data:
             if isinstance(entry, dict):
@@ -166,178 +719,1439 @@ def scan_yaml_list_file(items, item_type, file_path, name_key, item_ids_set=None
                 })
                 if item_ids_set is not None:
                     item_ids_set.add(full_id)
-def get_items(include_ids_set=False):
+def scan_legacy_helper_file(helper_file_path):
     items = []
-    item_ids_set = set() if include_ids_set else None
-    try:
-        excluded_yaml_files = [YAML_LIST_MAP[key]['file'] for key in YAML_LIST_MAP]
-        yaml_files = glob.glob(os.path.join(CONFIG_PATH, '**/*.yaml'), recursive=True)
-        for yf in yaml_files:
-            rel_path = os.path.relpath(yf, CONFIG_PATH)
-            if rel_path in excluded_yaml_files or 'secrets.yaml' in rel_path or \
-               rel_path.startswith('.storage') or rel_path.startswith('blueprints'):
+    platform = os.path.basename(helper_file_path)
+    helper_data = load_json(helper_file_path, readonly=True)
+    if helper_data and 'data' in helper_data and 'items' in helper_data['data']:
+        for item in helper_data['data']['items']:
+            item_id = item.get('id')
+            if item_id:
+                items.append({
+                    'id': f"Helfer::{platform}::{item_id}",
+                    'name': item.get('name'),
+                    'type': 'Helfer',
+                    'source': f".storage/{platform}"
+                })
+    return items
+def scan_config_entries_file(config_entries_path):
+    items = []
+    config_entries = load_json(config_entries_path, readonly=True)
+    if config_entries and 'data' in config_entries and 'entries' in config_entries['data']:
+        for entry in config_entries['data']['entries']:
+            domain = entry.get('domain')
+            if domain in INTEGRATION_HELPER_PLATFORMS:
+                entry_id = entry.get('entry_id')
+                if entry_id:
+                    items.append({
+                        'id': f"Helfer::{domain}::{entry_id}",
+                        'name': entry.get('title'),
+                        'type': 'Helfer',
+                        'source': 'core.config_entries'
+                    })
+    return items
+def scan_storage_file(storage_file_path, item_type):
+    items = []
+    config = STORAGE_FILES_MAP[item_type]
+    storage_data_key = config['storage_key']
+    storage_file = load_json(storage_file_path, readonly=True)
+    if storage_file and 'data' in storage_file and storage_data_key in storage_file['data']:
+        data_list = storage_file['data'][storage_data_key]
+        data_source = []
+        if isinstance(data_list, dict): data_source = data_list.values()
+        elif isinstance(data_list, list): data_source = data_list
+        for entry in data_source:
+            if entry.get('id'):
+                items.append({
+                    'id': f"{item_type}::{entry.get('id')}",
+                    'name': entry.get('alias') or entry.get('name'),
+                    'type': item_type,
+                    'source': f"{config['file_key']}"
+                })
+    return items
+def scan_blueprint_file(blueprint_path):
+    rel_path = os.path.relpath(blueprint_path, CONFIG_PATH)
+    data = load_yaml_safe(blueprint_path, readonly=True)
+    blueprint_name = None
+    if isinstance(data, dict):
+        blueprint_name = data.get('blueprint', {}).get('name')
+    return [{
+        'id': f"Blueprint::{rel_path}",
+        'name': blueprint_name or os.path.basename(blueprint_path),
+        'type': 'Blueprint',
+        'source': rel_path
+    }]
+def get_file_signature(filepath):
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+def get_inventory_index():
+    global inventory_index_db, inventory_index_disabled
+    if inventory_index_db is None and not inventory_index_disabled:
+        try:
+            os.makedirs(DATA_PATH, exist_ok=True)
+            db = sqlite3.connect(INVENTORY_INDEX_PATH, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=OFF')
+            db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            db.execute('CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, inode INTEGER)')
+            db.execute('CREATE TABLE IF NOT EXISTS items (path TEXT, position INTEGER, id TEXT, name TEXT, type TEXT, source TEXT, PRIMARY KEY (path, position))')
+            row = db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if not row or row[0] != str(INVENTORY_INDEX_VERSION):
+                db.execute('DELETE FROM sources')
+                db.execute('DELETE FROM items')
+                db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (str(INVENTORY_INDEX_VERSION),))
+            db.commit()
+            inventory_index_db = db
+        except Exception as e:
+            app.logger.warning(f"Inventar-Index nicht verfügbar, Quellen werden direkt gelesen: {e}")
+            inventory_index_disabled = True
+    return inventory_index_db
+def lookup_indexed_items(filepath, signature):
+    db = get_inventory_index()
+    if db is None:
+        return None
+    try:
+        with INVENTORY_INDEX_LOCK:
+            row = db.execute('SELECT mtime_ns, size, inode FROM sources WHERE path = ?', (filepath,)).fetchone()
+            if row is None or tuple(row) != tuple(signature):
+                return None
+            rows = db.execute('SELECT id, name, type, source FROM items WHERE path = ? ORDER BY position', (filepath,)).fetchall()
+        return [{'id': r[0], 'name': r[1], 'type': r[2], 'source': r[3]} for r in rows]
+    except Exception as e:
+        app.logger.warning(f"Fehler beim Lesen des Inventar-Index für {filepath}: {e}")
+        return None
+def lookup_indexed_item_ids(filepath, signature):
+    db = get_inventory_index()
+    if db is None:
+        return None
+    try:
+        with INVENTORY_INDEX_LOCK:
+            row = db.execute('SELECT mtime_ns, size, inode FROM sources WHERE path = ?', (filepath,)).fetchone()
+            if row is None or tuple(row) != tuple(signature):
+                return None
+            rows = db.execute('SELECT id FROM items WHERE path = ?', (filepath,)).fetchall()
+        return {r[0] for r in rows}
+    except Exception as e:
+        app.logger.warning(f"Fehler beim Lesen des Inventar-Index für {filepath}: {e}")
+        return None
+def store_indexed_items(filepath, signature, items):
+    db = get_inventory_index()
+    if db is None:
+        return
+    try:
+        with INVENTORY_INDEX_LOCK:
+            with db:
+                db.execute('DELETE FROM items WHERE path = ?', (filepath,))
+                db.execute('INSERT OR REPLACE INTO sources (path, mtime_ns, size, inode) VALUES (?, ?, ?, ?)', (filepath, *signature))
+                db.executemany(
+                    'INSERT INTO items (path, position, id, name, type, source) VALUES (?, ?, ?, ?, ?, ?)',
+                    [(filepath, i, item['id'], item['name'], item['type'], item['source']) for i, item in enumerate(items)]
+                )
+    except Exception as e:
+        app.logger.warning(f"Fehler beim Schreiben des Inventar-Index für {filepath}: {e}")
+def prune_inventory_index(seen_sources):
+    db = get_inventory_index()
+    if db is None:
+        return
+    try:
+        with INVENTORY_INDEX_LOCK:
+            stale_paths = [row[0] for row in db.execute('SELECT path FROM sources') if row[0] not in seen_sources]
+            if stale_paths:
+                with db:
+                    db.executemany('DELETE FROM items WHERE path = ?', [(p,) for p in stale_paths])
+                    db.executemany('DELETE FROM sources WHERE path = ?', [(p,) for p in stale_paths])
+    except Exception as e:
+        app.logger.warning(f"Fehler beim Bereinigen des Inventar-Index: {e}")
+def get_indexed_items(filepath, scanner, seen_sources=None):
+    signature = get_file_signature(filepath)
+    if signature is None:
+        return []
+    if seen_sources is not None:
+        seen_sources[filepath] = signature
+    items = lookup_indexed_items(filepath, signature)
+    if items is None:
+        items = scanner(filepath)
+        if get_file_signature(filepath) == signature:
+            store_indexed_items(filepath, signature, items)
+    return items
+def get_indexed_item_ids(filepath, scanner):
+    signature = get_file_signature(filepath)
+    if signature is None:
+        return set()
+    item_ids = lookup_indexed_item_ids(filepath, signature)
+    if item_ids is None:
+        items = scanner(filepath)
+        if get_file_signature(filepath) == signature:
+            store_indexed_items(filepath, signature, items)
+        item_ids = {item['id'] for item in items}
+    return item_ids
+def scan_blueprint_file_in_process(blueprint_path):
+    return scan_blueprint_file(blueprint_path), os.path.getsize(blueprint_path)
+def get_scan_process_pool(workers):
+    global scan_process_pool
+    with SCAN_PROCESS_POOL_LOCK:
+        if scan_process_pool is None:
+            scan_process_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        return scan_process_pool
+def reset_scan_process_pool(pool):
+    global scan_process_pool
+    with SCAN_PROCESS_POOL_LOCK:
+        if scan_process_pool is pool:
+            scan_process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+def scan_blueprint_files(blueprint_files, seen_sources=None):
+    results = [[] for _ in blueprint_files]
+    stale = []
+    for i, blueprint_path in enumerate(blueprint_files):
+        signature = get_file_signature(blueprint_path)
+        if signature is None:
+            continue
+        if seen_sources is not None:
+            seen_sources[blueprint_path] = signature
+        cached = lookup_indexed_items(blueprint_path, signature)
+        if cached is None:
+            stale.append((i, blueprint_path, signature))
+        else:
+            results[i] = cached
+    if not stale:
+        return results
+    workers = max(1, int(get_addon_option('scan_workers', 4)))
+    use_processes = get_addon_option('scan_pool', 'thread') == 'process'
+    executor = None
+    if workers == 1 or len(stale) == 1:
+        futures = None
+    elif use_processes:
+        pool = get_scan_process_pool(workers)
+        futures = [pool.submit(scan_blueprint_file_in_process, blueprint_path) for _, blueprint_path, _ in stale]
+    else:
+        executor = ThreadPoolExecutor(max_workers=min(workers, len(stale)))
+        futures = [executor.submit(scan_blueprint_file, blueprint_path) for _, blueprint_path, _ in stale]
+    try:
+        for n, (i, blueprint_path, signature) in enumerate(stale):
+            try:
+                if futures and use_processes:
+                    scanned, read_bytes = futures[n].result()
+                    count_file_read(blueprint_path, read_bytes)
+                else:
+                    scanned = futures[n].result() if futures else scan_blueprint_file(blueprint_path)
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    reset_scan_process_pool(pool)
+                app.logger.error(f"Fehler beim Scannen des Blueprints {blueprint_path}: {e}")
+                rel_path = os.path.relpath(blueprint_path, CONFIG_PATH)
+                results[i] = [{'id': f"Blueprint::{rel_path}", 'name': os.path.basename(blueprint_path), 'type': 'Blueprint', 'source': rel_path}]
                 continue
-            file_name = os.path.basename(rel_path)
-            dir_name = os.path.dirname(rel_path)
-            source_display = 'config/'
-            if dir_name and dir_name != '.':
-                source_display = f"config/{dir_name}/"
-            full_id = f"YAML-Datei::{rel_path}"
-            items.append({'id': full_id, 'name': file_name, 'type': 'YAML-Datei', 'source': source_display})
-            if item_ids_set is not None:
-                item_ids_set.add(full_id)
+            results[i] = scanned
+            if get_file_signature(blueprint_path) == signature:
+                store_indexed_items(blueprint_path, signature, scanned)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+    return results
+def scan_yaml_list_source(file_path, item_type):
+    items = []
+    scan_yaml_list_file(items, item_type, file_path, YAML_LIST_MAP[item_type]['name_key'])
+    return items
+def is_generic_yaml_file(rel_path):
+    excluded_yaml_files = [YAML_LIST_MAP[key]['file'] for key in YAML_LIST_MAP]
+    return not (rel_path in excluded_yaml_files or 'secrets.yaml' in rel_path or
+                rel_path.startswith('.storage') or rel_path.startswith('blueprints'))
+def get_config_scan_rules():
+    excludes = list(CONFIG_SCAN_EXCLUDES)
+    for pattern in get_addon_option('yaml_scan_exclude', []) or []:
+        pattern = str(pattern).strip().strip('/')
+        if pattern:
+            excludes.append(pattern.replace('/', os.sep))
+    return excludes, int(get_addon_option('yaml_scan_max_depth', CONFIG_SCAN_DEFAULT_MAX_DEPTH))
+def is_config_path_excluded(rel_path, excludes):
+    return os.path.basename(rel_path).startswith('.') or any(fnmatch.fnmatchcase(rel_path, pattern) for pattern in excludes)
+def is_config_path_scanned(rel_path, rules=None):
+    excludes, max_depth = rules or get_config_scan_rules()
+    parts = rel_path.split(os.sep)
+    if len(parts) - 1 > max_depth:
+        return False
+    return not any(is_config_path_excluded(os.sep.join(parts[:i]), excludes) for i in range(1, len(parts) + 1))
+def iter_config_tree(root, rules=None, prune=(), directories=None):
+    excludes, max_depth = rules or get_config_scan_rules()
+    visited = set()
+    stack = [root]
+    while stack:
+        dirpath = stack.pop()
+        try:
+            st = os.stat(dirpath)
+        except OSError:
+            continue
+        if (st.st_dev, st.st_ino) in visited:
+            continue
+        visited.add((st.st_dev, st.st_ino))
+        if directories is not None:
+            directories[dirpath] = (st.st_mtime_ns, st.st_size, st.st_ino)
+        rel_dir = os.path.relpath(dirpath, CONFIG_PATH)
+        depth = 0 if rel_dir == '.' else len(rel_dir.split(os.sep))
+        filenames = []
+        subdirs = []
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    rel_path = entry.name if rel_dir == '.' else os.path.join(rel_dir, entry.name)
+                    if is_config_path_excluded(rel_path, excludes):
+                        continue
+                    try:
+                        if entry.is_dir():
+                            if depth < max_depth and rel_path not in prune:
+                                subdirs.append(entry.path)
+                        elif entry.is_file():
+                            filenames.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError as e:
+            app.logger.warning(f"Verzeichnis {dirpath} konnte nicht gelesen werden: {e}")
+            continue
+        yield dirpath, filenames
+        stack.extend(sorted(subdirs, reverse=True))
+def find_config_yaml_files(root, rules=None, prune=(), directories=None):
+    return [os.path.join(dirpath, name) for dirpath, filenames in iter_config_tree(root, rules, prune, directories) for name in sorted(filenames) if name.endswith('.yaml')]
+def build_yaml_file_item(rel_path):
+    file_name = os.path.basename(rel_path)
+    dir_name = os.path.dirname(rel_path)
+    source_display = 'config/'
+    if dir_name and dir_name != '.':
+        source_display = f"config/{dir_name}/"
+    return {'id': f"YAML-Datei::{rel_path}", 'name': file_name, 'type': 'YAML-Datei', 'source': source_display}
+def get_blueprint_roots():
+    return [
+        os.path.join(CONFIG_PATH, 'blueprints/automation'),
+        os.path.join(CONFIG_PATH, 'blueprints/script')
+    ]
+def get_inventory_source_candidates():
+    paths = [STORAGE_PATH, os.path.join(CONFIG_PATH, 'blueprints')] + get_blueprint_roots()
+    paths.extend(os.path.join(STORAGE_PATH, platform) for platform in LEGACY_HELPER_PLATFORMS)
+    paths.append(os.path.join(STORAGE_PATH, 'core.config_entries'))
+    paths.extend(os.path.join(STORAGE_PATH, config['file_key']) for config in STORAGE_FILES_MAP.values())
+    paths.extend(os.path.join(CONFIG_PATH, config['file']) for config in YAML_LIST_MAP.values())
+    return paths
+def scan_inventory_sections(sources=None):
+    sections = {name: {} for name in INVENTORY_SECTIONS}
+    seen_sources = {}
+    directories = {}
+    if sources is not None:
+        sources.update((path, get_file_signature(path)) for path in get_inventory_source_candidates())
+    try:
+        with PhaseTimer('inventory_yaml_files'):
+            yaml_files = find_config_yaml_files(CONFIG_PATH, prune=('blueprints',), directories=directories)
+            for yf in yaml_files:
+                rel_path = os.path.relpath(yf, CONFIG_PATH)
+                if is_generic_yaml_file(rel_path):
+                    sections['yaml_files'][yf] = [build_yaml_file_item(rel_path)]
     except Exception as e:
         app.logger.error(f"Fehler beim Scannen der YAML-Dateien: {e}")
     try:
-        for platform in LEGACY_HELPER_PLATFORMS:
-            helper_file_path = os.path.join(STORAGE_PATH, platform)
-            helper_data = load_json(helper_file_path)
-            if helper_data and 'data' in helper_data and 'items' in helper_data['data']:
-                for item in helper_data['data']['items']:
-                    item_id = item.get('id')
-                    if item_id:
-                        full_id = f"Helfer::{platform}::{item_id}"
-                        items.append({
-                            'id': full_id,
-                            'name': item.get('name'),
-                            'type': 'Helfer',
-                            'source': f".storage/{platform}"
-                        })
-                        if item_ids_set is not None: item_ids_set.add(full_id)
+        with PhaseTimer('inventory_legacy_helpers'):
+            for platform in LEGACY_HELPER_PLATFORMS:
+                helper_file_path = os.path.join(STORAGE_PATH, platform)
+                sections['legacy_helpers'][helper_file_path] = get_indexed_items(helper_file_path, scan_legacy_helper_file, seen_sources)
     except Exception as e:
         app.logger.error(f"Fehler beim Scannen der Legacy-Helfer: {e}")
     try:
-        config_entries = load_json(os.path.join(STORAGE_PATH, 'core.config_entries'))
-        if config_entries and 'data' in config_entries and 'entries' in config_entries['data']:
-            for entry in config_entries['data']['entries']:
-                domain = entry.get('domain')
-                if domain in INTEGRATION_HELPER_PLATFORMS:
-                    entry_id = entry.get('entry_id')
-                    if entry_id:
-                        full_id = f"Helfer::{domain}::{entry_id}"
-                        items.append({
-                            'id': full_id,
-                            'name': entry.get('title'),
-                            'type': 'Helfer',
-                            'source': 'core.config_entries'
-                        })
-                        if item_ids_set is not None: item_ids_set.add(full_id)
+        with PhaseTimer('inventory_config_entries'):
+            config_entries_path = os.path.join(STORAGE_PATH, 'core.config_entries')
+            sections['config_entries'][config_entries_path] = get_indexed_items(config_entries_path, scan_config_entries_file, seen_sources)
     except Exception as e:
         app.logger.error(f"Fehler beim Scannen der Integrations-Helfer: {e}")
     try:
-        for item_type, config in STORAGE_FILES_MAP.items():
-            storage_file_key = config['file_key']
-            storage_data_key = config['storage_key']
-            storage_file_path = os.path.join(STORAGE_PATH, storage_file_key)
-            storage_file = load_json(storage_file_path)
-            if storage_file and 'data' in storage_file and storage_data_key in storage_file['data']:
-                data_list = storage_file['data'][storage_data_key]
-                data_source = []
-                if isinstance(data_list, dict): data_source = data_list.values()
-                elif isinstance(data_list, list): data_source = data_list
-                for entry in data_source:
-                    if entry.get('id'):
-                        full_id = f"{item_type}::{entry.get('id')}"
-                        items.append({
-                            'id': full_id,
-                            'name': entry.get('alias') or entry.get('name'),
-                            'type': item_type, 
-                            'source': f"{storage_file_key}"
-                        })
-                        if item_ids_set is not None:
-                            item_ids_set.add(full_id)
+        with PhaseTimer('inventory_storage_files'):
+            for item_type, config in STORAGE_FILES_MAP.items():
+                storage_file_path = os.path.join(STORAGE_PATH, config['file_key'])
+                sections['storage_files'][storage_file_path] = get_indexed_items(storage_file_path, lambda p, t=item_type: scan_storage_file(p, t), seen_sources)
     except Exception as e:
         app.logger.error(f"Fehler beim Scannen der Storage-Dateien: {e}")
     try:
-        for item_type, config in YAML_LIST_MAP.items():
-            file_path = os.path.join(CONFIG_PATH, config['file'])
-            if os.path.exists(file_path):
-                scan_yaml_list_file(items, item_type, file_path, config['name_key'], item_ids_set)
+        with PhaseTimer('inventory_yaml_lists'):
+            for item_type, config in YAML_LIST_MAP.items():
+                file_path = os.path.join(CONFIG_PATH, config['file'])
+                sections['yaml_lists'][file_path] = get_indexed_items(file_path, lambda p, t=item_type: scan_yaml_list_source(p, t), seen_sources)
     except Exception as e:
         app.logger.error(f"Fehler beim Scannen der YAML-Listen-Dateien: {e}")
     try:
-        blueprint_paths = [
-            os.path.join(CONFIG_PATH, 'blueprints/automation'),
-            os.path.join(CONFIG_PATH, 'blueprints/script')
-        ]
-        for bp_path in blueprint_paths:
-            if os.path.exists(bp_path):
-                yaml_files = glob.glob(os.path.join(bp_path, '**/*.yaml'), recursive=True)
-                for yf in yaml_files:
-                    rel_path = os.path.relpath(yf, CONFIG_PATH)
-                    data = load_yaml(yf)
-                    blueprint_name = None
-                    if isinstance(data, dict):
-                        blueprint_name = data.get('blueprint', {}).get('name')
-                    full_id = f"Blueprint::{rel_path}"
-                    items.append({
-                        'id': full_id,
-                        'name': blueprint_name or os.path.basename(yf),
-                        'type': 'Blueprint',
-                        'source': rel_path
-                    })
-                    if item_ids_set is not None:
-                        item_ids_set.add(full_id)
+        with PhaseTimer('inventory_blueprints'):
+            blueprint_files = []
+            rules = get_config_scan_rules()
+            for bp_path in get_blueprint_roots():
+                if os.path.exists(bp_path):
+                    blueprint_files.extend(find_config_yaml_files(bp_path, rules, directories=directories))
+            for blueprint_path, blueprint_items in zip(blueprint_files, scan_blueprint_files(blueprint_files, seen_sources)):
+                sections['blueprints'][blueprint_path] = blueprint_items
     except Exception as e:
         app.logger.error(f"Fehler beim Scannen der Blueprints: {e}")
+    with PhaseTimer('inventory_index_update'):
+        prune_inventory_index(seen_sources)
+        update_inventory_generation(seen_sources, list(sections['yaml_files']))
+    if sources is not None:
+        sources.update(directories)
+        sources.update(seen_sources)
+    return sections
+def flatten_inventory_sections(sections):
+    return [item for name in INVENTORY_SECTIONS for source_items in sections[name].values() for item in source_items]
+def get_items(include_ids_set=False, sources=None):
+    if inventory_watch_mode is not None:
+        snapshot = get_inventory_snapshot()
+        if include_ids_set:
+            return snapshot['items'], snapshot['ids']
+        return snapshot['items']
+    with PhaseTimer('get_items'):
+        items = flatten_inventory_sections(scan_inventory_sections(sources))
     app.logger.info(f"{len(items)} Elemente gefunden.")
     if include_ids_set:
-        return items, item_ids_set
+        return items, {item['id'] for item in items}
     return items
-def get_existing_item_ids():
-    _, item_ids_set = get_items(include_ids_set=True)
-    return item_ids_set
-def get_legacy_helper_by_id(platform, item_id):
-    filepath = os.path.join(STORAGE_PATH, platform)
-    data = load_json(filepath)
+def get_current_inventory():
+    if inventory_watch_mode is not None:
+        snapshot = get_inventory_snapshot()
+        return snapshot['generation'], snapshot['items']
+    with INVENTORY_STATE_LOCK:
+        generation, items, sources = inventory_state['generation'], inventory_state['items'], inventory_state['sources']
+    if items is not None:
+        with PhaseTimer('inventory_revalidate'):
+            if all(get_file_signature(path) == signature for path, signature in sources.items()):
+                return generation, items
+    sources = {}
+    items = get_items(sources=sources)
+    with INVENTORY_STATE_LOCK:
+        inventory_state['items'] = items
+        inventory_state['sources'] = sources
+        return inventory_state['generation'], items
+def build_inventory_snapshot(sections):
+    items = flatten_inventory_sections(sections)
+    return {'sections': sections, 'items': items, 'ids': {item['id'] for item in items}, 'generation': inventory_state['generation']}
+def refresh_inventory_snapshot():
+    global inventory_snapshot
+    with INVENTORY_SNAPSHOT_LOCK:
+        snapshot = build_inventory_snapshot(scan_inventory_sections())
+        inventory_snapshot = snapshot
+    app.logger.info(f"{len(snapshot['items'])} Elemente gefunden.")
+    return snapshot
+def get_inventory_snapshot():
+    snapshot = inventory_snapshot
+    if snapshot is None:
+        snapshot = refresh_inventory_snapshot()
+    return snapshot
+def invalidate_inventory_snapshot():
+    global inventory_snapshot
+    with INVENTORY_SNAPSHOT_LOCK:
+        inventory_snapshot = None
+    with INVENTORY_STATE_LOCK:
+        inventory_state['items'] = None
+        inventory_state['fingerprint'] = None
+def classify_inventory_path(path):
+    rel_path = os.path.relpath(path, CONFIG_PATH)
+    if rel_path.startswith('..'):
+        return None
+    if os.path.dirname(path) == STORAGE_PATH:
+        file_name = os.path.basename(path)
+        if file_name in LEGACY_HELPER_PLATFORMS:
+            return 'legacy_helpers', scan_legacy_helper_file
+        elif file_name == 'core.config_entries':
+            return 'config_entries', scan_config_entries_file
+        for item_type, config in STORAGE_FILES_MAP.items():
+            if file_name == config['file_key']:
+                return 'storage_files', lambda p, t=item_type: scan_storage_file(p, t)
+        return None
+    if not path.endswith('.yaml'):
+        return None
+    if not is_config_path_scanned(rel_path):
+        return None
+    for item_type, config in YAML_LIST_MAP.items():
+        if rel_path == config['file']:
+            return 'yaml_lists', lambda p, t=item_type: scan_yaml_list_source(p, t)
+    for bp_path in get_blueprint_roots():
+        if path.startswith(bp_path + os.sep):
+            return 'blueprints', scan_blueprint_file
+    if is_generic_yaml_file(rel_path):
+        return 'yaml_files', lambda p: [build_yaml_file_item(os.path.relpath(p, CONFIG_PATH))]
+    return None
+def apply_inventory_changes(paths):
+    global inventory_snapshot
+    with INVENTORY_SNAPSHOT_LOCK:
+        snapshot = inventory_snapshot
+        if snapshot is None:
+            return False
+        sections = dict(snapshot['sections'])
+        copied_sections = set()
+        changed = False
+        for path in sorted(paths):
+            classified = classify_inventory_path(path)
+            if classified is None:
+                continue
+            section, scanner = classified
+            if section not in copied_sections:
+                sections[section] = dict(sections[section])
+                copied_sections.add(section)
+            sources = sections[section]
+            items = get_indexed_items(path, scanner) if os.path.isfile(path) else None
+            if items is None:
+                if sources.pop(path, None) is not None:
+                    changed = True
+            elif sources.get(path) != items:
+                sources[path] = items
+                changed = True
+        if changed:
+            with INVENTORY_STATE_LOCK:
+                inventory_state['fingerprint'] = None
+                inventory_state['generation'] += 1
+            inventory_snapshot = build_inventory_snapshot(sections)
+        return changed
+class InotifyWatcher:
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 fehlgeschlagen")
+        self.watches = {}
+    def add_watch(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), INOTIFY_WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch für {path} fehlgeschlagen")
+        self.watches[wd] = path
+    def remove_tree(self, root):
+        prefix = root.rstrip(os.sep) + os.sep
+        for wd, path in list(self.watches.items()):
+            if path == root or path.startswith(prefix):
+                del self.watches[wd]
+                self.libc.inotify_rm_watch(self.fd, wd)
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+    def add_tree(self, root):
+        rules = get_config_scan_rules()
+        rel_root = os.path.relpath(root, CONFIG_PATH)
+        if rel_root != '.' and not is_config_path_scanned(rel_root, rules):
+            return
+        for dirpath, _ in iter_config_tree(root, rules):
+            self.add_watch(dirpath)
+    def read_events(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        data = os.read(self.fd, 64 * 1024)
+        events = []
+        offset = 0
+        while offset + INOTIFY_EVENT_SIZE <= len(data):
+            wd, mask, _, length = struct.unpack_from('iIII', data, offset)
+            name = data[offset + INOTIFY_EVENT_SIZE:offset + INOTIFY_EVENT_SIZE + length].rstrip(b'\0')
+            offset += INOTIFY_EVENT_SIZE + length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+def process_inotify_events(watcher, events, pending_paths):
+    full_rescan = False
+    for wd, mask, name in events:
+        if mask & IN_Q_OVERFLOW:
+            full_rescan = True
+            continue
+        if mask & IN_IGNORED:
+            watcher.watches.pop(wd, None)
+            continue
+        directory = watcher.watches.get(wd)
+        if directory is None:
+            continue
+        if mask & IN_MOVE_SELF:
+            watcher.remove_tree(directory)
+            full_rescan = True
+            continue
+        path = os.path.join(directory, name) if name else directory
+        if mask & IN_ISDIR:
+            if mask & IN_MOVED_FROM:
+                watcher.remove_tree(path)
+            if mask & (IN_CREATE | IN_MOVED_TO) and not name.startswith('.'):
+                watcher.add_tree(path)
+            full_rescan = True
+        else:
+            pending_paths.add(path)
+    return full_rescan
+def run_inotify_watcher(watcher):
+    pending_paths = set()
+    full_rescan = False
+    first_event = None
+    while True:
+        try:
+            events = watcher.read_events(INVENTORY_WATCH_DEBOUNCE if pending_paths or full_rescan else None)
+            if process_inotify_events(watcher, events, pending_paths):
+                full_rescan = True
+            if events and first_event is None:
+                first_event = time.monotonic()
+            if (pending_paths or full_rescan) and (not events or time.monotonic() - first_event >= INVENTORY_WATCH_MAX_DELAY):
+                if full_rescan or inventory_snapshot is None:
+                    refresh_inventory_snapshot()
+                else:
+                    apply_inventory_changes(pending_paths)
+                pending_paths = set()
+                full_rescan = False
+                first_event = None
+        except Exception as e:
+            app.logger.error(f"Fehler im Dateisystem-Watcher: {e}")
+            time.sleep(INVENTORY_WATCH_DEBOUNCE)
+def run_polling_watcher(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            refresh_inventory_snapshot()
+        except Exception as e:
+            app.logger.error(f"Fehler beim Abgleich des Inventars: {e}")
+def start_inventory_watcher():
+    global inventory_watch_mode
+    mode = get_addon_option('inventory_watcher', 'off')
+    if mode == 'off' or inventory_watch_mode is not None:
+        return
+    if mode in ('auto', 'inotify'):
+        try:
+            watcher = InotifyWatcher()
+            started = False
+            try:
+                watcher.add_tree(CONFIG_PATH)
+                if os.path.isdir(STORAGE_PATH):
+                    watcher.add_watch(STORAGE_PATH)
+                threading.Thread(target=run_inotify_watcher, args=(watcher,), name='inventory-watcher', daemon=True).start()
+                started = True
+            finally:
+                if not started:
+                    watcher.close()
+            inventory_watch_mode = 'inotify'
+            app.logger.info(f"Dateisystem-Watcher aktiv (inotify, {len(watcher.watches)} Verzeichnisse).")
+            return
+        except Exception as e:
+            app.logger.warning(f"inotify nicht verfügbar, nutze Polling: {e}")
+    interval = max(5, int(get_addon_option('inventory_poll_interval', 60)))
+    inventory_watch_mode = 'polling'
+    threading.Thread(target=run_polling_watcher, args=(interval,), name='inventory-watcher', daemon=True).start()
+    app.logger.info(f"Dateisystem-Watcher aktiv (Polling alle {interval}s).")
+def update_inventory_generation(seen_sources, yaml_file_ids):
+    fingerprint = hashlib.sha1(repr((sorted(seen_sources.items()), yaml_file_ids)).encode('utf-8')).hexdigest()
+    with INVENTORY_STATE_LOCK:
+        if inventory_state['fingerprint'] != fingerprint:
+            inventory_state['fingerprint'] = fingerprint
+            inventory_state['generation'] += 1
+        return inventory_state['generation']
+def get_item_sort_key(sort):
+    if sort == 'name':
+        return lambda item: ((item.get('name') or '').casefold(), item['id'])
+    elif sort == 'source':
+        return lambda item: ((item.get('source') or '').casefold(), (item.get('name') or '').casefold(), item['id'])
+    elif sort == 'id':
+        return lambda item: item['id']
+    return lambda item: ((item.get('type') or '').replace(' (YAML)', ''), (item.get('name') or '').casefold(), item['id'])
+def build_item_search_index(items, generation):
+    search_index = {'generation': generation, 'items': items, 'names': {}, 'orders': {}}
+    for item in items:
+        search_index['names'][item['id']] = (item.get('name') or '').casefold()
+    for sort in ITEM_SORT_FIELDS:
+        search_index['orders'][sort] = sorted(items, key=get_item_sort_key(sort))
+    return search_index
+def get_item_search_index():
+    global item_search_index
+    generation, items = get_current_inventory()
+    with ITEM_SEARCH_INDEX_LOCK:
+        if item_search_index is None or item_search_index['generation'] != generation:
+            item_search_index = build_item_search_index(items, generation)
+        return item_search_index
+def query_items(search_index, item_type=None, source=None, query=None, match='contains', sort='type', order='asc', offset=0, limit=ITEMS_PAGE_DEFAULT_LIMIT):
+    ordered = search_index['orders'][sort]
+    if order == 'desc':
+        ordered = list(reversed(ordered))
+    query = (query or '').casefold()
+    matches = []
+    type_counts = {}
+    for item in ordered:
+        if item_type and item.get('type') != item_type and (item.get('type') or '').replace(' (YAML)', '') != item_type:
+            continue
+        if source and not (item.get('source') or '').startswith(source):
+            continue
+        if query:
+            name = search_index['names'][item['id']]
+            if match == 'prefix':
+                if not name.startswith(query):
+                    continue
+            elif query not in name:
+                continue
+        matches.append(item)
+        current_type = item.get('type') or ''
+        type_counts[current_type] = type_counts.get(current_type, 0) + 1
+    return {
+        'items': matches[offset:offset + limit],
+        'total': len(matches),
+        'offset': offset,
+        'limit': limit,
+        'type_counts': type_counts,
+        'inventory_total': len(search_index['items'])
+    }
+def get_items_response_entry():
+    global items_response_cache
+    generation, items = get_current_inventory()
+    with ITEMS_RESPONSE_LOCK:
+        entry = items_response_cache
+    if entry is None or entry['generation'] != generation:
+        body = jsonify(items).get_data()
+        entry = {'generation': generation, 'etag': hashlib.sha256(body).hexdigest()[:32], 'body': body, 'encoded': {}}
+        with ITEMS_RESPONSE_LOCK:
+            items_response_cache = entry
+    return entry
+def get_items_response_encoding(entry):
+    if len(entry['body']) < ITEMS_RESPONSE_MIN_COMPRESS:
+        return None
+    for encoding in ITEMS_RESPONSE_ENCODINGS:
+        if encoding == 'br' and brotli is None:
+            continue
+        if request.accept_encodings[encoding]:
+            return encoding
+    return None
+def get_encoded_items_body(entry, encoding):
+    body = entry['encoded'].get(encoding)
+    if body is None:
+        if encoding == 'br':
+            body = brotli.compress(entry['body'], quality=9)
+        else:
+            body = gzip.compress(entry['body'], compresslevel=6, mtime=0)
+        entry['encoded'][encoding] = body
+    return body
+def build_items_response(entry):
+    encoding = get_items_response_encoding(entry)
+    etag = entry['etag'] if encoding is None else f"{entry['etag']}-{encoding}"
+    known_etags = [entry['etag']] + [f"{entry['etag']}-{name}" for name in ITEMS_RESPONSE_ENCODINGS]
+    if any(request.if_none_match.contains(known) for known in known_etags):
+        response = Response(status=304)
+    else:
+        body = entry['body'] if encoding is None else get_encoded_items_body(entry, encoding)
+        response = Response(body, mimetype='application/json')
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+def warm_inventory_index():
+    try:
+        started = time.time()
+        items = get_items()
+        app.logger.info(f"Inventar-Index aufgewärmt: {len(items)} Elemente in {time.time() - started:.2f}s.")
+    except Exception as e:
+        app.logger.error(f"Fehler beim Aufwärmen des Inventar-Index: {e}")
+def start_worker_tasks():
+    start_metrics_flusher()
+    threading.Thread(target=warm_inventory_index, name='inventory-warmup', daemon=True).start()
+    start_inventory_watcher()
+    start_backup_scheduler()
+def start_background_tasks():
+    reset_metrics_store()
+    recover_import_transactions()
+    recover_jobs()
+    start_worker_tasks()
+def get_item_id_source_path(full_id):
+    item_type, _, item_key = full_id.partition('::')
+    if item_type in ('YAML-Datei', 'Blueprint'):
+        if not item_key or os.path.isabs(item_key) or os.path.normpath(item_key) != item_key or any(part.startswith('.') for part in item_key.split(os.sep)):
+            return None
+        return os.path.join(CONFIG_PATH, item_key)
+    try:
+        source, _ = get_export_source(item_type, item_key)
+    except ValueError:
+        return None
+    if source is None:
+        return None
+    kind, key = source
+    if kind == 'config_entries':
+        return os.path.join(STORAGE_PATH, 'core.config_entries')
+    elif kind == 'legacy_helper':
+        return os.path.join(STORAGE_PATH, key)
+    elif kind == 'storage_item':
+        return os.path.join(STORAGE_PATH, STORAGE_FILES_MAP[key]['file_key'])
+    return os.path.join(CONFIG_PATH, YAML_LIST_MAP[key]['file'])
+def get_live_item_hashes(item_ids):
+    hashes = {}
+    source_maps = plan_export_sources(item_ids)
+    for full_id in item_ids:
+        try:
+            item_type, item_key = full_id.split('::', 1)
+            if item_type in ('YAML-Datei', 'Blueprint'):
+                file_path = get_item_id_source_path(full_id)
+                if file_path and os.path.isfile(file_path):
+                    hashes[full_id] = hash_export_file(file_path)
+                continue
+            source, item_id = get_export_source(item_type, item_key)
+            item_data = source_maps[source].get(item_id) if source is not None else None
+            if item_data and item_type == 'Helfer':
+                registry_entries = get_helper_registry_entries(get_entity_registry_index(), item_key.split('::', 1)[0], item_id)
+                hashes[full_id] = hash_helper_export(item_data, registry_entries)
+            elif item_data:
+                hashes[full_id] = hash_export_content(item_data)
+        except Exception as e:
+            app.logger.warning(f"Konnte Hash für {full_id} nicht bestimmen: {e}")
+    return hashes
+def get_existing_item_ids(item_ids):
+    if inventory_watch_mode is not None:
+        return get_inventory_snapshot()['ids'] & set(item_ids)
+    existing_item_ids = set()
+    sources = {}
+    for full_id in set(item_ids):
+        source_path = get_item_id_source_path(full_id)
+        classified = classify_inventory_path(source_path) if source_path else None
+        if classified is None:
+            continue
+        section, scanner = classified
+        if section in ('yaml_files', 'blueprints'):
+            expected_type = 'YAML-Datei' if section == 'yaml_files' else 'Blueprint'
+            if full_id.startswith(f"{expected_type}::") and os.path.exists(source_path):
+                existing_item_ids.add(full_id)
+        else:
+            sources.setdefault(source_path, (scanner, []))[1].append(full_id)
+    for source_path, (scanner, source_item_ids) in sources.items():
+        indexed_item_ids = get_indexed_item_ids(source_path, scanner)
+        existing_item_ids.update(full_id for full_id in source_item_ids if full_id in indexed_item_ids)
+    return existing_item_ids
+def load_legacy_helper_map(platform):
+    entries = {}
+    data = load_json(os.path.join(STORAGE_PATH, platform), readonly=True)
     if data and 'data' in data and 'items' in data['data']:
         for item in data['data']['items']:
-            if item.get('id') == item_id:
-                return item
-    return None
-def get_config_entry_by_id(entry_id):
-    filepath = os.path.join(STORAGE_PATH, 'core.config_entries')
-    data = load_json(filepath)
+            item_id = item.get('id')
+            if item_id is not None and item_id not in entries:
+                entries[item_id] = item
+    return entries
+def load_config_entry_map():
+    entries = {}
+    data = load_json(os.path.join(STORAGE_PATH, 'core.config_entries'), readonly=True)
     if data and 'data' in data and 'entries' in data['data']:
         for entry in data['data']['entries']:
-            if entry.get('entry_id') == entry_id:
-                return entry
-    return None
-def get_storage_item_by_id(item_type, item_id):
+            entry_id = entry.get('entry_id')
+            if entry_id is not None and entry_id not in entries:
+                entries[entry_id] = entry
+    return entries
+def get_entity_registry_index():
+    global entity_registry_index
+    signature = get_file_signature(ENTITY_REGISTRY_PATH)
+    with ENTITY_REGISTRY_INDEX_LOCK:
+        index = entity_registry_index
+    if index is not None and index['signature'] == signature:
+        return index
+    index = {'signature': signature, 'by_config_entry': {}, 'by_unique_id': {}}
+    data = load_json(ENTITY_REGISTRY_PATH, readonly=True) if signature else None
+    if data and 'data' in data:
+        for entity in data['data'].get('entities', []):
+            config_entry_id = entity.get('config_entry_id')
+            if config_entry_id:
+                index['by_config_entry'].setdefault(config_entry_id, []).append(entity)
+            if entity.get('unique_id') is not None:
+                index['by_unique_id'].setdefault((entity.get('platform'), str(entity['unique_id'])), entity)
+    with ENTITY_REGISTRY_INDEX_LOCK:
+        entity_registry_index = index
+    return index
+def get_helper_registry_entries(registry_index, platform, item_id):
+    if platform in INTEGRATION_HELPER_PLATFORMS:
+        return registry_index['by_config_entry'].get(item_id, [])
+    entity = registry_index['by_unique_id'].get((platform, str(item_id)))
+    return [entity] if entity else []
+def load_storage_item_map(item_type):
+    entries = {}
     config = STORAGE_FILES_MAP.get(item_type)
-    if not config: return None
-    storage_file_key = config['file_key']
+    if not config: return entries
     storage_data_key = config['storage_key']
-    storage_file_path = os.path.join(STORAGE_PATH, storage_file_key)
-    storage_file = load_json(storage_file_path)
+    storage_file = load_json(os.path.join(STORAGE_PATH, config['file_key']), readonly=True)
     if storage_file and 'data' in storage_file and storage_data_key in storage_file['data']:
         data_list = storage_file['data'][storage_data_key]
-        if isinstance(data_list, dict): return data_list.get(item_id)
+        if isinstance(data_list, dict): return data_list
         elif isinstance(data_list, list):
             for entry in data_list:
-                if entry.get('id') == item_id:
-                    return entry
-    return None
-def get_yaml_list_item_by_id(item_type, item_id):
+                item_id = entry.get('id')
+                if item_id is not None and item_id not in entries:
+                    entries[item_id] = entry
+    return entries
+def load_yaml_list_item_map(item_type):
+    entries = {}
     config = YAML_LIST_MAP.get(item_type)
-    if not config: return None
-    file_path = os.path.join(CONFIG_PATH, config['file'])
-    data = load_yaml(file_path)
+    if not config: return entries
+    data = load_yaml(os.path.join(CONFIG_PATH, config['file']), readonly=True)
     if isinstance(data, list):
         for entry in data:
-            if isinstance(entry, dict) and entry.get('id') == item_id:
-                return entry
+            if isinstance(entry, dict):
+                item_id = entry.get('id')
+                if item_id is not None and item_id not in entries:
+                    entries[item_id] = entry
     elif isinstance(data, dict):
-        return data.get(item_id)
-    return None
+        return data
+    return entries
+def get_export_source(item_type, item_key):
+    if item_type == 'Helfer':
+        platform, item_id = item_key.split('::', 1)
+        if platform in INTEGRATION_HELPER_PLATFORMS:
+            return ('config_entries', None), item_id
+        return ('legacy_helper', platform), item_id
+    elif item_type in STORAGE_FILES_MAP:
+        return ('storage_item', item_type), item_key
+    elif item_type in YAML_LIST_MAP:
+        return ('yaml_item', item_type), item_key
+    return None, item_key
+def load_export_source_map(source):
+    kind, key = source
+    if kind == 'config_entries':
+        return load_config_entry_map()
+    elif kind == 'legacy_helper':
+        return load_legacy_helper_map(key)
+    elif kind == 'storage_item':
+        return load_storage_item_map(key)
+    elif kind == 'yaml_item':
+        return load_yaml_list_item_map(key)
+    return {}
+def plan_export_sources(item_ids):
+    sources = {}
+    for full_id in item_ids:
+        try:
+            item_type, item_key = full_id.split('::', 1)
+            source, _ = get_export_source(item_type, item_key)
+        except ValueError:
+            continue
+        if source is not None and source not in sources:
+            try:
+                sources[source] = load_export_source_map(source)
+            except Exception as e:
+                app.logger.warning(f"Konnte Export-Quelle {source} nicht laden: {e}")
+                sources[source] = {}
+    return sources
+class ExportStreamBuffer:
+    def __init__(self):
+        self.chunks = []
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+    def flush(self):
+        pass
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+def hash_export_content(data):
+    if isinstance(data, bytes):
+        return hashlib.sha256(data).hexdigest()
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str).encode('utf-8')).hexdigest()
+def hash_helper_export(config_data, registry_entries):
+    if not registry_entries:
+        return hash_export_content(config_data)
+    return hash_export_content({'config': config_data, 'entity_registry': registry_entries})
+def hash_export_file(file_path):
+    file_hash = hashlib.sha256()
+    read_bytes = 0
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(EXPORT_CHUNK_SIZE)
+            if not chunk:
+                break
+            file_hash.update(chunk)
+            read_bytes += len(chunk)
+    count_file_read(file_path, read_bytes)
+    return file_hash.hexdigest()
+def compress_zip_entry(data, level):
+    if level == 0:
+        return data, zipfile.ZIP_STORED
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(), zipfile.ZIP_DEFLATED
+class ZipArchiveWriter:
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.offset = 0
+        self.entries = []
+        self.stream_entry = None
+    def write(self, data):
+        self.fileobj.write(data)
+        self.offset += len(data)
+    def start_entry(self, arcname, mtime, mode, compress_type, streamed=False, zip64=False):
+        year, month, day, hour, minute, second = time.localtime(mtime)[:6]
+        if year < 1980:
+            year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+        return {
+            'name': arcname.encode('utf-8'),
+            'flags': (0x800 if not arcname.isascii() else 0) | (0x08 if streamed else 0),
+            'compress_type': compress_type,
+            'dos_time': (hour << 11) | (minute << 5) | (second // 2),
+            'dos_date': ((year - 1980) << 9) | (month << 5) | day,
+            'external_attr': (0o100000 | mode) << 16,
+            'header_offset': self.offset,
+            'CRC': 0,
+            'compress_size': 0,
+            'file_size': 0,
+            'zip64': zip64
+        }
+    def write_local_header(self, entry):
+        extra = struct.pack('<HHQQ', 0x0001, 16, 0, 0) if entry['zip64'] else b''
+        self.write(struct.pack('<4sHHHHHLLLHH', b'PK\x03\x04', 45 if entry['zip64'] else 20, entry['flags'], entry['compress_type'], entry['dos_time'], entry['dos_date'], entry['CRC'], entry['compress_size'], entry['file_size'], len(entry['name']), len(extra)))
+        self.write(entry['name'])
+        self.write(extra)
+    def add_entry(self, arcname, mtime, mode, payload, compress_type, crc, file_size):
+        entry = self.start_entry(arcname, mtime, mode, compress_type)
+        entry.update({'CRC': crc, 'compress_size': len(payload), 'file_size': file_size})
+        self.write_local_header(entry)
+        self.write(payload)
+        self.entries.append(entry)
+    def open_entry(self, arcname, mtime, mode, compress_type, zip64=False):
+        entry = self.start_entry(arcname, mtime, mode, compress_type, streamed=True, zip64=zip64)
+        self.write_local_header(entry)
+        entry['data_offset'] = self.offset
+        self.stream_entry = entry
+    def close_entry(self, crc, file_size):
+        entry = self.stream_entry
+        self.stream_entry = None
+        entry.update({'CRC': crc, 'compress_size': self.offset - entry.pop('data_offset'), 'file_size': file_size})
+        if entry['zip64']:
+            self.write(struct.pack('<4sLQQ', b'PK\x07\x08', crc, entry['compress_size'], file_size))
+        else:
+            self.write(struct.pack('<4sLLL', b'PK\x07\x08', crc, entry['compress_size'], file_size))
+        self.entries.append(entry)
+    def write_central_directory(self):
+        start = self.offset
+        for entry in self.entries:
+            extra_values = [value for value in (entry['file_size'], entry['compress_size'], entry['header_offset']) if value > ZIP64_LIMIT]
+            extra = struct.pack(f'<HH{len(extra_values)}Q', 0x0001, 8 * len(extra_values), *extra_values) if extra_values else b''
+            version = 45 if extra else 20
+            self.write(struct.pack(
+                '<4sHHHHHHLLLHHHHHLL', b'PK\x01\x02', (3 << 8) | version, version, entry['flags'], entry['compress_type'],
+                entry['dos_time'], entry['dos_date'], entry['CRC'],
+                0xFFFFFFFF if entry['compress_size'] > ZIP64_LIMIT else entry['compress_size'],
+                0xFFFFFFFF if entry['file_size'] > ZIP64_LIMIT else entry['file_size'],
+                len(entry['name']), len(extra), 0, 0, 0, entry['external_attr'],
+                0xFFFFFFFF if entry['header_offset'] > ZIP64_LIMIT else entry['header_offset']
+            ))
+            self.write(entry['name'])
+            self.write(extra)
+        return start, self.offset - start
+    def close(self):
+        start, size = self.write_central_directory()
+        count = len(self.entries)
+        if count >= 0xFFFF or start > ZIP64_LIMIT or size > ZIP64_LIMIT:
+            zip64_offset = self.offset
+            self.write(struct.pack('<4sQHHLLQQQQ', b'PK\x06\x06', 44, 45, 45, 0, 0, count, count, size, start))
+            self.write(struct.pack('<4sLQL', b'PK\x06\x07', 0, zip64_offset, 1))
+            self.write(struct.pack('<4sHHHHLLH', b'PK\x05\x06', 0, 0, 0xFFFF, 0xFFFF, 0xFFFFFFFF, 0xFFFFFFFF, 0))
+        else:
+            self.write(struct.pack('<4sHHHHLLH', b'PK\x05\x06', 0, 0, count, count, size, start, 0))
+        self.fileobj.flush()
+class ExportArchiveWriter:
+    def __init__(self, fileobj, archive_format='zip', level=None):
+        self.format = archive_format
+        self.level = EXPORT_COMPRESSION_LEVELS[archive_format][2] if level is None else level
+        self.pending = deque()
+        self.pending_bytes = 0
+        self.executor = None
+        if archive_format == 'tar.zst':
+            if zstandard is None:
+                raise ValueError("Für tar.zst wird das Python-Paket zstandard benötigt")
+            self.stream = zstandard.ZstdCompressor(level=self.level, threads=-1).stream_writer(fileobj, closefd=False)
+            self.tar = tarfile.open(fileobj=self.stream, mode='w|', format=tarfile.PAX_FORMAT)
+        else:
+            self.zip = ZipArchiveWriter(fileobj)
+            workers = os.cpu_count() or 1
+            if workers > 1 and self.level > 0:
+                self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export-compress')
+                self.max_pending = workers * 4
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+    def add_bytes(self, arcname, data, mtime=None, mode=0o600):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        mtime = time.time() if mtime is None else mtime
+        if self.format == 'tar.zst':
+            info = tarfile.TarInfo(arcname)
+            info.size = len(data)
+            info.mtime = int(mtime)
+            info.mode = mode
+            self.tar.addfile(info, io.BytesIO(data))
+            return info.size
+        entry = (arcname, mtime, mode, zlib.crc32(data), len(data))
+        if self.executor is None:
+            self.write_zip_entry(entry, *compress_zip_entry(data, self.level))
+        else:
+            self.pending.append((entry, self.executor.submit(compress_zip_entry, data, self.level)))
+            self.pending_bytes += len(data)
+            self.write_pending(drain=False)
+        return len(data)
+    def add_file(self, arcname, file_path):
+        st = os.stat(file_path)
+        if st.st_size <= EXPORT_PARALLEL_MAX_ENTRY:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            count_file_read(file_path, len(data))
+            self.add_bytes(arcname, data, st.st_mtime, st.st_mode & 0o777)
+            yield
+            return hashlib.sha256(data).hexdigest(), len(data)
+        self.write_pending()
+        file_hash = hashlib.sha256()
+        read_bytes = 0
+        with open(file_path, 'rb') as src:
+            if self.format == 'tar.zst':
+                info = tarfile.TarInfo(arcname)
+                info.size = st.st_size
+                info.mtime = int(st.st_mtime)
+                info.mode = st.st_mode & 0o777
+                self.tar.addfile(info, HashingReader(src, file_hash))
+                read_bytes = st.st_size
+            else:
+                compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15) if self.level > 0 else None
+                self.zip.open_entry(arcname, st.st_mtime, st.st_mode & 0o777, zipfile.ZIP_DEFLATED if compressor else zipfile.ZIP_STORED, zip64=st.st_size > ZIP64_LIMIT)
+                crc = 0
+                while True:
+                    chunk = src.read(EXPORT_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    crc = zlib.crc32(chunk, crc)
+                    self.zip.write(compressor.compress(chunk) if compressor else chunk)
+                    file_hash.update(chunk)
+                    read_bytes += len(chunk)
+                    yield
+                if compressor:
+                    self.zip.write(compressor.flush())
+                self.zip.close_entry(crc, read_bytes)
+        count_file_read(file_path, read_bytes)
+        return file_hash.hexdigest(), read_bytes
+    def write_zip_entry(self, entry, payload, compress_type):
+        arcname, mtime, mode, crc, file_size = entry
+        self.zip.add_entry(arcname, mtime, mode, payload, compress_type, crc, file_size)
+    def write_pending(self, drain=True):
+        while self.pending and (drain or len(self.pending) > self.max_pending or self.pending_bytes > EXPORT_PARALLEL_MAX_PENDING_BYTES):
+            entry, future = self.pending.popleft()
+            self.pending_bytes -= entry[4]
+            self.write_zip_entry(entry, *future.result())
+    def close(self):
+        if self.format == 'tar.zst':
+            self.tar.close()
+            self.stream.close()
+            return
+        try:
+            self.write_pending()
+            self.zip.close()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+class HashingReader:
+    def __init__(self, fileobj, file_hash):
+        self.fileobj = fileobj
+        self.file_hash = file_hash
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        self.file_hash.update(data)
+        return data
+def iter_export_archive(archive, item_ids, progress=None, previous_hashes=None, full_scope=False):
+    manifest = []
+    hashes = {}
+    unchanged = []
+    failed = set()
+    registry_index = None
+    with PhaseTimer('export_plan'):
+        source_maps = plan_export_sources(item_ids)
+    def is_unchanged(full_id, content_hash):
+        hashes[full_id] = content_hash
+        if previous_hashes is not None and previous_hashes.get(full_id) == content_hash:
+            unchanged.append(full_id)
+            return True
+        return False
+    for position, full_id in enumerate(item_ids, 1):
+        try:
+            item_type, item_key = full_id.split('::', 1)
+            if item_type in ('YAML-Datei', 'Blueprint'):
+                file_path = os.path.join(CONFIG_PATH, item_key)
+                if os.path.exists(file_path):
+                    if previous_hashes is None or not is_unchanged(full_id, hash_export_file(file_path)):
+                        manifest_type = 'yaml' if item_type == 'YAML-Datei' else 'blueprint'
+                        zip_path = f"{manifest_type}/{item_key}"
+                        content_hash, size = yield from iter_timed('export_file_entry', archive.add_file(zip_path, file_path))
+                        hashes[full_id] = content_hash
+                        manifest.append({'id': full_id, 'type': manifest_type, 'zip_path': zip_path, 'restore_path': item_key, 'name': os.path.basename(item_key), 'size': size, 'hash': content_hash})
+            elif item_type == 'Helfer':
+                platform = item_key.split('::', 1)[0]
+                source, item_id = get_export_source(item_type, item_key)
+                config_data = source_maps[source].get(item_id)
+                manifest_type = 'helper_integration' if platform in INTEGRATION_HELPER_PLATFORMS else 'helper_legacy'
+                if config_data:
+                    if registry_index is None:
+                        with PhaseTimer('export_entity_registry'):
+                            registry_index = get_entity_registry_index()
+                    registry_entries = get_helper_registry_entries(registry_index, platform, item_id)
+                    content_hash = hash_helper_export(config_data, registry_entries)
+                    if not is_unchanged(full_id, content_hash):
+                        filename = f"helper/{platform}_{item_id}.json"
+                        with PhaseTimer('export_item_entry'):
+                            size = archive.add_bytes(filename, json.dumps(config_data, indent=2))
+                        manifest_entry = {
+                            'id': full_id, 
+                            'type': manifest_type, 
+                            'platform': platform,
+                            'item_id': item_id,
+                            'zip_path': filename, 
+                            'name': config_data.get('name') or config_data.get('title') or item_id,
+                            'size': size,
+                            'hash': content_hash
+                        }
+                        if registry_entries:
+                            registry_path = f"entity_registry/{platform}_{item_id}.json"
+                            with PhaseTimer('export_item_entry'):
+                                archive.add_bytes(registry_path, json.dumps(registry_entries, indent=2))
+                            manifest_entry['registry_zip_path'] = registry_path
+                        manifest.append(manifest_entry)
+            elif item_type in STORAGE_FILES_MAP:
+                storage_item = source_maps[('storage_item', item_type)].get(item_key)
+                if storage_item:
+                    content_hash = hash_export_content(storage_item)
+                    if not is_unchanged(full_id, content_hash):
+                        filename = f"storage_item/{item_type.lower()}_{item_key}.json"
+                        with PhaseTimer('export_item_entry'):
+                            size = archive.add_bytes(filename, json.dumps(storage_item, indent=2))
+                        manifest.append({'id': full_id, 'type': 'storage_item', 'storage_key': STORAGE_FILES_MAP[item_type]['file_key'], 'item_id': item_key, 'zip_path': filename, 'name': storage_item.get('alias') or storage_item.get('name') or item_key, 'size': size, 'hash': content_hash})
+            elif item_type in YAML_LIST_MAP:
+                yaml_item = source_maps[('yaml_item', item_type)].get(item_key)
+                if yaml_item:
+                    content_hash = hash_export_content(yaml_item)
+                    if not is_unchanged(full_id, content_hash):
+                        clean_type = item_type.lower().replace(' (yaml)', '').replace(' ', '_')
+                        filename = f"yaml_item/{clean_type}_{item_key}.yaml"
+                        with PhaseTimer('export_item_entry'):
+                            string_stream = io.StringIO()
+                            yaml.dump(yaml_item, string_stream)
+                            size = archive.add_bytes(filename, string_stream.getvalue())
+                        manifest.append({'id': full_id, 'type': 'yaml_item', 'yaml_list_file': YAML_LIST_MAP[item_type]['file'], 'item_id': item_key, 'zip_path': filename, 'name': yaml_item.get('alias') or yaml_item.get('name') or item_key, 'size': size, 'hash': content_hash})
+        except Exception as e:
+            app.logger.warning(f"Konnte Item {full_id} nicht exportieren: {e}")
+            failed.add(full_id)
+            hashes.pop(full_id, None)
+            if full_id in unchanged:
+                unchanged.remove(full_id)
+        if progress:
+            progress(position, len(item_ids))
+        yield
+    deletions = []
+    if previous_hashes:
+        scope = previous_hashes if full_scope else set(item_ids)
+        existing = {item['id'] for item in get_current_inventory()[1]}
+        deletions = sorted(full_id for full_id in previous_hashes if full_id in scope and full_id not in existing and full_id not in failed)
+    archive.add_bytes('export_manifest.json', json.dumps({'version': EXPORT_MANIFEST_VERSION, 'created': time.time(), 'entries': manifest}, indent=2))
+    if previous_hashes is not None:
+        archive.add_bytes('export_incremental.json', json.dumps({'unchanged': unchanged, 'deletions': deletions}, indent=2))
+    count_processed_items('export', [entry['id'] for entry in manifest])
+    return {'manifest': manifest, 'hashes': hashes, 'deletions': deletions}
+def build_export_archive(archive, item_ids, progress=None, previous_hashes=None, full_scope=False):
+    steps = iter_timed('export_archive', iter_export_archive(archive, item_ids, progress, previous_hashes, full_scope))
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+def stream_export_archive(item_ids, previous_hashes=None, baseline=None, archive_options=None):
+    buffer = ExportStreamBuffer()
+    try:
+        with ExportArchiveWriter(buffer, **(archive_options or {})) as archive:
+            steps = iter_timed('export_archive', iter_export_archive(archive, item_ids, previous_hashes=previous_hashes))
+            while True:
+                try:
+                    next(steps)
+                except StopIteration as stop:
+                    export_result = stop.value
+                    break
+                chunk = buffer.pop()
+                if chunk:
+                    yield chunk
+        chunk = buffer.pop()
+        if chunk:
+            yield chunk
+        if baseline:
+            save_export_baseline(baseline, export_result)
+    except Exception as e:
+        app.logger.error(f"Fehler beim Streamen des Exports: {e}")
+        raise
+def get_export_baseline_path(baseline):
+    return os.path.join(EXPORT_BASELINES_PATH, f"{baseline}.json")
+def load_export_baseline(baseline):
+    data = load_json(get_export_baseline_path(baseline), readonly=True)
+    return data if isinstance(data, dict) and isinstance(data.get('hashes'), dict) else None
+def save_export_baseline(baseline, export_result, replace=False):
+    os.makedirs(EXPORT_BASELINES_PATH, exist_ok=True)
+    with FILE_LOCKS['export_baselines']:
+        stored = None if replace else load_export_baseline(baseline)
+        hashes = dict(stored['hashes']) if stored else {}
+        hashes.update(export_result['hashes'])
+        for full_id in export_result['deletions']:
+            hashes.pop(full_id, None)
+        return save_json(get_export_baseline_path(baseline), {'created': time.time(), 'hashes': hashes})
+def get_previous_export_hashes(previous_manifest):
+    if isinstance(previous_manifest, dict):
+        previous_manifest = previous_manifest.get('entries', [])
+    if not isinstance(previous_manifest, list):
+        raise ValueError("previous_manifest muss eine Liste von Manifest-Einträgen sein")
+    return {entry['id']: entry.get('hash') for entry in previous_manifest if isinstance(entry, dict) and 'id' in entry}
+def parse_export_request(data):
+    item_ids = data.get('item_ids', [])
+    baseline = data.get('baseline')
+    if baseline is not None and not EXPORT_BASELINE_PATTERN.match(str(baseline)):
+        raise ValueError("Ungültiger Name für die Export-Basis")
+    previous_hashes = None
+    if data.get('incremental'):
+        if data.get('previous_manifest') is not None:
+            previous_hashes = get_previous_export_hashes(data['previous_manifest'])
+        else:
+            baseline = baseline or EXPORT_DEFAULT_BASELINE
+            stored = load_export_baseline(baseline)
+            previous_hashes = stored['hashes'] if stored else {}
+    return item_ids, previous_hashes, baseline, parse_export_archive_options(data)
+def parse_export_archive_options(data):
+    archive_format = data.get('format') or get_addon_option('export_format', 'zip')
+    if archive_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unbekanntes Archivformat '{archive_format}' (erlaubt: {', '.join(EXPORT_FORMATS)})")
+    if archive_format == 'tar.zst' and zstandard is None:
+        raise ValueError("Für tar.zst wird das Python-Paket zstandard benötigt")
+    min_level, max_level, default_level = EXPORT_COMPRESSION_LEVELS[archive_format]
+    level = data.get('compression_level')
+    if level is None:
+        level = get_addon_option('export_compression_level', default_level)
+        level = min(max(int(level), min_level), max_level)
+    try:
+        level = int(level)
+    except (TypeError, ValueError):
+        raise ValueError("compression_level muss eine Zahl sein")
+    if not min_level <= level <= max_level:
+        raise ValueError(f"compression_level muss für {archive_format} zwischen {min_level} und {max_level} liegen")
+    return {'archive_format': archive_format, 'level': level}
+def get_export_download_name(prefix, archive_options):
+    return f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}{EXPORT_FORMATS[archive_options['archive_format']]['extension']}"
+def list_scheduled_backups(target_path):
+    try:
+        names = os.listdir(target_path)
+    except FileNotFoundError:
+        return []
+    return sorted((name, match.group(1) == 'voll') for name in names if (match := BACKUP_ARCHIVE_PATTERN.match(name)))
+def needs_full_backup(archives):
+    full_every = int(get_addon_option('backup_full_every', 0))
+    since_full = 0
+    for name, is_full in reversed(archives):
+        if is_full:
+            return full_every > 0 and since_full >= full_every - 1
+        since_full += 1
+    return True
+def prune_scheduled_backups(target_path):
+    keep = int(get_addon_option('backup_keep', 0))
+    archives = list_scheduled_backups(target_path)
+    if keep <= 0 or len(archives) <= keep:
+        return
+    cutoff = len(archives) - keep
+    while cutoff > 0 and not archives[cutoff][1]:
+        cutoff -= 1
+    for name, is_full in archives[:cutoff]:
+        try:
+            os.remove(os.path.join(target_path, name))
+            app.logger.info(f"Alte Sicherung {name} entfernt.")
+        except OSError as e:
+            app.logger.warning(f"Alte Sicherung {name} konnte nicht entfernt werden: {e}")
+def run_scheduled_backup():
+    target = get_addon_option('backup_target', 'backup')
+    target_path = os.path.join(BACKUP_TARGET_PATHS.get(target, BACKUP_TARGET_PATHS['backup']), 'import_export_helfer')
+    stored = load_export_baseline(SCHEDULED_BACKUP_BASELINE)
+    if stored and needs_full_backup(list_scheduled_backups(target_path)):
+        stored = None
+    archive_options = parse_export_archive_options({})
+    item_ids = [item['id'] for item in get_items()]
+    os.makedirs(target_path, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=target_path, suffix='.tmp')
+    os.close(fd)
+    try:
+        with open(tmp_path, 'wb') as f, ExportArchiveWriter(f, **archive_options) as archive:
+            export_result = build_export_archive(archive, item_ids, previous_hashes=stored['hashes'] if stored else {}, full_scope=True)
+        if stored and not export_result['manifest'] and not export_result['deletions']:
+            os.remove(tmp_path)
+            app.logger.info("Geplante Sicherung: keine Änderungen seit der letzten Sicherung.")
+        else:
+            archive_name = f"Sicherung_{time.strftime('%Y%m%d_%H%M%S')}_{'inkrementell' if stored else 'voll'}{EXPORT_FORMATS[archive_options['archive_format']]['extension']}"
+            os.replace(tmp_path, os.path.join(target_path, archive_name))
+            app.logger.info(f"Geplante Sicherung {archive_name} geschrieben: {len(export_result['manifest'])} geändert, {len(export_result['deletions'])} gelöscht.")
+        save_export_baseline(SCHEDULED_BACKUP_BASELINE, export_result, replace=True)
+        prune_scheduled_backups(target_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+def run_backup_scheduler(interval):
+    os.makedirs(LOCKS_PATH, exist_ok=True)
+    lock_file = open(os.path.join(LOCKS_PATH, 'backup_scheduler.lock'), 'a')
+    while True:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            break
+        except OSError:
+            time.sleep(BACKUP_SCHEDULER_CHECK_INTERVAL)
+    while True:
+        stored = load_export_baseline(SCHEDULED_BACKUP_BASELINE)
+        wait = (stored['created'] + interval - time.time()) if stored else 0
+        if wait > 0:
+            time.sleep(min(wait, BACKUP_SCHEDULER_CHECK_INTERVAL))
+            continue
+        try:
+            run_scheduled_backup()
+        except Exception as e:
+            app.logger.error(f"Geplante Sicherung fehlgeschlagen: {e}")
+            time.sleep(BACKUP_SCHEDULER_CHECK_INTERVAL)
+def start_backup_scheduler():
+    interval_hours = int(get_addon_option('backup_interval_hours', 0))
+    if interval_hours <= 0:
+        return
+    threading.Thread(target=run_backup_scheduler, args=(interval_hours * 3600,), name='backup-scheduler', daemon=True).start()
+    app.logger.info(f"Geplante inkrementelle Sicherung alle {interval_hours} Stunden aktiviert.")
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is not None:
+        labels = (('endpoint', request.url_rule.rule if request.url_rule else 'unbekannt'), ('method', request.method), ('status', str(response.status_code)))
+        response.call_on_close(lambda: observe_metric('ieh_http_request_duration_seconds', labels, time.perf_counter() - started))
+    return response
 @app.route('/')
 def index():
     return render_template('index.html')
+@app.route('/api/metrics')
+def api_metrics():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4; charset=utf-8')
 @app.route('/api/items')
 def api_get_items():
+    if not request.args:
+        try:
+            return build_items_response(get_items_response_entry())
+        except Exception as e:
+            app.logger.error(f"API Fehler /api/items: {e}")
+            return jsonify({"error": "Elemente konnten nicht geladen werden"}), 500
     try:
-        items = get_items()
-        return jsonify(items)
+        offset = int(request.args.get('offset', 0))
+        limit = int(request.args.get('limit', ITEMS_PAGE_DEFAULT_LIMIT))
+    except ValueError:
+        return jsonify({"error": "offset und limit müssen Zahlen sein"}), 400
+    sort = request.args.get('sort', 'type')
+    order = request.args.get('order', 'asc')
+    match = request.args.get('match', 'contains')
+    if offset < 0 or limit < 1 or limit > ITEMS_PAGE_MAX_LIMIT:
+        return jsonify({"error": f"offset muss >= 0 und limit zwischen 1 und {ITEMS_PAGE_MAX_LIMIT} liegen"}), 400
+    if sort not in ITEM_SORT_FIELDS or order not in ('asc', 'desc') or match not in ('contains', 'prefix'):
+        return jsonify({"error": "Ungültige Sortierung oder Suchart"}), 400
+    try:
+        search_index = get_item_search_index()
+        return jsonify(query_items(
+            search_index,
+            item_type=request.args.get('type'),
+            source=request.args.get('source'),
+            query=request.args.get('q'),
+            match=match,
+            sort=sort,
+            order=order,
+            offset=offset,
+            limit=limit
+        ))
     except Exception as e:
         app.logger.error(f"API Fehler /api/items: {e}")
         return jsonify({"error": "Elemente konnten nicht geladen werden"}), 500
@@ -345,169 +2159,680 @@ def api_get_items():
 def api_export_items():
     try:
         data = request.get_json()
-        item_ids = data.get('item_ids', [])
-        memory_file = io.BytesIO()
-        manifest = []
-        with zipfile.ZipFile(memory_file, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for full_id in item_ids:
-                try:
-                    item_type, item_key = full_id.split('::', 1)
-                    if item_type == 'YAML-Datei':
-                        file_path = os.path.join(CONFIG_PATH, item_key)
-                        if os.path.exists(file_path):
-                            zf.write(file_path, arcname=f"yaml/{item_key}")
-                            manifest.append({'id': full_id, 'type': 'yaml', 'zip_path': f"yaml/{item_key}", 'restore_path': item_key, 'name': os.path.basename(item_key)})
-                    elif item_type == 'Blueprint':
-                        file_path = os.path.join(CONFIG_PATH, item_key)
-                        if os.path.exists(file_path):
-                            zf.write(file_path, arcname=f"blueprint/{item_key}")
-                            manifest.append({'id': full_id, 'type': 'blueprint', 'zip_path': f"blueprint/{item_key}", 'restore_path': item_key, 'name': os.path.basename(item_key)})
-                    elif item_type == 'Helfer':
-                        platform, item_id = item_key.split('::', 1)
-                        config_data = None
-                        manifest_type = ''
-                        if platform in INTEGRATION_HELPER_PLATFORMS:
-                            config_data = get_config_entry_by_id(item_id)
-                            manifest_type = 'helper_integration'
-                        else:
-                            config_data = get_legacy_helper_by_id(platform, item_id)
-                            manifest_type = 'helper_legacy'
-                        if config_data:
-                            filename = f"helper/{platform}_{item_id}.json"
-                            zf.writestr(filename, json.dumps(config_data, indent=2))
-                            manifest.append({
-                                'id': full_id, 
-                                'type': manifest_type, 
-                                'platform': platform,
-                                'item_id': item_id,
-                                'zip_path': filename, 
-                                'name': config_data.get('name') or config_data.get('title')
-                            })
-                    elif item_type in STORAGE_FILES_MAP:
-                        storage_item = get_storage_item_by_id(item_type, item_key)
-                        if storage_item:
-                            filename = f"storage_item/{item_type.lower()}_{item_key}.json"
-                            zf.writestr(filename, json.dumps(storage_item, indent=2))
-                            manifest.append({'id': full_id, 'type': 'storage_item', 'storage_key': STORAGE_FILES_MAP[item_type]['file_key'], 'item_id': item_key, 'zip_path': filename, 'name': storage_item.get('alias') or storage_item.get('name')})
-                    elif item_type in YAML_LIST_MAP:
-                        yaml_item = get_yaml_list_item_by_id(item_type, item_key)
-                        if yaml_item:
-                            clean_type = item_type.lower().replace(' (yaml)', '').replace(' ', '_')
-                            filename = f"yaml_item/{clean_type}_{item_key}.yaml"
-                            string_stream = io.StringIO()
-                            yaml.dump(yaml_item, string_stream)
-                            zf.writestr(filename, string_stream.getvalue())
-                            manifest.append({'id': full_id, 'type': 'yaml_item', 'yaml_list_file': YAML_LIST_MAP[item_type]['file'], 'item_id': item_key, 'zip_path': filename, 'name': yaml_item.get('alias') or yaml_item.get('name') or item_key})
-                except Exception as e:
-                    app.logger.warning(f"Konnte Item {full_id} nicht exportieren: {e}")
-            zf.writestr('export_manifest.json', json.dumps(manifest, indent=2))
-        memory_file.seek(0)
-        hostname = "Backup"
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        download_name = f"{hostname}_{timestamp}.zip"
+        try:
+            item_ids, previous_hashes, baseline, archive_options = parse_export_request(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        export_mode = data.get('mode', 'buffer')
+        if export_mode not in EXPORT_MODES:
+            return jsonify({"error": f"Unbekannter Modus '{export_mode}' (erlaubt: {', '.join(EXPORT_MODES)})"}), 400
+        download_name = get_export_download_name("Backup", archive_options)
+        mimetype = EXPORT_FORMATS[archive_options['archive_format']]['mimetype']
+        if export_mode == 'stream':
+            return Response(
+                stream_with_context(stream_export_archive(item_ids, previous_hashes, baseline, archive_options)),
+                mimetype=mimetype,
+                headers={'Content-Disposition': f'attachment; filename={download_name}'}
+            )
+        spool_file = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_MEMORY)
+        with ExportArchiveWriter(spool_file, **archive_options) as archive:
+            export_result = build_export_archive(archive, item_ids, previous_hashes=previous_hashes)
+        if baseline:
+            save_export_baseline(baseline, export_result)
+        spool_file.seek(0)
         return send_file(
-            memory_file,
-            mimetype='application/zip',
+            spool_file,
+            mimetype=mimetype,
             as_attachment=True,
             download_name=download_name
         )
     except Exception as e:
         app.logger.error(f"API Fehler /api/export: {e}")
         return jsonify({"error": f"Export fehlgeschlagen: {e}"}), 500
+class ImportArchiveError(Exception):
+    pass
+def read_import_manifest(zf):
+    if 'export_manifest.json' not in zf.namelist():
+        raise ImportArchiveError("ZIP-Datei ist kein gültiges Backup (manifest.json fehlt)")
+    manifest_data = json_loads(zf.read('export_manifest.json'))
+    if isinstance(manifest_data, dict):
+        if not isinstance(manifest_data.get('version'), int) or manifest_data['version'] > EXPORT_MANIFEST_VERSION:
+            raise ImportArchiveError(f"Manifest-Version {manifest_data.get('version')} wird nicht unterstützt, bitte das Add-on aktualisieren")
+        manifest_data = manifest_data.get('entries')
+    if not isinstance(manifest_data, list):
+        raise ImportArchiveError("ZIP-Datei ist kein gültiges Backup (Manifest ungültig)")
+    return manifest_data
+class UploadSessionError(Exception):
+    pass
+class UploadSession:
+    def __init__(self, session_id, path, manifest):
+        self.session_id = session_id
+        self.path = path
+        self.manifest = manifest
+        self.manifest_by_path = {item['zip_path']: item for item in manifest}
+        self.entries = {}
+        self.size = 0
+        self.lock = threading.Lock()
+    def open_archive(self):
+        return zipfile.ZipFile(self.path, 'r')
+    def read_bytes(self, zip_path):
+        with self.open_archive() as zf:
+            return zf.read(zip_path)
+    def read_item_data(self, zf, manifest_item):
+        zip_path = manifest_item['zip_path']
+        with self.lock:
+            item_data = self.entries.get(zip_path)
+        if item_data is None:
+            item_data = read_import_item_data(zf, manifest_item)
+            size = estimate_document_size(item_data)
+            with self.lock:
+                cached = zip_path not in self.entries and self.size + size <= UPLOAD_SESSION_MEMORY_MAX_BYTES
+                if cached:
+                    self.entries[zip_path] = item_data
+                    self.size += size
+            if not cached:
+                return item_data
+            trim_upload_sessions(self.session_id)
+        return copy.deepcopy(item_data)
+def get_upload_session_path(session_id):
+    return os.path.join(UPLOADS_PATH, f"{session_id}.zip")
+def trim_upload_sessions(keep_session_id=None):
+    with UPLOAD_SESSIONS_LOCK:
+        total = sum(session.size for session in upload_sessions.values())
+        for session_id in list(upload_sessions):
+            if total <= UPLOAD_SESSION_MEMORY_MAX_BYTES:
+                break
+            if session_id != keep_session_id:
+                total -= upload_sessions.pop(session_id).size
+def prune_upload_sessions(incoming_size=0):
+    max_bytes = int(get_addon_option('upload_session_max_mb', 256)) * 1024 * 1024
+    now = time.time()
+    uploads = []
+    for path in glob.glob(os.path.join(UPLOADS_PATH, '*.zip')):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if now - stat.st_mtime > UPLOAD_SESSION_TTL_SECONDS:
+            remove_upload_session(os.path.basename(path)[:-len('.zip')])
+        else:
+            uploads.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in uploads) + incoming_size
+    for _, size, path in sorted(uploads):
+        if total <= max_bytes:
+            break
+        remove_upload_session(os.path.basename(path)[:-len('.zip')])
+        total -= size
+def remove_upload_session(session_id):
+    with UPLOAD_SESSIONS_LOCK:
+        upload_sessions.pop(session_id, None)
+    try:
+        os.remove(get_upload_session_path(session_id))
+    except OSError:
+        pass
+def convert_tar_zst_archive(src_path, dest_path):
+    if zstandard is None:
+        raise ImportArchiveError("tar.zst-Archive können nur mit installiertem Python-Paket zstandard gelesen werden")
+    tmp_path = f"{dest_path}.tmp"
+    try:
+        with open(src_path, 'rb') as src, zstandard.ZstdDecompressor().stream_reader(src) as reader, tarfile.open(fileobj=reader, mode='r|') as tar, zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_STORED) as zf:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                zinfo = zipfile.ZipInfo(member.name, date_time=time.localtime(max(member.mtime, 315532800))[:6])
+                zinfo.file_size = member.size
+                with tar.extractfile(member) as data, zf.open(zinfo, 'w') as dest:
+                    shutil.copyfileobj(data, dest, EXPORT_CHUNK_SIZE)
+        os.replace(tmp_path, dest_path)
+    except (zstandard.ZstdError, tarfile.TarError) as e:
+        raise ImportArchiveError(f"Ungültiges tar.zst-Archiv: {e}")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+def store_upload_session(file):
+    os.makedirs(UPLOADS_PATH, exist_ok=True)
+    file_hash = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOADS_PATH, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                chunk = file.stream.read(EXPORT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                file_hash.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+        session_id = file_hash.hexdigest()
+        prune_upload_sessions(size)
+        session_path = get_upload_session_path(session_id)
+        if os.path.exists(session_path):
+            os.remove(tmp_path)
+            os.utime(session_path)
+        else:
+            with open(tmp_path, 'rb') as f:
+                magic = f.read(len(ZSTD_FRAME_MAGIC))
+            if magic == ZSTD_FRAME_MAGIC:
+                with PhaseTimer('import_archive_convert'):
+                    convert_tar_zst_archive(tmp_path, session_path)
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, session_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    try:
+        return get_upload_session(session_id)
+    except Exception:
+        remove_upload_session(session_id)
+        raise
+def get_upload_session(session_id):
+    if not UPLOAD_SESSION_ID_PATTERN.match(session_id or ''):
+        return None
+    session_path = get_upload_session_path(session_id)
+    try:
+        if time.time() - os.stat(session_path).st_mtime > UPLOAD_SESSION_TTL_SECONDS:
+            remove_upload_session(session_id)
+            return None
+        os.utime(session_path)
+    except OSError:
+        with UPLOAD_SESSIONS_LOCK:
+            upload_sessions.pop(session_id, None)
+        return None
+    with UPLOAD_SESSIONS_LOCK:
+        session = upload_sessions.get(session_id)
+        if session is not None:
+            upload_sessions.move_to_end(session_id)
+            return session
+    with zipfile.ZipFile(session_path, 'r') as zf, PhaseTimer('import_manifest_read'):
+        session = UploadSession(session_id, session_path, read_import_manifest(zf))
+    with UPLOAD_SESSIONS_LOCK:
+        session = upload_sessions.setdefault(session_id, session)
+        upload_sessions.move_to_end(session_id)
+    return session
+def require_upload_session(session_id):
+    session = get_upload_session(session_id)
+    if session is None:
+        raise UploadSessionError("Upload-Sitzung nicht gefunden oder abgelaufen. Bitte Datei erneut hochladen.")
+    return session
+def get_request_upload_session():
+    session_id = request.form.get('session_id')
+    if session_id:
+        return require_upload_session(session_id)
+    if 'file' not in request.files:
+        return None
+    return store_upload_session(request.files['file'])
+def get_import_statuses(manifest, compare_hashes=True):
+    with PhaseTimer('analyze_existing_ids'):
+        existing_item_ids = get_existing_item_ids([item['id'] for item in manifest])
+    live_hashes = {}
+    if compare_hashes:
+        with PhaseTimer('analyze_live_hashes'):
+            live_hashes = get_live_item_hashes([item['id'] for item in manifest if item['id'] in existing_item_ids and item.get('hash')])
+    statuses = {}
+    for item in manifest:
+        item_id = item['id']
+        status = "conflict" if item_id in existing_item_ids else "new"
+        if status == "conflict" and item.get('hash') and live_hashes.get(item_id) == item['hash']:
+            status = "unchanged"
+        statuses[item_id] = status
+    return statuses
+def analyze_import_archive(session, progress=None):
+    manifest = session.manifest
+    statuses = get_import_statuses(manifest)
+    analysis_results = []
+    for item in manifest:
+        item_id = item['id']
+        status = statuses[item_id]
+        item_name = item.get('name')
+        display_type = item_id.split('::')[0]
+        zip_path = item['zip_path']
+        if not item_name:
+            try:
+                item_bytes = session.read_bytes(zip_path)
+                item_data = None
+                item_type_internal = item.get('type')
+                if zip_path.endswith('.json'):
+                    item_data = json_loads(item_bytes)
+                elif zip_path.endswith('.yaml'):
+                    item_data = load_yaml_safe_from_string(item_bytes)
+                if item_type_internal == 'helper_legacy':
+                    item_name = item_data.get('name')
+                    display_type = "Helfer"
+                elif item_type_internal == 'helper_integration':
+                    item_name = item_data.get('title')
+                    display_type = "Helfer"
+                elif item_type_internal == 'storage_item':
+                    item_name = item_data.get('alias') or item_data.get('name')
+                elif item_type_internal == 'yaml_item':
+                    item_name = item_data.get('alias') or item_data.get('name') or item.get('item_id')
+                elif item_type_internal == 'yaml':
+                    item_name = os.path.basename(item.get('restore_path', 'N/A'))
+                    display_type = "YAML-Datei"
+                elif item_type_internal == 'blueprint':
+                    if item_data:
+                        item_name = item_data.get('blueprint', {}).get('name') or os.path.basename(item.get('restore_path', 'N/A'))
+                    else:
+                        item_name = os.path.basename(item.get('restore_path', 'N/A'))
+                    display_type = "Blueprint"
+                else:
+                    item_name = 'N/A'
+            except Exception as e:
+                app.logger.warning(f"Konnte Fallback-Namen für {item_id} nicht lesen: {e}")
+                item_name = 'N/A (Lese-Fehler)'
+        analysis_results.append({
+            'id': item_id,
+            'name': item_name or 'N/A',
+            'type': display_type,
+            'status': status,
+            'size': item.get('size'),
+            'zip_path': item['zip_path']
+        })
+        if progress:
+            progress(len(analysis_results), len(manifest))
+    count_processed_items('analyze', [result['id'] for result in analysis_results], [(('status', result['status']),) for result in analysis_results])
+    app.logger.info(f"Analyse abgeschlossen. {len(analysis_results)} Elemente gefunden.")
+    return analysis_results
 @app.route('/api/analyze_import', methods=['POST'])
 def api_analyze_import():
     app.logger.info("Import-Analyse gestartet")
     if 'file' not in request.files:
         return jsonify({"error": "Keine Datei im Request"}), 400
     file = request.files['file']
-    if file.filename == '' or not file.filename.endswith('.zip'):
-        return jsonify({"error": "Ungültige Datei (nur .zip erlaubt)"}), 400
-    try:
-        existing_item_ids = get_existing_item_ids()
-        analysis_results = []
-        with zipfile.ZipFile(file, 'r') as zf:
-            if 'export_manifest.json' not in zf.namelist():
-                return jsonify({"error": "ZIP-Datei ist kein gültiges Backup (manifest.json fehlt)"}), 400
-            manifest_data = zf.read('export_manifest.json')
-            manifest = json.loads(manifest_data)
-            for item in manifest:
-                item_id = item['id']
-                status = "conflict" if item_id in existing_item_ids else "new"
-                item_name = item.get('name')
-                display_type = item_id.split('::')[0]
-                zip_path = item['zip_path']
-                if not item_name:
-                    try:
-                        item_data_str = zf.read(zip_path).decode('utf-8')
-                        item_data = None
-                        item_type_internal = item.get('type')
-                        if zip_path.endswith('.json'):
-                            item_data = json.loads(item_data_str)
-                        elif zip_path.endswith('.yaml'):
-                            item_data = load_yaml_from_string(item_data_str)
-                        if item_type_internal == 'helper_legacy':
-                            item_name = item_data.get('name')
-                            display_type = "Helfer"
-                        elif item_type_internal == 'helper_integration':
-                            item_name = item_data.get('title')
-                            display_type = "Helfer"
-                        elif item_type_internal == 'storage_item':
-                            item_name = item_data.get('alias') or item_data.get('name')
-                        elif item_type_internal == 'yaml_item':
-                            item_name = item_data.get('alias') or item_data.get('name') or item.get('item_id')
-                        elif item_type_internal == 'yaml':
-                            item_name = os.path.basename(item.get('restore_path', 'N/A'))
-                            display_type = "YAML-Datei"
-                        elif item_type_internal == 'blueprint':
-                            if item_data:
-                                item_name = item_data.get('blueprint', {}).get('name') or os.path.basename(item.get('restore_path', 'N/A'))
-                            else:
-                                item_name = os.path.basename(item.get('restore_path', 'N/A'))
-                            display_type = "Blueprint"
-                        else:
-                            item_name = 'N/A'
-                    except Exception as e:
-                        app.logger.warning(f"Konnte Fallback-Namen für {item_id} nicht lesen: {e}")
-                        item_name = 'N/A (Lese-Fehler)'
-                analysis_results.append({
-                    'id': item_id,
-                    'name': item_name or 'N/A',
-                    'type': display_type,
-                    'status': status,
-                    'zip_path': item['zip_path']
-                })
-        app.logger.info(f"Analyse abgeschlossen. {len(analysis_results)} Elemente gefunden.")
-        return jsonify(analysis_results)
+    if file.filename == '' or not file.filename.endswith(IMPORT_ARCHIVE_EXTENSIONS):
+        return jsonify({"error": "Ungültige Datei (nur .zip oder .tar.zst erlaubt)"}), 400
+    try:
+        session = store_upload_session(file)
+        return jsonify({'session_id': session.session_id, 'items': analyze_import_archive(session)})
+    except ImportArchiveError as e:
+        return jsonify({"error": str(e)}), 400
     except zipfile.BadZipFile:
         return jsonify({"error": "Ungültige ZIP-Datei"}), 400
     except Exception as e:
         app.logger.error(f"API Fehler /api/analyze_import: {e}")
         return jsonify({"error": f"Import-Analyse fehlgeschlagen: {e}"}), 500
-def execute_import_decision(manifest_item, item_data, decision, zf):
+def get_import_target_key(manifest_item):
+    item_type_internal = manifest_item['type']
+    if item_type_internal == 'helper_legacy':
+        return ('helper_legacy', manifest_item['platform'])
+    elif item_type_internal == 'helper_integration':
+        return ('helper_integration', 'core.config_entries')
+    elif item_type_internal == 'storage_item':
+        config = STORAGE_FILES_MAP.get(manifest_item['id'].split('::')[0])
+        if not config: raise Exception(f"Unbekannter Storage-Typ: {manifest_item['id']}")
+        return ('storage_item', config['file_key'])
+    elif item_type_internal == 'yaml_item':
+        return ('yaml_item', manifest_item['yaml_list_file'])
+    return None
+def get_import_target_lock(target_key):
+    kind, key = target_key
+    if kind == 'helper_legacy':
+        return FILE_LOCKS.get(key, FILE_LOCKS['generic_helper'])
+    return FILE_LOCKS[key]
+class YamlSpliceError(Exception):
+    pass
+class YamlListSplice:
+    def __init__(self, text):
+        self.form = None
+        self.header = []
+        self.entries = []
+        self.changes = []
+        lines = text.splitlines(keepends=True)
+        self.newline = '\r\n' if lines and lines[0].endswith('\r\n') else '\n'
+        if lines and not lines[-1].endswith('\n'):
+            lines[-1] += self.newline
+        for line in lines:
+            stripped = line.strip()
+            if not stripped or line.startswith('#'):
+                (self.entries[-1]['lines'] if self.entries else self.header).append(line)
+                continue
+            if line.startswith(('---', '...', '%', '\t')):
+                raise YamlSpliceError(f"Dokument-Markierung oder Tabulator: {stripped[:40]}")
+            if YAML_SPLICE_ALIAS_PATTERN.search(line):
+                raise YamlSpliceError(f"Alias-Verweis: {stripped[:40]}")
+            if line.startswith(' '):
+                if not self.entries:
+                    raise YamlSpliceError("Eingerückter Inhalt vor dem ersten Eintrag")
+                self.entries[-1]['lines'].append(line)
+                continue
+            if stripped == '[]' and self.form is None and not self.entries:
+                self.form = 'list'
+                continue
+            if line.startswith('- ') or stripped == '-':
+                form = 'list'
+                key = self.parse_list_id(line)
+            else:
+                match = YAML_SPLICE_KEY_PATTERN.match(line)
+                if not match:
+                    raise YamlSpliceError(f"Unbekannte Struktur: {stripped[:40]}")
+                form = 'dict'
+                key = self.parse_scalar(match.group(1))
+            if self.form is not None and form != self.form:
+                raise YamlSpliceError("Gemischte Listen- und Schlüsselstruktur")
+            self.form = form
+            self.entries.append({'key': key, 'lines': [line], 'trailer': []})
+        for entry in self.entries:
+            entry_lines = entry['lines']
+            while len(entry_lines) > 1 and (not entry_lines[-1].strip() or entry_lines[-1].startswith('#')):
+                entry['trailer'].insert(0, entry_lines.pop())
+            if self.form == 'list' and entry['key'] is None:
+                for line in entry_lines[1:]:
+                    key = self.parse_list_id(line)
+                    if key is not None:
+                        entry['key'] = key
+                        break
+        if self.form is None:
+            self.form = 'list'
+    def parse_scalar(self, text):
+        try:
+            value = safe_yaml.load(text)
+        except Exception:
+            raise YamlSpliceError(f"Schlüssel nicht lesbar: {text[:40]}")
+        if isinstance(value, (dict, list)):
+            raise YamlSpliceError(f"Schlüssel ist kein Skalar: {text[:40]}")
+        return value
+    def parse_list_id(self, line):
+        match = YAML_SPLICE_ID_PATTERN.match(line)
+        if not match:
+            return None
+        return self.parse_scalar(match.group(1) or '')
+    def check(self, document):
+        if document is None and not self.entries:
+            return
+        if self.form == 'list':
+            if not isinstance(document, list) or len(document) != len(self.entries):
+                raise YamlSpliceError("Einträge stimmen nicht mit der Datei überein")
+            for value, entry in zip(document, self.entries):
+                if (value.get('id') if isinstance(value, dict) else None) != entry['key']:
+                    raise YamlSpliceError(f"ID '{entry['key']}' stimmt nicht mit der Datei überein")
+        elif not isinstance(document, dict) or list(document) != [entry['key'] for entry in self.entries]:
+            raise YamlSpliceError("Schlüssel stimmen nicht mit der Datei überein")
+    def find(self, key):
+        for i, entry in enumerate(self.entries):
+            if entry['key'] == key:
+                return i
+        return None
+    def match_key_line(self, line):
+        return (YAML_SPLICE_ID_PATTERN if self.form == 'list' else YAML_SPLICE_KEY_PATTERN).match(line)
+    def find_key_scalar(self, lines):
+        for line in lines if self.form == 'list' else lines[:1]:
+            match = self.match_key_line(line)
+            if match:
+                return match.group(1)
+        return None
+    def format_key_scalar(self, value, template):
+        if not isinstance(value, str) or not template:
+            return None
+        if template[0] == "'":
+            return "'" + value.replace("'", "''") + "'"
+        if template[0] == '"':
+            return json.dumps(value, ensure_ascii=False)
+        return None
+    def render_entry(self, key, item_data, scalar=None, template=None):
+        stream = io.StringIO()
+        with PhaseTimer('yaml_dump'):
+            yaml.dump([item_data] if self.form == 'list' else {key: item_data}, stream)
+        lines = stream.getvalue().splitlines(keepends=True)
+        for i, line in enumerate(lines if self.form == 'list' else lines[:1]):
+            match = self.match_key_line(line)
+            if not match:
+                continue
+            if match.group(1):
+                try:
+                    value = self.parse_scalar(match.group(1))
+                    replacement = scalar if scalar is not None and self.parse_scalar(scalar) == value else self.format_key_scalar(value, template)
+                except YamlSpliceError:
+                    replacement = None
+                if replacement is not None:
+                    lines[i] = line[:match.start(1)] + replacement + line[match.end(1):]
+            break
+        return ''.join(lines).replace('\n', self.newline)
+    def set_entry(self, key, item_data, append=False):
+        position = None if append else self.find(key)
+        template = next((scalar for scalar in (self.find_key_scalar(entry['lines']) for entry in self.entries) if scalar), None)
+        scalar = self.find_key_scalar(self.entries[position]['lines']) if position is not None else None
+        text = self.render_entry(key, item_data, scalar, template)
+        if position is None:
+            self.entries.append({'key': key, 'lines': [text], 'trailer': []})
+        else:
+            self.entries[position]['lines'] = [text]
+        self.changes.append((position, key, item_data, text, append))
+    def render(self):
+        parts = list(self.header)
+        for entry in self.entries:
+            parts.extend(entry['lines'])
+            parts.extend(entry['trailer'])
+        return ''.join(parts)
+    def verify(self):
+        for position, key, item_data, text, append in self.changes:
+            value = safe_yaml.load(text)
+            if self.form == 'list':
+                valid = isinstance(value, list) and len(value) == 1 and value[0] == item_data
+            else:
+                valid = isinstance(value, dict) and list(value) == [key] and value[key] == item_data
+            if not valid:
+                raise YamlSpliceError(f"Eintrag '{key}' wurde nicht unverändert geschrieben")
+        rendered = YamlListSplice(self.render())
+        if rendered.form != self.form or [entry['key'] for entry in rendered.entries] != [entry['key'] for entry in self.entries]:
+            raise YamlSpliceError("Struktur nach dem Ersetzen stimmt nicht")
+    def replay(self, document):
+        target = {'positions': {}}
+        for position, key, item_data, text, append in self.changes:
+            if isinstance(document, dict):
+                document[key] = item_data
+            elif append:
+                append_entry(target, document, 'id', item_data)
+            else:
+                upsert_entry(target, document, 'id', key, item_data)
+        return document
+def open_yaml_list_splice(filepath):
+    try:
+        if os.path.exists(filepath):
+            with open(filepath, 'r', encoding='utf-8', newline='') as f:
+                text = f.read()
+            count_file_read(filepath, len(text.encode('utf-8')))
+        else:
+            text = ''
+        with PhaseTimer('yaml_splice_scan'):
+            splice = YamlListSplice(text)
+        splice.check(load_yaml_safe(filepath, readonly=True))
+        return splice
+    except YamlSpliceError as e:
+        app.logger.info(f"{filepath}: gezieltes Ersetzen nicht möglich ({e}), Datei wird vollständig geladen.")
+    except Exception as e:
+        app.logger.warning(f"{filepath}: Struktur konnte nicht gelesen werden ({e}), Datei wird vollständig geladen.")
+    return None
+def save_yaml_list_splice(target):
+    splice = target['splice']
+    filepath = target['path']
+    try:
+        with PhaseTimer('yaml_splice_verify'):
+            splice.verify()
+        return save_yaml_text(filepath, splice.render())
+    except Exception as e:
+        app.logger.info(f"{filepath}: gezieltes Ersetzen verworfen ({e}), Datei wird vollständig neu geschrieben.")
+    document = splice.replay(load_yaml(filepath) or [])
+    return save_yaml(filepath, document)
+def load_import_target(target_key, manifest_item):
+    kind, key = target_key
+    if kind == 'helper_legacy':
+        filepath = os.path.join(STORAGE_PATH, key)
+        document = load_json(filepath) or {'data': {'items': []}}
+    elif kind == 'helper_integration':
+        filepath = os.path.join(STORAGE_PATH, key)
+        document = load_json(filepath) or {'data': {'entries': []}}
+    elif kind == 'storage_item':
+        config = STORAGE_FILES_MAP.get(manifest_item['id'].split('::')[0])
+        filepath = os.path.join(STORAGE_PATH, key)
+        document = load_json(filepath) or {'data': {config['storage_key']: [] if not config['is_dict'] else {}}}
+    else:
+        filepath = os.path.join(CONFIG_PATH, key)
+        splice = open_yaml_list_splice(filepath)
+        if splice is not None:
+            return {'kind': kind, 'key': key, 'path': filepath, 'document': None, 'splice': splice, 'positions': {}}
+        document = load_yaml(filepath) or []
+    return {'kind': kind, 'key': key, 'path': filepath, 'document': document, 'splice': None, 'positions': {}}
+def save_import_target(target):
+    if target['kind'] == 'yaml_item':
+        if target['splice'] is not None:
+            return save_yaml_list_splice(target)
+        return save_yaml(target['path'], target['document'])
+    return save_json(target['path'], target['document'])
+def find_entry_position(target, entries, id_key, item_id):
+    positions = target['positions'].get(id_key)
+    if positions is None:
+        positions = {}
+        for i, entry in enumerate(entries):
+            entry_id = entry.get(id_key)
+            if entry_id not in positions:
+                positions[entry_id] = i
+        target['positions'][id_key] = positions
+    return positions.get(item_id)
+def upsert_entry(target, entries, id_key, item_id, item_data):
+    position = find_entry_position(target, entries, id_key, item_id)
+    if position is not None:
+        entries[position] = item_data
+    else:
+        entries.append(item_data)
+        target['positions'][id_key].setdefault(item_id, len(entries) - 1)
+def append_entry(target, entries, id_key, item_data):
+    entries.append(item_data)
+    positions = target['positions'].get(id_key)
+    if positions is not None:
+        positions.setdefault(item_data.get(id_key), len(entries) - 1)
+def apply_import_decision(target, manifest_item, item_data, decision):
+    action = decision['action']
+    item_type_internal = manifest_item['type']
+    if item_type_internal == 'helper_legacy':
+        platform = manifest_item['platform']
+        item_id = manifest_item['item_id']
+        items = target['document']['data']['items']
+        if action == 'overwrite':
+            upsert_entry(target, items, 'id', item_id, item_data)
+            return f"Helfer '{item_data.get('name')}' in {platform} überschrieben."
+        elif action == 'rename':
+            new_id = str(uuid.uuid4())
+            item_data['id'] = new_id
+            item_data['name'] = decision['new_name']
+            append_entry(target, items, 'id', item_data)
+            return f"Helfer als '{decision['new_name']}' in {platform} importiert."
+    elif item_type_internal == 'helper_integration':
+        entry_id = manifest_item['item_id']
+        entries = target['document']['data']['entries']
+        if action == 'overwrite':
+            upsert_entry(target, entries, 'entry_id', entry_id, item_data)
+            return f"Helfer '{item_data.get('title')}' in core.config_entries überschrieben."
+        elif action == 'rename':
+            new_entry_id = str(uuid.uuid4()).replace('-', '')
+            new_name = decision['new_name']
+            item_data['entry_id'] = new_entry_id
+            item_data['title'] = new_name
+            if 'options' in item_data and 'name' in item_data['options']:
+                item_data['options']['name'] = new_name
+            if 'unique_id' in item_data and item_data['unique_id'] is not None:
+                 item_data['unique_id'] = new_entry_id
+            append_entry(target, entries, 'entry_id', item_data)
+            return f"Helfer als '{new_name}' in core.config_entries importiert."
+    elif item_type_internal == 'storage_item':
+        config = STORAGE_FILES_MAP.get(manifest_item['id'].split('::')[0])
+        if not config: raise Exception(f"Unbekannter Storage-Typ: {manifest_item['id']}")
+        file_key = config['file_key']
+        storage_data = target['document']['data'][config['storage_key']]
+        if config['is_dict']:
+            if action == 'overwrite':
+                storage_data[manifest_item['item_id']] = item_data
+                return f"Eintrag '{item_data.get('alias')}' in {file_key} überschrieben."
+            elif action == 'rename':
+                new_id = str(uuid.uuid4())
+                item_data['id'] = new_id
+                item_data['alias'] = decision['new_name']
+                if 'unique_id' in item_data:
+                    item_data['unique_id'] = new_id
+                storage_data[new_id] = item_data
+                return f"Eintrag als '{decision['new_name']}' in {file_key} importiert."
+        else:
+            if action == 'overwrite':
+                upsert_entry(target, storage_data, 'id', manifest_item['item_id'], item_data)
+                return f"Eintrag '{item_data.get('alias') or item_data.get('name')}' in {file_key} überschrieben."
+            elif action == 'rename':
+                new_id = str(uuid.uuid4())
+                item_data['id'] = new_id
+                item_data['name'] = decision['new_name']
+                item_data['alias'] = decision['new_name']
+                if 'unique_id' in item_data:
+                    item_data['unique_id'] = new_id
+                append_entry(target, storage_data, 'id', item_data)
+                return f"Eintrag als '{decision['new_name']}' in {file_key} importiert."
+    elif item_type_internal == 'yaml_item':
+        yaml_file = manifest_item['yaml_list_file']
+        data = target['document']
+        splice = target['splice']
+        item_id = manifest_item['item_id']
+        if splice is not None:
+            form = splice.form
+        else:
+            form = 'list' if isinstance(data, list) else 'dict' if isinstance(data, dict) else None
+        if form == 'list':
+            if action == 'overwrite':
+                if splice is not None:
+                    splice.set_entry(item_id, item_data)
+                else:
+                    upsert_entry(target, data, 'id', item_id, item_data)
+                return f"Eintrag in {yaml_file} überschrieben."
+            elif action == 'rename':
+                new_id = str(uuid.uuid4())
+                item_data['id'] = new_id
+                if 'alias' in item_data: item_data['alias'] = decision['new_name']
+                if 'name' in item_data: item_data['name'] = decision['new_name']
+                if 'unique_id' in item_data:
+                    item_data['unique_id'] = new_id
+                if splice is not None:
+                    splice.set_entry(new_id, item_data, append=True)
+                else:
+                    append_entry(target, data, 'id', item_data)
+                return f"Eintrag als '{decision['new_name']}' in {yaml_file} importiert."
+        elif form == 'dict':
+            if action == 'overwrite':
+                if splice is not None:
+                    splice.set_entry(item_id, item_data)
+                else:
+                    data[item_id] = item_data
+                return f"Eintrag '{item_id}' in {yaml_file} überschrieben."
+            elif action == 'rename':
+                new_key = decision['new_name'].lower().replace(' ', '_')
+                if 'alias' in item_data: item_data['alias'] = decision['new_name']
+                if 'name' in item_data: item_data['name'] = decision['new_name']
+                if 'unique_id' in item_data:
+                    item_data['unique_id'] = str(uuid.uuid4())
+                if splice is not None:
+                    splice.set_entry(new_key, item_data)
+                else:
+                    data[new_key] = item_data
+                return f"Eintrag als '{new_key}' in {yaml_file} importiert."
+    return None
+def write_import_file(filepath, text):
+    if not save_yaml_text(filepath, text):
+        raise Exception(f"{filepath} konnte nicht gespeichert werden.")
+def execute_file_import_decision(manifest_item, item_data, decision):
     action = decision['action']
     item_type_internal = manifest_item['type']
     if item_type_internal == 'yaml':
         restore_path = os.path.join(CONFIG_PATH, manifest_item['restore_path'])
         if action == 'overwrite':
             with FILE_LOCKS['generic_yaml']:
-                os.makedirs(os.path.dirname(restore_path), exist_ok=True)
-                with open(restore_path, 'w', encoding='utf-8') as f:
-                    f.write(item_data)
+                write_import_file(restore_path, item_data)
             return f"'{restore_path}' überschrieben."
         elif action == 'rename':
             new_path = os.path.join(os.path.dirname(restore_path), decision['new_name'])
             with FILE_LOCKS['generic_yaml']:
-                os.makedirs(os.path.dirname(new_path), exist_ok=True)
-                with open(new_path, 'w', encoding='utf-8') as f:
-                    f.write(item_data)
+                write_import_file(new_path, item_data)
             return f"Als '{new_path}' gespeichert."
     elif item_type_internal == 'blueprint':
         restore_path = os.path.join(CONFIG_PATH, manifest_item['restore_path'])
         if action == 'overwrite':
             with FILE_LOCKS['generic_yaml']:
-                os.makedirs(os.path.dirname(restore_path), exist_ok=True)
-                with open(restore_path, 'w', encoding='utf-8') as f:
-                    f.write(item_data)
+                write_import_file(restore_path, item_data)
             return f"'{restore_path}' überschrieben."
         elif action == 'rename':
             new_display_name = decision['new_name']
@@ -522,208 +2847,446 @@ def execute_import_decision(manifest_item, item_data, decision, zf):
             yaml.dump(data, string_stream)
             new_item_data_str = string_stream.getvalue()
             with FILE_LOCKS['generic_yaml']:
-                os.makedirs(os.path.dirname(new_path), exist_ok=True)
-                with open(new_path, 'w', encoding='utf-8') as f:
-                    f.write(new_item_data_str)
+                write_import_file(new_path, new_item_data_str)
             return f"Blueprint als '{new_display_name}' in '{new_path}' gespeichert."
-    elif item_type_internal == 'helper_legacy':
-        platform = manifest_item['platform']
-        item_id = manifest_item['item_id']
-        filepath = os.path.join(STORAGE_PATH, platform)
-        lock = FILE_LOCKS.get(platform, FILE_LOCKS['generic_helper'])
-        with lock:
-            helper_storage = load_json(filepath) or {'data': {'items': []}}
-            items = helper_storage['data']['items']
-            if action == 'overwrite':
-                found = False
-                for i, item in enumerate(items):
-                    if item.get('id') == item_id:
-                        items[i] = item_data
-                        found = True
-                        break
-                if not found:
-                    items.append(item_data)
-                save_json(filepath, helper_storage)
-                return f"Helfer '{item_data.get('name')}' in {platform} überschrieben."
-            elif action == 'rename':
-                new_id = str(uuid.uuid4())
-                item_data['id'] = new_id
-                item_data['name'] = decision['new_name']
-                items.append(item_data)
-                save_json(filepath, helper_storage)
-                return f"Helfer als '{decision['new_name']}' in {platform} importiert."
-    elif item_type_internal == 'helper_integration':
-        entry_id = manifest_item['item_id']
-        filepath = os.path.join(STORAGE_PATH, 'core.config_entries')
-        with FILE_LOCKS['core.config_entries']:
-            config_entries = load_json(filepath) or {'data': {'entries': []}}
-            entries = config_entries['data']['entries']
-            if action == 'overwrite':
-                found = False
-                for i, entry in enumerate(entries):
-                    if entry.get('entry_id') == entry_id:
-                        entries[i] = item_data
-                        found = True
-                        break
-                if not found:
-                    entries.append(item_data)
-                save_json(filepath, config_entries)
-                return f"Helfer '{item_data.get('title')}' in core.config_entries überschrieben."
-            elif action == 'rename':
-                new_entry_id = str(uuid.uuid4()).replace('-', '')
-                new_name = decision['new_name']
-                item_data['entry_id'] = new_entry_id
-                item_data['title'] = new_name
-                if 'options' in item_data and 'name' in item_data['options']:
-                    item_data['options']['name'] = new_name
-                if 'unique_id' in item_data and item_data['unique_id'] is not None:
-                     item_data['unique_id'] = new_entry_id
-                entries.append(item_data)
-                save_json(filepath, config_entries)
-                return f"Helfer als '{new_name}' in core.config_entries importiert."
-    elif item_type_internal == 'storage_item':
-        storage_key = manifest_item['storage_key']
-        config = STORAGE_FILES_MAP.get(manifest_item['id'].split('::')[0])
-        if not config: raise Exception(f"Unbekannter Storage-Typ: {manifest_item['id']}")
-        file_key = config['file_key']
-        is_dict = config['is_dict']
-        storage_path = os.path.join(STORAGE_PATH, file_key)
-        with FILE_LOCKS[file_key]:
-            storage_file = load_json(storage_path) or {'data': {config['storage_key']: [] if not is_dict else {}}}
-            if is_dict:
-                storage_data = storage_file['data'][config['storage_key']]
-                if action == 'overwrite':
-                    storage_data[manifest_item['item_id']] = item_data
-                    save_json(storage_path, storage_file)
-                    return f"Eintrag '{item_data.get('alias')}' in {file_key} überschrieben."
-                elif action == 'rename':
-                    new_id = str(uuid.uuid4())
-                    item_data['id'] = new_id
-                    item_data['alias'] = decision['new_name']
-                    if 'unique_id' in item_data:
-                        item_data['unique_id'] = new_id
-                    storage_data[new_id] = item_data
-                    save_json(storage_path, storage_file)
-                    return f"Eintrag als '{decision['new_name']}' in {file_key} importiert."
-            else:
-                storage_data = storage_file['data'][config['storage_key']]
-                if action == 'overwrite':
-                    found = False
-                    for i, entry in enumerate(storage_data):
-                        if entry.get('id') == manifest_item['item_id']:
-                            storage_data[i] = item_data
-                            found = True
-                            break
-                    if not found: storage_data.append(item_data)
-                    save_json(storage_path, storage_file)
-                    return f"Eintrag '{item_data.get('alias') or item_data.get('name')}' in {file_key} überschrieben."
-                elif action == 'rename':
-                    new_id = str(uuid.uuid4())
-                    item_data['id'] = new_id
-                    item_data['name'] = decision['new_name']
-                    item_data['alias'] = decision['new_name']
-                    if 'unique_id' in item_data:
-                        item_data['unique_id'] = new_id
-                    storage_data.append(item_data)
-                    save_json(storage_path, storage_file)
-                    return f"Eintrag als '{decision['new_name']}' in {file_key} importiert."
-    elif item_type_internal == 'yaml_item':
-        yaml_file = manifest_item['yaml_list_file']
-        yaml_path = os.path.join(CONFIG_PATH, yaml_file)
-        with FILE_LOCKS[yaml_file]:
-            data = load_yaml(yaml_path) or []
-            item_id = manifest_item['item_id']
-            if isinstance(data, list):
-                if action == 'overwrite':
-                    found = False
-                    for i, entry in enumerate(data):
-                        if entry.get('id') == item_id:
-                            data[i] = item_data
-                            found = True
-                            break
-                    if not found: data.append(item_data)
-                    save_yaml(yaml_path, data)
-                    return f"Eintrag in {yaml_file} überschrieben."
-                elif action == 'rename':
-                    new_id = str(uuid.uuid4())
-                    item_data['id'] = new_id
-                    if 'alias' in item_data: item_data['alias'] = decision['new_name']
-                    if 'name' in item_data: item_data['name'] = decision['new_name']
-                    if 'unique_id' in item_data:
-                        item_data['unique_id'] = new_id
-                    data.append(item_data)
-                    save_yaml(yaml_path, data)
-                    return f"Eintrag als '{decision['new_name']}' in {yaml_file} importiert."
-            elif isinstance(data, dict):
-                if action == 'overwrite':
-                    data[item_id] = item_data
-                    save_yaml(yaml_path, data)
-                    return f"Eintrag '{item_id}' in {yaml_file} überschrieben."
-                elif action == 'rename':
-                    new_key = decision['new_name'].lower().replace(' ', '_')
-                    if 'alias' in item_data: item_data['alias'] = decision['new_name']
-                    if 'name' in item_data: item_data['name'] = decision['new_name']
-                    if 'unique_id' in item_data:
-                        item_data['unique_id'] = str(uuid.uuid4())
-                    data[new_key] = item_data
-                    save_yaml(yaml_path, data)
-                    return f"Eintrag als '{new_key}' in {yaml_file} importiert."
-    return f"Aktion '{action}' für '{manifest_item['id']}' übersprungen."
-@app.route('/api/execute_import', methods=['POST'])
-def api_execute_import():
-    app.logger.info("Execute Import API aufgerufen")
-    if 'file' not in request.files:
-        return jsonify({"error": "Keine Datei im Request (file)"}), 400
-    if 'decisions' not in request.form:
-        return jsonify({"error": "Keine Entscheidungen im Request (decisions)"}), 400
-    file = request.files['file']
+    return None
+def execute_import_group(target_key, group, results):
+    with get_import_target_lock(target_key):
+        with PhaseTimer('import_target_load'):
+            target = load_import_target(target_key, group[0][1])
+        applied = []
+        for index, manifest_item, item_data, decision in group:
+            try:
+                result_msg = apply_import_decision(target, manifest_item, item_data, decision)
+                if result_msg is None:
+                    results[index] = f"Aktion '{decision['action']}' für '{manifest_item['id']}' übersprungen."
+                else:
+                    results[index] = result_msg
+                    applied.append((index, manifest_item, item_data, decision))
+            except Exception as e:
+                app.logger.error(f"Fehler bei Import von {decision['id']}: {e}")
+                results[index] = f"Fehler bei Import von {decision['id']}: {e}"
+        if not applied:
+            return []
+        with PhaseTimer('import_target_save'):
+            saved = save_import_target(target)
+        if not saved:
+            for index, manifest_item, item_data, decision in applied:
+                results[index] = f"Fehler bei Import von {decision['id']}: {target['path']} konnte nicht gespeichert werden."
+            return []
+        return applied
+def read_import_item_data(zf, manifest_item):
+    zip_path = manifest_item['zip_path']
+    item_bytes = zf.read(zip_path)
+    if manifest_item['type'] in ['yaml', 'blueprint']:
+        return item_bytes.decode('utf-8')
+    elif zip_path.endswith('.json'):
+        return json_loads(item_bytes)
+    return load_yaml_from_string(item_bytes.decode('utf-8'))
+def read_import_registry_entries(zf, manifest_item):
+    registry_path = manifest_item.get('registry_zip_path')
+    if not registry_path:
+        return None
+    entries = json_loads(zf.read(registry_path))
+    return entries if isinstance(entries, list) else None
+def get_unique_entity_id(entity_id, taken):
+    if entity_id not in taken:
+        return entity_id
+    suffix = 2
+    while f"{entity_id}_{suffix}" in taken:
+        suffix += 1
+    return f"{entity_id}_{suffix}"
+def restore_entity_registry_entries(registry_imports, results):
+    with FILE_LOCKS['core.entity_registry']:
+        document = load_json(ENTITY_REGISTRY_PATH)
+        if not document or not isinstance(document.get('data'), dict):
+            for index, manifest_item, item_data, decision, registry_entries in registry_imports:
+                results[index] = f"{results[index]} Entitätsregister nicht gefunden, Einträge nicht übernommen."
+            return
+        entities = document['data'].setdefault('entities', [])
+        positions = {}
+        taken = {}
+        for position, entity in enumerate(entities):
+            positions.setdefault((entity.get('platform'), str(entity.get('unique_id'))), position)
+            taken.setdefault(entity.get('entity_id'), position)
+        devices = load_json(DEVICE_REGISTRY_PATH, readonly=True)
+        device_ids = None
+        if devices and isinstance(devices.get('data'), dict):
+            device_ids = {device.get('id') for device in devices['data'].get('devices', [])}
+        restored_keys = set()
+        counts = {}
+        for index, manifest_item, item_data, decision, registry_entries in registry_imports:
+            old_id = str(manifest_item['item_id'])
+            new_id = str(item_data.get('entry_id') if manifest_item['type'] == 'helper_integration' else item_data.get('id'))
+            for registry_entry in registry_entries:
+                if not isinstance(registry_entry, dict) or not registry_entry.get('entity_id') or registry_entry.get('unique_id') is None:
+                    continue
+                entity = copy_document(registry_entry)
+                if decision['action'] == 'rename':
+                    entity['id'] = uuid.uuid4().hex
+                    entity['unique_id'] = str(entity['unique_id']).replace(old_id, new_id)
+                    if entity.get('config_entry_id'):
+                        entity['config_entry_id'] = new_id
+                key = (entity.get('platform'), str(entity['unique_id']))
+                if decision['action'] == 'rename' and key in positions:
+                    continue
+                if device_ids is not None and entity.get('device_id') and entity['device_id'] not in device_ids:
+                    entity['device_id'] = None
+                position = positions.get(key)
+                if position is not None:
+                    current = entities[position]
+                    entity['id'] = current.get('id', entity.get('id'))
+                    if taken.get(current.get('entity_id')) == position:
+                        del taken[current.get('entity_id')]
+                    entity['entity_id'] = get_unique_entity_id(entity['entity_id'], taken)
+                    entities[position] = entity
+                else:
+                    entity['entity_id'] = get_unique_entity_id(entity['entity_id'], taken)
+                    position = len(entities)
+                    entities.append(entity)
+                    positions[key] = position
+                taken[entity['entity_id']] = position
+                restored_keys.add(key)
+                counts[index] = counts.get(index, 0) + 1
+        if not counts:
+            return
+        deleted_entities = document['data'].get('deleted_entities')
+        if isinstance(deleted_entities, list):
+            document['data']['deleted_entities'] = [entity for entity in deleted_entities if (entity.get('platform'), str(entity.get('unique_id'))) not in restored_keys]
+        with PhaseTimer('import_registry_save'):
+            saved = save_json(ENTITY_REGISTRY_PATH, document)
+    for index, count in counts.items():
+        if saved:
+            results[index] = f"{results[index]} Entitätsregister: {count} {'Eintrag' if count == 1 else 'Einträge'} übernommen."
+        else:
+            results[index] = f"{results[index]} Entitätsregister konnte nicht gespeichert werden."
+def parse_import_decisions(form):
     try:
-        decisions = json.loads(request.form.get('decisions'))
-    except Exception as e:
-        return jsonify({"error": f"Entscheidungen konnten nicht gelesen werden: {e}"}), 400
+        if 'decisions' in form:
+            decisions = json.loads(form.get('decisions'))
+            if not isinstance(decisions, list):
+                raise ValueError("decisions muss eine Liste sein")
+            return decisions, None, None
+        if 'policy' not in form:
+            raise ValueError("Keine Entscheidungen (decisions) oder Richtlinie (policy) im Request")
+        requested_policy = json.loads(form.get('policy'))
+        overrides = json.loads(form.get('overrides') or '[]')
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Entscheidungen konnten nicht gelesen werden: {e}")
+    if not isinstance(requested_policy, dict) or not isinstance(overrides, list):
+        raise ValueError("policy muss ein Objekt und overrides eine Liste sein")
+    policy = dict(IMPORT_DEFAULT_POLICY)
+    for status, action in requested_policy.items():
+        if status not in IMPORT_DEFAULT_POLICY or action not in IMPORT_POLICY_ACTIONS:
+            raise ValueError(f"Ungültige Richtlinie '{status}': '{action}' (erlaubt: {', '.join(IMPORT_DEFAULT_POLICY)} mit {', '.join(IMPORT_POLICY_ACTIONS)})")
+        policy[status] = action
+    for override in overrides:
+        if not isinstance(override, dict) or not override.get('zip_path') or override.get('action') not in IMPORT_OVERRIDE_ACTIONS:
+            raise ValueError("Jede Ausnahme in overrides braucht zip_path und eine gültige action")
+        if override['action'] == 'rename' and not str(override.get('new_name') or '').strip():
+            raise ValueError(f"Ausnahme für '{override['zip_path']}': new_name fehlt")
+    return None, policy, overrides
+def build_import_decisions(session, policy, overrides):
+    overrides_by_path = {override['zip_path']: override for override in overrides}
+    statuses = get_import_statuses(session.manifest, compare_hashes=policy['unchanged'] != policy['conflict'])
+    decisions = []
+    for item in session.manifest:
+        override = overrides_by_path.get(item['zip_path'])
+        if override is not None:
+            decisions.append(dict(override, id=item['id']))
+            continue
+        action = policy[statuses[item['id']]]
+        if action != 'skip':
+            decisions.append({'id': item['id'], 'zip_path': item['zip_path'], 'action': action, 'new_name': None})
+    return decisions
+def execute_import_archive(session, decisions, progress=None):
     results = []
-    try:
-        with zipfile.ZipFile(file, 'r') as zf:
-            if 'export_manifest.json' not in zf.namelist():
-                return jsonify({"error": "ZIP-Datei ist kein gültiges Backup (manifest.json fehlt)"}), 400
-            manifest_data = zf.read('export_manifest.json')
-            manifest = json.loads(manifest_data)
-            manifest_dict = {item['zip_path']: item for item in manifest}
+    manifest_dict = session.manifest_by_path
+    with FILE_LOCKS['import_transaction'], ImportTransaction():
+        groups = {}
+        registry_data = {}
+        registry_imports = []
+        pending = 0
+        with session.open_archive() as zf:
             for decision in decisions:
+                index = len(results)
+                results.append(None)
                 action = decision['action']
+                zip_path = decision['zip_path'] if action != 'skip' else None
                 if action == 'skip':
-                    results.append(f"'{decision['id']}' übersprungen.")
-                    continue
-                zip_path = decision['zip_path']
-                if zip_path not in manifest_dict:
-                    results.append(f"Fehler: '{zip_path}' nicht im Manifest gefunden.")
-                    continue
-                manifest_item = manifest_dict[zip_path]
-                try:
-                    item_data_str = zf.read(zip_path).decode('utf-8')
-                    item_data = None
-                    if manifest_item['type'] not in ['yaml', 'blueprint']:
-                        if zip_path.endswith('.json'):
-                            item_data = json.loads(item_data_str)
+                    results[index] = f"'{decision['id']}' übersprungen."
+                elif zip_path not in manifest_dict:
+                    results[index] = f"Fehler: '{zip_path}' nicht im Manifest gefunden."
+                else:
+                    manifest_item = manifest_dict[zip_path]
+                    try:
+                        with PhaseTimer('import_entry_read'):
+                            item_data = session.read_item_data(zf, manifest_item)
+                        target_key = get_import_target_key(manifest_item)
+                        if target_key is None:
+                            with PhaseTimer('import_file_write'):
+                                result_msg = execute_file_import_decision(manifest_item, item_data, decision)
+                            results[index] = result_msg or f"Aktion '{action}' für '{manifest_item['id']}' übersprungen."
                         else:
-                            item_data = load_yaml_from_string(item_data_str)
-                    else:
-                        item_data = item_data_str
-                    result_msg = execute_import_decision(manifest_item, item_data, decision, zf)
-                    results.append(result_msg)
-                except Exception as e:
-                    app.logger.error(f"Fehler bei Import von {decision['id']}: {e}")
-                    results.append(f"Fehler bei Import von {decision['id']}: {e}")
-        app.logger.info(f"Import abgeschlossen. {len(results)} Aktionen verarbeitet.")
+                            groups.setdefault(target_key, []).append((index, manifest_item, item_data, decision))
+                            pending += 1
+                            registry_entries = read_import_registry_entries(zf, manifest_item)
+                            if registry_entries:
+                                registry_data[index] = registry_entries
+                    except Exception as e:
+                        app.logger.error(f"Fehler bei Import von {decision['id']}: {e}")
+                        results[index] = f"Fehler bei Import von {decision['id']}: {e}"
+                if progress:
+                    progress(len(results) - pending, len(decisions))
+        for target_key, group in groups.items():
+            try:
+                for index, manifest_item, item_data, decision in execute_import_group(target_key, group, results):
+                    if index in registry_data:
+                        registry_imports.append((index, manifest_item, item_data, decision, registry_data[index]))
+            except Exception as e:
+                app.logger.error(f"Fehler beim Import nach {target_key[1]}: {e}")
+                for index, manifest_item, item_data, decision in group:
+                    results[index] = f"Fehler bei Import von {decision['id']}: {e}"
+            pending -= len(group)
+            if progress:
+                progress(len(results) - pending, len(decisions))
+        if registry_imports:
+            try:
+                restore_entity_registry_entries(registry_imports, results)
+            except Exception as e:
+                app.logger.error(f"Fehler beim Übernehmen der Entitätsregister-Einträge: {e}")
+                for index, manifest_item, item_data, decision, registry_entries in registry_imports:
+                    results[index] = f"{results[index]} Entitätsregister: Fehler {e}"
+    invalidate_inventory_snapshot()
+    count_processed_items('import', [decision['id'] for decision in decisions], [(('action', decision['action']),) for decision in decisions])
+    app.logger.info(f"Import abgeschlossen. {len(results)} Aktionen verarbeitet.")
+    return results
+@app.route('/api/execute_import', methods=['POST'])
+def api_execute_import():
+    app.logger.info("Execute Import API aufgerufen")
+    if 'file' not in request.files and not request.form.get('session_id'):
+        return jsonify({"error": "Keine Datei (file) oder Upload-Sitzung (session_id) im Request"}), 400
+    try:
+        decisions, policy, overrides = parse_import_decisions(request.form)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        session = get_request_upload_session()
+        if decisions is None:
+            decisions = build_import_decisions(session, policy, overrides)
+        results = execute_import_archive(session, decisions)
         return jsonify({
-            "message": "Import abgeschlossen. Bitte starten Sie Home Assistant neu.",
+            "message": IMPORT_DONE_MESSAGE,
             "details": results
         })
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), 410
+    except ImportArchiveError as e:
+        return jsonify({"error": str(e)}), 400
     except zipfile.BadZipFile:
         return jsonify({"error": "Ungültige ZIP-Datei"}), 400
     except Exception as e:
         app.logger.error(f"API Fehler /api/execute_import: {e}")
         return jsonify({"error": f"Import-Ausführung fehlgeschlagen: {e}"}), 500
+def get_job_file_path(job_id, suffix):
+    return os.path.join(JOBS_PATH, f"{job_id}{suffix}")
+def get_job_executor():
+    global job_executor
+    with JOBS_LOCK:
+        if job_executor is None:
+            job_executor = ThreadPoolExecutor(max_workers=max(1, int(get_addon_option('job_workers', 2))), thread_name_prefix='job')
+        return job_executor
+def save_job(job):
+    os.makedirs(JOBS_PATH, exist_ok=True)
+    save_json(get_job_file_path(job['id'], '.json'), job)
+def get_job(job_id):
+    if not JOB_ID_PATTERN.match(job_id or ''):
+        return None
+    with JOBS_LOCK:
+        job = jobs.get(job_id)
+    if job is None:
+        job = read_json_file(get_job_file_path(job_id, '.json'))
+    return job
+def get_job_view(job):
+    return {
+        'id': job['id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'created': job['created'],
+        'started': job.get('started'),
+        'finished': job.get('finished'),
+        'error': job.get('error'),
+        'download_name': job.get('download_name')
+    }
+def remove_job_files(job_id):
+    for path in glob.glob(get_job_file_path(job_id, '.*')):
+        try:
+            os.remove(path)
+        except OSError as e:
+            app.logger.warning(f"Konnte Auftragsdatei {path} nicht löschen: {e}")
+def purge_expired_jobs():
+    now = time.time()
+    for record_path in glob.glob(os.path.join(JOBS_PATH, '*.json')):
+        job_id = os.path.basename(record_path)[:-len('.json')]
+        job = get_job(job_id)
+        if job and job.get('finished') and now - job['finished'] > JOB_TTL_SECONDS:
+            with JOBS_LOCK:
+                jobs.pop(job_id, None)
+            remove_job_files(job_id)
+def recover_jobs():
+    for record_path in glob.glob(os.path.join(JOBS_PATH, '*.json')):
+        job = read_json_file(record_path)
+        if job and job.get('status') in ('queued', 'running'):
+            job['status'] = 'error'
+            job['error'] = "Auftrag wurde durch einen Neustart abgebrochen."
+            job['finished'] = time.time()
+            save_json(record_path, job)
+    purge_expired_jobs()
+def create_job(kind):
+    purge_expired_jobs()
+    with JOBS_LOCK:
+        active_jobs = sum(1 for job in jobs.values() if job['status'] in ('queued', 'running'))
+        if active_jobs >= JOB_MAX_PENDING:
+            return None
+        job = {
+            'id': uuid.uuid4().hex,
+            'kind': kind,
+            'status': 'queued',
+            'progress': {'done': 0, 'total': 0},
+            'created': time.time()
+        }
+        jobs[job['id']] = job
+    os.makedirs(JOBS_PATH, exist_ok=True)
+    return job
+def submit_job(job, runner, *args):
+    save_job(job)
+    get_job_executor().submit(run_job, job, runner, args)
+    return job
+def run_job(job, runner, args):
+    job['status'] = 'running'
+    job['started'] = time.time()
+    save_job(job)
+    last_saved = [time.time()]
+    def progress(done, total):
+        job['progress'] = {'done': done, 'total': total}
+        if time.time() - last_saved[0] >= JOB_PROGRESS_SAVE_INTERVAL:
+            last_saved[0] = time.time()
+            save_job(job)
+    try:
+        job.update(runner(job, progress, *args))
+        job['status'] = 'done'
+    except (ImportArchiveError, UploadSessionError) as e:
+        job['status'] = 'error'
+        job['error'] = str(e)
+    except zipfile.BadZipFile:
+        job['status'] = 'error'
+        job['error'] = "Ungültige ZIP-Datei"
+    except Exception as e:
+        app.logger.error(f"Auftrag {job['id']} ({job['kind']}) fehlgeschlagen: {e}")
+        job['status'] = 'error'
+        job['error'] = f"Auftrag fehlgeschlagen: {e}"
+    finally:
+        job['finished'] = time.time()
+        save_job(job)
+def run_export_job(job, progress, item_ids, previous_hashes=None, baseline=None, archive_options=None):
+    archive_options = archive_options or parse_export_archive_options({})
+    export_format = EXPORT_FORMATS[archive_options['archive_format']]
+    artifact_path = get_job_file_path(job['id'], export_format['extension'])
+    with open(artifact_path, 'wb') as f, ExportArchiveWriter(f, **archive_options) as archive:
+        export_result = build_export_archive(archive, item_ids, progress, previous_hashes)
+    if baseline:
+        save_export_baseline(baseline, export_result)
+    return {'artifact': artifact_path, 'mimetype': export_format['mimetype'], 'download_name': get_export_download_name("Backup", archive_options)}
+def run_analyze_job(job, progress, session_id):
+    session = require_upload_session(session_id)
+    return {'result': {'session_id': session_id, 'items': analyze_import_archive(session, progress)}}
+def run_execute_job(job, progress, session_id, decisions, policy=None, overrides=None):
+    session = require_upload_session(session_id)
+    if decisions is None:
+        decisions = build_import_decisions(session, policy, overrides)
+    results = execute_import_archive(session, decisions, progress)
+    return {'result': {'message': IMPORT_DONE_MESSAGE, 'details': results}}
+def job_queue_full_response():
+    return jsonify({"error": "Zu viele laufende Aufträge, bitte später erneut versuchen."}), 429
+@app.route('/api/jobs/export', methods=['POST'])
+def api_job_export():
+    data = request.get_json(silent=True) or {}
+    try:
+        item_ids, previous_hashes, baseline, archive_options = parse_export_request(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    job = create_job('export')
+    if job is None:
+        return job_queue_full_response()
+    submit_job(job, run_export_job, item_ids, previous_hashes, baseline, archive_options)
+    return jsonify(get_job_view(job)), 202
+@app.route('/api/jobs/analyze_import', methods=['POST'])
+def api_job_analyze_import():
+    if 'file' not in request.files:
+        return jsonify({"error": "Keine Datei im Request"}), 400
+    file = request.files['file']
+    if file.filename == '' or not file.filename.endswith(IMPORT_ARCHIVE_EXTENSIONS):
+        return jsonify({"error": "Ungültige Datei (nur .zip oder .tar.zst erlaubt)"}), 400
+    try:
+        session = store_upload_session(file)
+    except ImportArchiveError as e:
+        return jsonify({"error": str(e)}), 400
+    except zipfile.BadZipFile:
+        return jsonify({"error": "Ungültige ZIP-Datei"}), 400
+    job = create_job('analyze_import')
+    if job is None:
+        return job_queue_full_response()
+    submit_job(job, run_analyze_job, session.session_id)
+    return jsonify(get_job_view(job)), 202
+@app.route('/api/jobs/execute_import', methods=['POST'])
+def api_job_execute_import():
+    if 'file' not in request.files and not request.form.get('session_id'):
+        return jsonify({"error": "Keine Datei (file) oder Upload-Sitzung (session_id) im Request"}), 400
+    try:
+        decisions, policy, overrides = parse_import_decisions(request.form)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        session = get_request_upload_session()
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), 410
+    except ImportArchiveError as e:
+        return jsonify({"error": str(e)}), 400
+    except zipfile.BadZipFile:
+        return jsonify({"error": "Ungültige ZIP-Datei"}), 400
+    job = create_job('execute_import')
+    if job is None:
+        return job_queue_full_response()
+    submit_job(job, run_execute_job, session.session_id, decisions, policy, overrides)
+    return jsonify(get_job_view(job)), 202
+@app.route('/api/jobs/<job_id>')
+def api_job_status(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Auftrag nicht gefunden"}), 404
+    return jsonify(get_job_view(job))
+@app.route('/api/jobs/<job_id>/result')
+def api_job_result(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Auftrag nicht gefunden"}), 404
+    if job['status'] == 'error':
+        return jsonify({"error": job.get('error')}), 500
+    if job['status'] != 'done':
+        return jsonify({"error": "Auftrag ist noch nicht abgeschlossen"}), 409
+    if job.get('artifact'):
+        if not os.path.exists(job['artifact']):
+            return jsonify({"error": "Ergebnisdatei ist nicht mehr vorhanden"}), 410
+        return send_file(
+            job['artifact'],
+            mimetype=job.get('mimetype', 'application/zip'),
+            as_attachment=True,
+            download_name=job['download_name']
+        )
+    return jsonify(job.get('result'))
 if __name__ == '__main__':
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_tasks()
     app.run(debug=True, host='0.0.0.0', port=8099)
 
@@ -0,0 +1,219 @@
+import os
+import sys
+import io
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import tracemalloc
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+LEGACY_PLATFORMS = ['input_boolean', 'input_text', 'input_number', 'input_datetime', 'input_select', 'input_button', 'timer', 'counter', 'schedule', 'group']
+INTEGRATION_DOMAINS = ['derivative', 'integration', 'min_max', 'template', 'threshold', 'utility_meter', 'random']
+BASE_COUNTS = {
+    'legacy_helpers_per_platform': 20,
+    'integration_helpers': 50,
+    'storage_automations': 100,
+    'storage_scripts': 50,
+    'storage_scenes': 20,
+    'yaml_automations': 100,
+    'yaml_scripts': 50,
+    'yaml_scenes': 20,
+    'blueprints': 20,
+    'package_files': 20,
+    'package_depth': 3,
+    'noise_files': 200
+}
+PHASES = ['get_items_cold', 'get_items_warm', 'export', 'analyze_import', 'execute_import']
+def get_counts(scale):
+    counts = {key: max(1, int(value * scale)) for key, value in BASE_COUNTS.items()}
+    counts['package_depth'] = BASE_COUNTS['package_depth']
+    return counts
+def write_storage_file(storage_path, key, data):
+    with open(os.path.join(storage_path, key), 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'minor_version': 1, 'key': key, 'data': data}, f, indent=4)
+def build_automation(i, prefix):
+    return {
+        'id': f"{prefix}{i}",
+        'alias': f"Automation {prefix}{i}",
+        'description': 'Synthetische Automation für den Benchmark',
+        'trigger': [{'platform': 'state', 'entity_id': f"input_boolean.bench_{i}", 'to': 'on'}],
+        'condition': [{'condition': 'time', 'after': '06:00:00', 'before': '22:00:00'}],
+        'action': [{'service': 'light.turn_on', 'target': {'entity_id': f"light.bench_{i}"}, 'data': {'brightness_pct': i % 100}}],
+        'mode': 'single'
+    }
+def generate_config(config_path, counts):
+    storage_path = os.path.join(config_path, '.storage')
+    os.makedirs(storage_path, exist_ok=True)
+    for platform_name in LEGACY_PLATFORMS:
+        items = [{'id': f"{platform_name}_{i}", 'name': f"{platform_name} {i}", 'icon': 'mdi:flash'} for i in range(counts['legacy_helpers_per_platform'])]
+        write_storage_file(storage_path, platform_name, {'items': items})
+    entries = []
+    for i in range(counts['integration_helpers']):
+        domain = INTEGRATION_DOMAINS[i % len(INTEGRATION_DOMAINS)]
+        entries.append({
+            'entry_id': f"bench{i:026x}",
+            'domain': domain,
+            'title': f"{domain} {i}",
+            'data': {},
+            'options': {'name': f"{domain} {i}", 'source': f"sensor.bench_{i}"},
+            'source': 'user',
+            'unique_id': None
+        })
+    for i in range(counts['integration_helpers']):
+        entries.append({'entry_id': f"other{i:025x}", 'domain': 'mqtt', 'title': f"MQTT {i}", 'data': {'broker': 'localhost'}, 'options': {}, 'source': 'user', 'unique_id': None})
+    write_storage_file(storage_path, 'core.config_entries', {'entries': entries})
+    write_storage_file(storage_path, 'core.automation', {'automation': {f"sa{i}": build_automation(i, 'sa') for i in range(counts['storage_automations'])}})
+    write_storage_file(storage_path, 'core.script', {'items': [{'id': f"ss{i}", 'alias': f"Skript {i}", 'sequence': [{'delay': i}]} for i in range(counts['storage_scripts'])]})
+    write_storage_file(storage_path, 'core.scene', {'items': [{'id': f"sc{i}", 'name': f"Szene {i}", 'entities': {f"light.bench_{i}": {'state': 'on'}}} for i in range(counts['storage_scenes'])]})
+    entities = [{'id': f"reg{i}", 'entity_id': f"input_boolean.input_boolean_{i}", 'platform': 'input_boolean', 'unique_id': f"input_boolean_{i}", 'config_entry_id': None} for i in range(counts['legacy_helpers_per_platform'])]
+    write_storage_file(storage_path, 'core.entity_registry', {'entities': entities, 'deleted_entities': []})
+    with open(os.path.join(config_path, 'automations.yaml'), 'w', encoding='utf-8') as f:
+        for i in range(counts['yaml_automations']):
+            f.write(f"- id: 'ya{i}'\n  alias: YAML Automation {i}\n  # Kommentar {i}\n  trigger:\n  - platform: state\n    entity_id: input_boolean.bench_{i}\n    to: 'on'\n  action:\n  - service: light.toggle\n    target:\n      entity_id: light.bench_{i}\n  mode: single\n")
+    with open(os.path.join(config_path, 'scripts.yaml'), 'w', encoding='utf-8') as f:
+        for i in range(counts['yaml_scripts']):
+            f.write(f"bench_script_{i}:\n  alias: YAML Skript {i}\n  sequence:\n  - delay: {i}\n  - service: light.turn_off\n    target:\n      entity_id: light.bench_{i}\n")
+    with open(os.path.join(config_path, 'scenes.yaml'), 'w', encoding='utf-8') as f:
+        for i in range(counts['yaml_scenes']):
+            f.write(f"- id: 'ys{i}'\n  name: YAML Szene {i}\n  entities:\n    light.bench_{i}:\n      state: 'on'\n")
+    with open(os.path.join(config_path, 'configuration.yaml'), 'w', encoding='utf-8') as f:
+        f.write("homeassistant:\n  packages: !include_dir_named packages\nautomation: !include automations.yaml\nscript: !include scripts.yaml\nscene: !include scenes.yaml\n")
+    with open(os.path.join(config_path, 'secrets.yaml'), 'w', encoding='utf-8') as f:
+        f.write("bench_secret: geheim\n")
+    for i in range(counts['package_files']):
+        package_dir = os.path.join(config_path, 'packages', *[f"ebene_{level}_{i % 3}" for level in range(i % (counts['package_depth'] + 1))])
+        os.makedirs(package_dir, exist_ok=True)
+        with open(os.path.join(package_dir, f"paket_{i}.yaml"), 'w', encoding='utf-8') as f:
+            f.write(f"input_boolean:\n  paket_{i}:\n    name: Paket {i}\nsensor:\n  - platform: template\n    sensors:\n      paket_{i}:\n        value_template: \"{{{{ states('sensor.bench_{i}') }}}}\"\n")
+    for i in range(counts['blueprints']):
+        domain = 'automation' if i % 4 else 'script'
+        blueprint_dir = os.path.join(config_path, 'blueprints', domain, f"autor_{i % 5}")
+        os.makedirs(blueprint_dir, exist_ok=True)
+        with open(os.path.join(blueprint_dir, f"blueprint_{i}.yaml"), 'w', encoding='utf-8') as f:
+            f.write(f"blueprint:\n  name: Blueprint {i}\n  domain: {domain}\n  input:\n    ziel:\n      name: Ziel\n      selector:\n        entity: {{}}\n")
+            f.write("trigger:\n  platform: state\n  entity_id: !input ziel\naction: []\n" if domain == 'automation' else "sequence:\n- service: homeassistant.toggle\n  target:\n    entity_id: !input ziel\n")
+    for i in range(counts['noise_files']):
+        noise_dir = os.path.join(config_path, 'www', 'community', f"karte_{i % 20}")
+        os.makedirs(noise_dir, exist_ok=True)
+        with open(os.path.join(noise_dir, f"datei_{i}.js"), 'w', encoding='utf-8') as f:
+            f.write("// Rauschen\n")
+def measure(results, phase, func):
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    value = func()
+    wall = time.perf_counter() - started
+    results[phase] = {
+        'wall_seconds': round(wall, 4),
+        'python_heap_peak_kb': tracemalloc.get_traced_memory()[1] // 1024,
+        'rss_peak_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+    return value
+def run_worker(scale, workdir):
+    config_path = os.path.join(workdir, 'config')
+    data_path = os.path.join(workdir, 'data')
+    os.makedirs(data_path, exist_ok=True)
+    counts = get_counts(scale)
+    generate_config(config_path, counts)
+    os.environ['IMPORT_EXPORT_CONFIG_PATH'] = config_path
+    os.environ['IMPORT_EXPORT_DATA_PATH'] = data_path
+    sys.path.insert(0, APP_PATH)
+    import logging
+    import main
+    logging.disable(logging.WARNING)
+    client = main.app.test_client()
+    tracemalloc.start()
+    phases = {}
+    items = measure(phases, 'get_items_cold', main.get_items)
+    measure(phases, 'get_items_warm', main.get_items)
+    item_ids = [item['id'] for item in items]
+    def export():
+        response = client.post('/api/export', json={'item_ids': item_ids})
+        if response.status_code != 200:
+            raise RuntimeError(f"Export fehlgeschlagen: {response.status_code}")
+        return response.get_data()
+    archive = measure(phases, 'export', export)
+    def analyze():
+        response = client.post('/api/analyze_import', data={'file': (io.BytesIO(archive), 'benchmark.zip')}, content_type='multipart/form-data')
+        if response.status_code != 200:
+            raise RuntimeError(f"Analyse fehlgeschlagen: {response.status_code}")
+        data = response.get_json()
+        return data['items'] if isinstance(data, dict) else data
+    analysis = measure(phases, 'analyze_import', analyze)
+    decisions = [{'id': item['id'], 'zip_path': item['zip_path'], 'action': 'overwrite', 'new_name': None} for item in analysis]
+    def execute():
+        response = client.post('/api/execute_import', data={'file': (io.BytesIO(archive), 'benchmark.zip'), 'decisions': json.dumps(decisions)}, content_type='multipart/form-data')
+        if response.status_code != 200:
+            raise RuntimeError(f"Import fehlgeschlagen: {response.status_code}")
+        return response.get_json()
+    measure(phases, 'execute_import', execute)
+    return {
+        'scale': scale,
+        'counts': counts,
+        'items': len(items),
+        'archive_bytes': len(archive),
+        'phases': phases
+    }
+def read_addon_version():
+    config_file = os.path.join(APP_PATH, '..', 'config.yaml')
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('version:'):
+                    return line.split(':', 1)[1].strip().strip('"')
+    except OSError:
+        pass
+    return None
+def run_benchmark(scales, repeat):
+    results = []
+    for scale in scales:
+        for run in range(repeat):
+            workdir = tempfile.mkdtemp(prefix='ieh_benchmark_')
+            try:
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--worker', '--scale', str(scale), '--workdir', workdir],
+                    check=True, capture_output=True, text=True
+                ).stdout
+            except subprocess.CalledProcessError as e:
+                print(e.stderr, file=sys.stderr)
+                raise
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            result = json.loads(output)
+            result['run'] = run
+            results.append(result)
+            print(f"Skalierung {scale} (Lauf {run + 1}/{repeat}): {result['items']} Elemente, " +
+                  ", ".join(f"{phase} {result['phases'][phase]['wall_seconds']}s" for phase in PHASES), file=sys.stderr)
+    curves = {phase: [[result['items'], result['phases'][phase]['wall_seconds'], result['phases'][phase]['rss_peak_kb']] for result in results] for phase in PHASES}
+    return {
+        'addon_version': read_addon_version(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+        'curves': curves
+    }
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark für den Import / Export Helfer mit synthetischer /config.')
+    parser.add_argument('--scales', default='1,5,20', help='Kommagetrennte Skalierungsfaktoren der Basisgrößen')
+    parser.add_argument('--repeat', type=int, default=1, help='Anzahl der Läufe pro Skalierung')
+    parser.add_argument('--output', help='Zieldatei für den JSON-Bericht (Standard: stdout)')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--scale', type=float, help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        json.dump(run_worker(args.scale, args.workdir), sys.stdout)
+        return
+    report = run_benchmark([float(scale) for scale in args.scales.split(',')], args.repeat)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+if __name__ == '__main__':
+    main()
@@ -10,9 +10,22 @@ python3 --version
 bashio::log.info "Überprüfe Flask-Installation:"
 pip3 show flask
 
-bashio::log.info "Starte Python Web-Server (main.py)..."
+SERVER_MODE=$(bashio::config 'server_mode')
+export SERVER_WORKERS=$(bashio::config 'server_workers')
+export SERVER_THREADS=$(bashio::config 'server_threads')
 
-# Führt Python im ungepufferten Modus aus (-u),
-# damit Logs sofort im Add-on-Log erscheinen.
-python3 -u /app/main.py
+if [ "${SERVER_MODE}" = "development" ]; then
+    bashio::log.info "Starte Python Web-Server (main.py) im Entwicklungsmodus..."
+
+    # Führt Python im ungepufferten Modus aus (-u),
+    # damit Logs sofort im Add-on-Log erscheinen.
+    python3 -u /app/main.py
+else
+    bashio::log.info "Starte Gunicorn mit ${SERVER_WORKERS} Worker(n) und ${SERVER_THREADS} Thread(s)..."
+
+    # Ungepufferte Ausgabe, damit Logs sofort im Add-on-Log erscheinen.
+    cd /app
+    export PYTHONUNBUFFERED=1
+    exec gunicorn --config /app/gunicorn.conf.py main:app
+fi
 
@@ -0,0 +1,54 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+ROOT = tempfile.mkdtemp(prefix='import_export_helfer_')
+os.environ['IMPORT_EXPORT_CONFIG_PATH'] = os.path.join(ROOT, 'config')
+os.environ['IMPORT_EXPORT_DATA_PATH'] = os.path.join(ROOT, 'data')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+import main  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def clean_paths():
+    for path in (main.CONFIG_PATH, main.DATA_PATH):
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+    os.makedirs(main.STORAGE_PATH)
+    main.addon_options = {}
+    with main.DOCUMENT_CACHE_LOCK:
+        main.document_cache.clear()
+        main.document_cache_size = 0
+    main.invalidate_inventory_snapshot()
+    with main.UPLOAD_SESSIONS_LOCK:
+        main.upload_sessions.clear()
+    yield
+    main.import_transaction_state.transaction = None
+
+
+def write_config(name, text):
+    path = os.path.join(main.CONFIG_PATH, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+
+def read_config(name):
+    with open(os.path.join(main.CONFIG_PATH, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def write_storage(key, data):
+    return write_config(os.path.join('.storage', key), json.dumps({'version': 1, 'key': key, 'data': data}))
+
+
+def export_archive(item_ids):
+    response = main.app.test_client().post('/api/export', json={'item_ids': item_ids})
+    assert response.status_code == 200
+    return response.data
@@ -0,0 +1,42 @@
+import os
+
+import main
+from conftest import write_storage
+
+
+def test_budget_counts_parsed_size():
+    path = write_storage('input_boolean', {'items': [{'id': f'ib{i}', 'name': f'Schalter {i}'} for i in range(200)]})
+    main.load_json(path, readonly=True)
+    signature, data, size = main.document_cache[(path, 'json')]
+    assert size == main.estimate_document_size(data)
+    assert size > os.path.getsize(path)
+    assert main.document_cache_size == size
+
+
+def test_document_over_budget_is_not_cached():
+    main.addon_options = {'document_cache_mb': 0}
+    path = write_storage('input_boolean', {'items': [{'id': 'ib0', 'name': 'Schalter'}]})
+    assert main.load_json(path, readonly=True)['data']['items'][0]['id'] == 'ib0'
+    assert (path, 'json') not in main.document_cache
+    assert main.document_cache_size == 0
+
+
+def test_eviction_uses_parsed_size(monkeypatch):
+    monkeypatch.setattr(main, 'estimate_document_size', lambda data: 600 * 1024)
+    main.addon_options = {'document_cache_mb': 1}
+    paths = [write_storage(f'counter_{i}', {'items': [{'id': 'c0'}]}) for i in range(3)]
+    for path in paths:
+        main.load_json(path, readonly=True)
+    assert list(main.document_cache) == [(paths[2], 'json')]
+    assert main.document_cache_size == 600 * 1024
+    main.invalidate_cached_document(paths[2])
+    assert main.document_cache_size == 0
+
+
+def test_job_records_bypass_cache():
+    job = main.create_job('export')
+    main.save_job(job)
+    with main.JOBS_LOCK:
+        main.jobs.pop(job['id'], None)
+    assert main.get_job(job['id'])['id'] == job['id']
+    assert not any(path.startswith(main.JOBS_PATH) for path, _ in main.document_cache)
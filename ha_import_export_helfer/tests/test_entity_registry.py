@@ -0,0 +1,97 @@
+import io
+import json
+import os
+import zipfile
+
+import main
+from conftest import export_archive, write_storage
+
+ITEM_ID = 'Helfer::input_boolean::ib0'
+
+
+def registry_entry(**changes):
+    entry = {'id': 'e1', 'entity_id': 'input_boolean.schalter', 'platform': 'input_boolean', 'unique_id': 'ib0', 'device_id': 'dev1', 'name': None}
+    entry.update(changes)
+    return entry
+
+
+def write_registry(entities, deleted=()):
+    write_storage('core.entity_registry', {'entities': list(entities), 'deleted_entities': list(deleted)})
+
+
+def read_entities():
+    return main.load_json(main.ENTITY_REGISTRY_PATH)['data']
+
+
+def setup_export():
+    write_storage('input_boolean', {'items': [{'id': 'ib0', 'name': 'Schalter'}, {'id': 'ib1', 'name': 'Ohne Entität'}]})
+    write_registry([registry_entry(name='Eigener Name')])
+    return export_archive([ITEM_ID, 'Helfer::input_boolean::ib1'])
+
+
+def run_import(data, action='overwrite', new_name=None):
+    client = main.app.test_client()
+    analysis = client.post('/api/analyze_import', data={'file': (io.BytesIO(data), 'backup.zip')}, content_type='multipart/form-data').get_json()
+    item = next(item for item in analysis['items'] if item['id'] == ITEM_ID)
+    decisions = [{'id': ITEM_ID, 'zip_path': item['zip_path'], 'action': action, 'new_name': new_name}]
+    response = client.post('/api/execute_import', data={'session_id': analysis['session_id'], 'decisions': json.dumps(decisions)}, content_type='multipart/form-data')
+    assert response.status_code == 200
+    return response.get_json()['details'][0]
+
+
+def test_export_includes_registry_entries_of_helpers():
+    data = setup_export()
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        manifest = {entry['id']: entry for entry in json.loads(zf.read('export_manifest.json'))['entries']}
+        assert json.loads(zf.read(manifest[ITEM_ID]['registry_zip_path'])) == [registry_entry(name='Eigener Name')]
+    assert 'registry_zip_path' not in manifest['Helfer::input_boolean::ib1']
+
+
+def test_registry_change_marks_helper_as_conflict():
+    data = setup_export()
+    write_registry([registry_entry(name='Anderer Name')])
+    response = main.app.test_client().post('/api/analyze_import', data={'file': (io.BytesIO(data), 'backup.zip')}, content_type='multipart/form-data')
+    statuses = {item['id']: item['status'] for item in response.get_json()['items']}
+    assert statuses == {ITEM_ID: 'conflict', 'Helfer::input_boolean::ib1': 'unchanged'}
+
+
+def test_overwrite_restores_deleted_entry():
+    data = setup_export()
+    write_registry([], deleted=[registry_entry()])
+    assert run_import(data).endswith('Entitätsregister: 1 Eintrag übernommen.')
+    registry = read_entities()
+    assert registry['entities'] == [registry_entry(name='Eigener Name')]
+    assert registry['deleted_entities'] == []
+
+
+def test_overwrite_updates_existing_entry_in_place():
+    data = setup_export()
+    write_registry([registry_entry(id='lokal', entity_id='input_boolean.umbenannt', name=None)])
+    run_import(data)
+    assert read_entities()['entities'] == [registry_entry(id='lokal', name='Eigener Name')]
+
+
+def test_missing_device_is_cleared():
+    data = setup_export()
+    write_registry([])
+    write_storage('core.device_registry', {'devices': [{'id': 'anderes'}]})
+    run_import(data)
+    assert read_entities()['entities'][0]['device_id'] is None
+
+
+def test_rename_adds_entry_with_unique_entity_id():
+    data = setup_export()
+    run_import(data, action='rename', new_name='Kopie')
+    helpers = main.load_json(os.path.join(main.STORAGE_PATH, 'input_boolean'))['data']['items']
+    new_id = next(helper['id'] for helper in helpers if helper['name'] == 'Kopie')
+    original, copy = read_entities()['entities']
+    assert original == registry_entry(name='Eigener Name')
+    assert copy['entity_id'] == 'input_boolean.schalter_2'
+    assert copy['unique_id'] == new_id
+    assert copy['id'] != original['id']
+
+
+def test_missing_registry_is_reported():
+    data = setup_export()
+    os.remove(main.ENTITY_REGISTRY_PATH)
+    assert run_import(data).endswith('Entitätsregister nicht gefunden, Einträge nicht übernommen.')
@@ -0,0 +1,80 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+import main
+from conftest import write_config
+
+
+def build_archive(fileobj, entries, files=(), level=None):
+    with main.ExportArchiveWriter(fileobj, 'zip', level) as archive:
+        for arcname, data in entries:
+            archive.add_bytes(arcname, data, mtime=0 if arcname.startswith('alt') else None)
+        for arcname, path in files:
+            for _ in archive.add_file(arcname, path):
+                pass
+
+
+def check_round_trip(data, expected):
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.testzip() is None
+        assert {info.filename: zf.read(info) for info in zf.infolist()} == expected
+        return zf.infolist()
+
+
+ENTRIES = [
+    ('helper/eins.json', b'{"id": 1}' * 100),
+    ('yaml/größe.yaml', 'name: Größe\n'.encode('utf-8') * 50),
+    ('alt/leer.txt', b''),
+    ('zufall.bin', os.urandom(4096))
+]
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+@pytest.mark.parametrize('level', [0, 6])
+def test_round_trip(monkeypatch, workers, level):
+    monkeypatch.setattr(main.os, 'cpu_count', lambda: workers)
+    buffer = io.BytesIO()
+    build_archive(buffer, ENTRIES, level=level)
+    infos = check_round_trip(buffer.getvalue(), dict(ENTRIES))
+    assert {info.compress_type for info in infos if info.file_size} == {zipfile.ZIP_DEFLATED if level else zipfile.ZIP_STORED}
+    assert infos[1].flag_bits & 0x800
+    assert infos[2].date_time == (1980, 1, 1, 0, 0, 0)
+
+
+@pytest.mark.parametrize('level', [0, 6])
+def test_streamed_large_file_on_unseekable_output(monkeypatch, level):
+    monkeypatch.setattr(main, 'EXPORT_PARALLEL_MAX_ENTRY', 1024)
+    monkeypatch.setattr(main, 'EXPORT_CHUNK_SIZE', 1000)
+    monkeypatch.setattr(main.os, 'cpu_count', lambda: 4)
+    content = os.urandom(5000) + b'a' * 5000
+    path = write_config('blueprints/gross.yaml', '')
+    with open(path, 'wb') as f:
+        f.write(content)
+    stream = main.ExportStreamBuffer()
+    build_archive(stream, ENTRIES[:2], [('blueprint/gross.yaml', path)], level=level)
+    check_round_trip(stream.pop(), dict(ENTRIES[:2], **{'blueprint/gross.yaml': content}))
+
+
+def test_zip64_records(monkeypatch):
+    monkeypatch.setattr(main, 'ZIP64_LIMIT', 100)
+    monkeypatch.setattr(main, 'EXPORT_PARALLEL_MAX_ENTRY', 150)
+    path = write_config('gross.bin', 'x' * 300)
+    buffer = io.BytesIO()
+    build_archive(buffer, ENTRIES, [('gross.bin', path)], level=0)
+    check_round_trip(buffer.getvalue(), dict(ENTRIES, **{'gross.bin': b'x' * 300}))
+
+
+def test_pending_window_is_bounded_by_bytes(monkeypatch):
+    monkeypatch.setattr(main.os, 'cpu_count', lambda: 4)
+    monkeypatch.setattr(main, 'EXPORT_PARALLEL_MAX_PENDING_BYTES', 10000)
+    entries = [(f'eintrag_{i}.bin', bytes([i]) * 4000) for i in range(10)]
+    buffer = io.BytesIO()
+    with main.ExportArchiveWriter(buffer) as archive:
+        for arcname, data in entries:
+            archive.add_bytes(arcname, data)
+            assert archive.pending_bytes <= 10000
+            assert archive.pending_bytes == sum(entry[4] for entry, _ in archive.pending)
+    check_round_trip(buffer.getvalue(), dict(entries))
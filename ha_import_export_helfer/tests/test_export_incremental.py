@@ -0,0 +1,67 @@
+import io
+import json
+import zipfile
+
+import main
+from conftest import write_storage
+
+
+def write_helpers(ids):
+    write_storage('input_boolean', {'items': [{'id': item_id, 'name': f'Schalter {item_id}'} for item_id in ids]})
+    main.invalidate_inventory_snapshot()
+
+
+def helper_ids(ids):
+    return [f'Helfer::input_boolean::{item_id}' for item_id in ids]
+
+
+def export(item_ids):
+    client = main.app.test_client()
+    response = client.post('/api/export', json={'item_ids': item_ids, 'incremental': True, 'baseline': 'manual'})
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.data)) as zf:
+        return json.loads(zf.read('export_incremental.json'))
+
+
+def baseline_ids():
+    return set(main.load_export_baseline('manual')['hashes'])
+
+
+def test_subset_export_keeps_baseline_and_reports_no_deletions():
+    ids = [f'ib{i}' for i in range(6)]
+    write_helpers(ids)
+    export(helper_ids(ids))
+    assert baseline_ids() == set(helper_ids(ids))
+    result = export(helper_ids(ids[:2]))
+    assert result == {'unchanged': helper_ids(ids[:2]), 'deletions': []}
+    assert baseline_ids() == set(helper_ids(ids))
+    assert export(helper_ids(ids))['unchanged'] == helper_ids(ids)
+
+
+def test_deletion_is_reported_only_for_selected_missing_items():
+    ids = [f'ib{i}' for i in range(4)]
+    write_helpers(ids)
+    export(helper_ids(ids))
+    write_helpers(['ib0', 'ib1'])
+    assert export(helper_ids(['ib0', 'ib2']))['deletions'] == helper_ids(['ib2'])
+    assert baseline_ids() == set(helper_ids(['ib0', 'ib1', 'ib3']))
+
+
+def test_failed_items_are_neither_hashed_nor_deleted(monkeypatch):
+    ids = ['ib0', 'ib1']
+    write_helpers(ids)
+    export(helper_ids(ids))
+    stored = dict(main.load_export_baseline('manual')['hashes'])
+    write_storage('input_boolean', {'items': [{'id': 'ib0', 'name': 'Neu'}, {'id': 'ib1', 'name': 'Neu'}]})
+    original = main.hash_helper_export
+
+    def failing_hash(config_data, registry_entries):
+        if config_data['id'] == 'ib1':
+            raise OSError('nicht lesbar')
+        return original(config_data, registry_entries)
+    monkeypatch.setattr(main, 'hash_helper_export', failing_hash)
+    result = export(helper_ids(ids))
+    assert result == {'unchanged': [], 'deletions': []}
+    hashes = main.load_export_baseline('manual')['hashes']
+    assert hashes[helper_ids(['ib1'])[0]] == stored[helper_ids(['ib1'])[0]]
+    assert hashes[helper_ids(['ib0'])[0]] != stored[helper_ids(['ib0'])[0]]
@@ -0,0 +1,86 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+import main
+from conftest import export_archive, write_config, write_storage
+
+ITEM_IDS = ['Helfer::input_boolean::ib0', 'Helfer::input_boolean::ib1', 'Automation (YAML)::a1']
+
+
+def write_items(names, alias='Licht Bad'):
+    write_storage('input_boolean', {'items': [{'id': f'ib{i}', 'name': name} for i, name in enumerate(names)]})
+    write_config('automations.yaml', f"- id: 'a1'\n  alias: {alias}\n")
+    main.invalidate_inventory_snapshot()
+
+
+def analyze(data):
+    response = main.app.test_client().post('/api/analyze_import', data={'file': (io.BytesIO(data), 'backup.zip')}, content_type='multipart/form-data')
+    return response
+
+
+def statuses(data):
+    response = analyze(data)
+    assert response.status_code == 200
+    return {item['id']: item['status'] for item in response.get_json()['items']}
+
+
+def rewrite_manifest(data, manifest):
+    source = zipfile.ZipFile(io.BytesIO(data))
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        for name in source.namelist():
+            zf.writestr(name, json.dumps(manifest) if name == 'export_manifest.json' else source.read(name))
+    return buffer.getvalue()
+
+
+def test_identical_items_are_unchanged():
+    write_items(['A', 'B'])
+    data = export_archive(ITEM_IDS)
+    assert set(statuses(data).values()) == {'unchanged'}
+
+
+def test_changed_and_missing_items_are_detected():
+    write_items(['A', 'B'])
+    data = export_archive(ITEM_IDS)
+    write_items(['A'], alias='Licht Küche')
+    assert statuses(data) == {
+        'Helfer::input_boolean::ib0': 'unchanged',
+        'Helfer::input_boolean::ib1': 'new',
+        'Automation (YAML)::a1': 'conflict'
+    }
+
+
+def test_v2_manifest_is_analyzed_without_reading_items(monkeypatch):
+    write_items(['A', 'B'])
+    data = export_archive(ITEM_IDS)
+    reads = []
+    monkeypatch.setattr(main.UploadSession, 'read_bytes', lambda self, zip_path: reads.append(zip_path))
+    response = analyze(data)
+    assert response.status_code == 200
+    assert {item['name'] for item in response.get_json()['items']} == {'A', 'B', 'Licht Bad'}
+    assert reads == []
+
+
+def test_v1_manifest_falls_back_to_conflict_and_item_names():
+    write_items(['A', 'B'])
+    data = export_archive(ITEM_IDS)
+    manifest = json.loads(zipfile.ZipFile(io.BytesIO(data)).read('export_manifest.json'))
+    entries = [{key: value for key, value in entry.items() if key not in ('name', 'size', 'hash')} for entry in manifest['entries']]
+    legacy = rewrite_manifest(data, entries)
+    response = analyze(legacy)
+    assert response.status_code == 200
+    items = response.get_json()['items']
+    assert {item['status'] for item in items} == {'conflict'}
+    assert {item['name'] for item in items} == {'A', 'B', 'Licht Bad'}
+
+
+@pytest.mark.parametrize('manifest', [{'version': main.EXPORT_MANIFEST_VERSION + 1, 'entries': []}, {'version': 2, 'entries': {}}])
+def test_unsupported_manifest_is_rejected(manifest):
+    write_items(['A'])
+    data = rewrite_manifest(export_archive(ITEM_IDS[:1]), manifest)
+    response = analyze(data)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
@@ -0,0 +1,101 @@
+import io
+import json
+import os
+
+import pytest
+
+import main
+from conftest import export_archive, write_storage
+
+ITEM_IDS = [f'Helfer::input_boolean::ib{i}' for i in range(3)]
+
+
+def write_helpers(names):
+    write_storage('input_boolean', {'items': [{'id': f'ib{i}', 'name': name} for i, name in names.items()]})
+    main.invalidate_inventory_snapshot()
+
+
+def helper_names():
+    return {item['id']: item['name'] for item in main.load_json(os.path.join(main.STORAGE_PATH, 'input_boolean'))['data']['items']}
+
+
+@pytest.fixture
+def session():
+    write_helpers({0: 'A', 1: 'B', 2: 'C'})
+    data = export_archive(ITEM_IDS)
+    write_helpers({0: 'A', 1: 'B geändert'})
+    response = main.app.test_client().post('/api/analyze_import', data={'file': (io.BytesIO(data), 'backup.zip')}, content_type='multipart/form-data')
+    return main.require_upload_session(response.get_json()['session_id'])
+
+
+def zip_path(session, item_id):
+    return next(item['zip_path'] for item in session.manifest if item['id'] == item_id)
+
+
+def decide(session, policy, overrides=()):
+    form = {'policy': json.dumps(policy), 'overrides': json.dumps(list(overrides))}
+    decisions, policy, overrides = main.parse_import_decisions(form)
+    assert decisions is None
+    return {decision['id']: decision['action'] for decision in main.build_import_decisions(session, policy, overrides)}
+
+
+def test_default_policy_skips_everything(session):
+    assert decide(session, {}) == {}
+
+
+@pytest.mark.parametrize('policy, expected', [
+    ({'new': 'overwrite'}, {ITEM_IDS[2]: 'overwrite'}),
+    ({'conflict': 'overwrite'}, {ITEM_IDS[1]: 'overwrite'}),
+    ({'unchanged': 'overwrite'}, {ITEM_IDS[0]: 'overwrite'}),
+])
+def test_policy_applies_per_status(session, policy, expected):
+    assert decide(session, policy) == expected
+
+
+def test_equal_conflict_and_unchanged_actions_skip_hashing(session, monkeypatch):
+    monkeypatch.setattr(main, 'get_live_item_hashes', lambda item_ids: pytest.fail('Hashes sollten nicht berechnet werden'))
+    assert decide(session, {'conflict': 'overwrite', 'unchanged': 'overwrite'}) == {ITEM_IDS[0]: 'overwrite', ITEM_IDS[1]: 'overwrite'}
+
+
+def test_override_wins_over_policy(session):
+    overrides = [
+        {'zip_path': zip_path(session, ITEM_IDS[1]), 'action': 'skip'},
+        {'zip_path': zip_path(session, ITEM_IDS[0]), 'action': 'rename', 'new_name': 'A Kopie'}
+    ]
+    assert decide(session, {'conflict': 'overwrite', 'new': 'overwrite'}, overrides) == {ITEM_IDS[0]: 'rename', ITEM_IDS[1]: 'skip', ITEM_IDS[2]: 'overwrite'}
+
+
+def test_explicit_decisions_bypass_policy():
+    decisions = [{'id': ITEM_IDS[0], 'zip_path': 'helper/input_boolean_ib0.json', 'action': 'overwrite'}]
+    assert main.parse_import_decisions({'decisions': json.dumps(decisions)}) == (decisions, None, None)
+
+
+@pytest.mark.parametrize('form', [
+    {},
+    {'policy': '{'},
+    {'policy': '[]'},
+    {'policy': json.dumps({'changed': 'overwrite'})},
+    {'policy': json.dumps({'new': 'rename'})},
+    {'policy': '{}', 'overrides': json.dumps([{'action': 'skip'}])},
+    {'policy': '{}', 'overrides': json.dumps([{'zip_path': 'a.json', 'action': 'rename'}])},
+    {'decisions': json.dumps({'id': 'x'})},
+])
+def test_invalid_requests_are_rejected(form):
+    with pytest.raises(ValueError):
+        main.parse_import_decisions(form)
+
+
+def test_execute_applies_policy_and_overrides(session):
+    response = main.app.test_client().post('/api/execute_import', data={
+        'session_id': session.session_id,
+        'policy': json.dumps({'conflict': 'overwrite', 'new': 'overwrite'}),
+        'overrides': json.dumps([{'zip_path': zip_path(session, ITEM_IDS[2]), 'action': 'skip'}])
+    }, content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert helper_names() == {'ib0': 'A', 'ib1': 'B'}
+
+
+def test_invalid_policy_returns_400(session):
+    response = main.app.test_client().post('/api/execute_import', data={'session_id': session.session_id, 'policy': json.dumps({'new': 'delete'})}, content_type='multipart/form-data')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
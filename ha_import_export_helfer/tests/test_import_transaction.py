@@ -0,0 +1,118 @@
+import glob
+import json
+import os
+
+import pytest
+
+import main
+from conftest import read_config, write_config
+
+
+class Interrupted(BaseException):
+    pass
+
+
+def interrupt_on_call(monkeypatch, name, call):
+    original = getattr(main, name)
+    calls = []
+
+    def wrapper(*args):
+        calls.append(args)
+        if len(calls) == call:
+            raise Interrupted()
+        return original(*args)
+    monkeypatch.setattr(main, name, wrapper)
+
+
+def import_files():
+    with main.ImportTransaction():
+        main.write_import_file(os.path.join(main.CONFIG_PATH, 'automations.yaml'), "- id: 'neu'\n")
+        main.write_import_file(os.path.join(main.CONFIG_PATH, 'packages', 'neu', 'paket.yaml'), 'x: 1\n')
+
+
+def journals():
+    return glob.glob(os.path.join(main.TRANSACTIONS_PATH, '*'))
+
+
+def staged_files():
+    return glob.glob(os.path.join(main.CONFIG_PATH, '**', '*.tmp'), recursive=True)
+
+
+def test_commit_writes_all_files():
+    write_config('automations.yaml', "- id: 'alt'\n")
+    import_files()
+    assert read_config('automations.yaml') == "- id: 'neu'\n"
+    assert read_config('packages/neu/paket.yaml') == 'x: 1\n'
+    assert journals() == []
+    assert staged_files() == []
+
+
+def test_interrupt_after_prepare_is_discarded(monkeypatch):
+    write_config('automations.yaml', "- id: 'alt'\n")
+    interrupt_on_call(monkeypatch, 'write_transaction_journal', 2)
+    with pytest.raises(Interrupted):
+        import_files()
+    [journal_path] = journals()
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        assert json.load(f)['state'] == 'prepared'
+    assert len(staged_files()) == 2
+    main.recover_import_transactions()
+    assert journals() == []
+    assert staged_files() == []
+    assert read_config('automations.yaml') == "- id: 'alt'\n"
+    assert not os.path.exists(os.path.join(main.CONFIG_PATH, 'packages'))
+
+
+def test_interrupt_after_commit_journal_rolls_forward(monkeypatch):
+    write_config('automations.yaml', "- id: 'alt'\n")
+    interrupt_on_call(monkeypatch, 'apply_transaction_journal', 1)
+    with pytest.raises(Interrupted):
+        import_files()
+    [journal_path] = journals()
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        assert json.load(f)['state'] == 'committed'
+    assert read_config('automations.yaml') == "- id: 'alt'\n"
+    monkeypatch.undo()
+    main.recover_import_transactions()
+    assert journals() == []
+    assert staged_files() == []
+    assert read_config('automations.yaml') == "- id: 'neu'\n"
+    assert read_config('packages/neu/paket.yaml') == 'x: 1\n'
+
+
+def test_stray_journal_tmp_is_removed():
+    write_config('automations.yaml', "- id: 'alt'\n")
+    os.makedirs(main.TRANSACTIONS_PATH)
+    with open(os.path.join(main.TRANSACTIONS_PATH, 'abc.json.tmp'), 'w', encoding='utf-8') as f:
+        f.write('{"id": "abc", "sta')
+    main.recover_import_transactions()
+    assert journals() == []
+    assert read_config('automations.yaml') == "- id: 'alt'\n"
+
+
+def test_failed_prepare_leaves_nothing_behind(monkeypatch):
+    write_config('automations.yaml', "- id: 'alt'\n")
+    original = main.sync_directories
+    calls = []
+
+    def failing_sync(paths):
+        calls.append(paths)
+        if len(calls) == 2:
+            raise OSError('Datenträger voll')
+        return original(paths)
+    monkeypatch.setattr(main, 'sync_directories', failing_sync)
+    with pytest.raises(OSError):
+        import_files()
+    assert journals() == []
+    assert staged_files() == []
+    assert read_config('automations.yaml') == "- id: 'alt'\n"
+    assert not os.path.exists(os.path.join(main.CONFIG_PATH, 'packages'))
+
+
+def test_aborted_import_stages_nothing():
+    with pytest.raises(RuntimeError):
+        with main.ImportTransaction():
+            main.write_import_file(os.path.join(main.CONFIG_PATH, 'packages', 'neu', 'paket.yaml'), 'x: 1\n')
+            raise RuntimeError('Abbruch')
+    assert journals() == []
+    assert not os.path.exists(os.path.join(main.CONFIG_PATH, 'packages'))
@@ -0,0 +1,94 @@
+import os
+import sqlite3
+
+import pytest
+
+import main
+from conftest import write_config
+
+
+@pytest.fixture(autouse=True)
+def fresh_index(monkeypatch):
+    monkeypatch.setattr(main, 'inventory_index_db', None)
+    monkeypatch.setattr(main, 'inventory_index_disabled', False)
+    yield
+    if main.inventory_index_db is not None:
+        main.inventory_index_db.close()
+
+
+def count_scans(monkeypatch):
+    calls = []
+    original = main.scan_yaml_list_source
+
+    def wrapper(path, item_type):
+        calls.append(path)
+        return original(path, item_type)
+    monkeypatch.setattr(main, 'scan_yaml_list_source', wrapper)
+    return calls
+
+
+def item_names(items):
+    return sorted(item['name'] for item in items if item['type'] == 'Automation (YAML)')
+
+
+def test_unchanged_source_is_served_from_index(monkeypatch):
+    write_config('automations.yaml', "- id: 'a1'\n  alias: Licht\n")
+    first = main.get_items()
+    calls = count_scans(monkeypatch)
+    assert main.get_items() == first
+    assert calls == []
+    assert item_names(first) == ['Licht']
+
+
+def test_changed_source_is_rescanned(monkeypatch):
+    path = write_config('automations.yaml', "- id: 'a1'\n  alias: Licht\n")
+    main.get_items()
+    calls = count_scans(monkeypatch)
+    write_config('automations.yaml', "- id: 'a1'\n  alias: Licht\n- id: 'a2'\n  alias: Heizung\n")
+    assert item_names(main.get_items()) == ['Heizung', 'Licht']
+    assert calls == [path]
+
+
+def test_removed_source_is_pruned():
+    path = write_config('automations.yaml', "- id: 'a1'\n  alias: Licht\n")
+    main.get_items()
+    assert main.inventory_index_db.execute('SELECT COUNT(*) FROM items WHERE path = ?', (path,)).fetchone()[0] == 1
+    os.remove(path)
+    assert item_names(main.get_items()) == []
+    assert main.inventory_index_db.execute('SELECT COUNT(*) FROM sources WHERE path = ?', (path,)).fetchone()[0] == 0
+    assert main.inventory_index_db.execute('SELECT COUNT(*) FROM items WHERE path = ?', (path,)).fetchone()[0] == 0
+
+
+def test_version_change_discards_index(monkeypatch):
+    write_config('automations.yaml', "- id: 'a1'\n  alias: Licht\n")
+    main.get_items()
+    main.inventory_index_db.close()
+    monkeypatch.setattr(main, 'inventory_index_db', None)
+    monkeypatch.setattr(main, 'INVENTORY_INDEX_VERSION', main.INVENTORY_INDEX_VERSION + 1)
+    db = main.get_inventory_index()
+    assert db.execute('SELECT COUNT(*) FROM items').fetchone()[0] == 0
+    assert db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0] == str(main.INVENTORY_INDEX_VERSION)
+
+
+def test_unusable_index_falls_back_to_scanning(monkeypatch):
+    def fail(*args, **kwargs):
+        raise sqlite3.OperationalError('unable to open database file')
+    monkeypatch.setattr(main.sqlite3, 'connect', fail)
+    write_config('automations.yaml', "- id: 'a1'\n  alias: Licht\n")
+    assert item_names(main.get_items()) == ['Licht']
+    assert main.inventory_index_disabled
+
+
+def test_current_inventory_revalidates_sources(monkeypatch):
+    write_config('automations.yaml', "- id: 'a1'\n  alias: Licht\n")
+    generation, items = main.get_current_inventory()
+    calls = []
+    original = main.get_items
+    monkeypatch.setattr(main, 'get_items', lambda **kwargs: calls.append(kwargs) or original(**kwargs))
+    assert main.get_current_inventory() == (generation, items)
+    assert calls == []
+    write_config('scripts.yaml', "heizen:\n  alias: Heizen\n")
+    new_generation, new_items = main.get_current_inventory()
+    assert len(calls) == 1
+    assert new_generation > generation
+    assert len(new_items) > len(items)
@@ -0,0 +1,65 @@
+import os
+import sys
+
+import pytest
+
+import main
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith('linux'), reason='inotify nur unter Linux')
+
+
+@pytest.fixture
+def watcher():
+    watcher = main.InotifyWatcher()
+    yield watcher
+    watcher.close()
+
+
+def drain(watcher, pending_paths):
+    full_rescan = False
+    while True:
+        events = watcher.read_events(0.2)
+        if not events:
+            return full_rescan
+        full_rescan = main.process_inotify_events(watcher, events, pending_paths) or full_rescan
+
+
+def test_moved_directory_is_rerooted(watcher):
+    os.makedirs(os.path.join(main.CONFIG_PATH, 'packages', 'lights'))
+    watcher.add_tree(main.CONFIG_PATH)
+    os.rename(os.path.join(main.CONFIG_PATH, 'packages'), os.path.join(main.CONFIG_PATH, 'pkgs'))
+    assert drain(watcher, set())
+    paths = set(watcher.watches.values())
+    assert os.path.join(main.CONFIG_PATH, 'pkgs', 'lights') in paths
+    assert not any(path.startswith(os.path.join(main.CONFIG_PATH, 'packages')) for path in paths)
+    with open(os.path.join(main.CONFIG_PATH, 'pkgs', 'lights', 'kitchen.yaml'), 'w') as f:
+        f.write('light: []\n')
+    pending_paths = set()
+    drain(watcher, pending_paths)
+    assert pending_paths == {os.path.join(main.CONFIG_PATH, 'pkgs', 'lights', 'kitchen.yaml')}
+
+
+def test_directory_moved_out_is_dropped(watcher, tmp_path):
+    os.makedirs(os.path.join(main.CONFIG_PATH, 'packages', 'lights'))
+    watcher.add_tree(main.CONFIG_PATH)
+    os.rename(os.path.join(main.CONFIG_PATH, 'packages'), str(tmp_path / 'packages'))
+    assert drain(watcher, set())
+    assert set(watcher.watches.values()) == {main.CONFIG_PATH}
+
+
+def test_setup_failure_closes_descriptor(monkeypatch):
+    closed = []
+    original_close = main.InotifyWatcher.close
+    def close(self):
+        closed.append(self.fd)
+        original_close(self)
+    def fail(self, root):
+        raise OSError('kaputt')
+    monkeypatch.setattr(main.InotifyWatcher, 'close', close)
+    monkeypatch.setattr(main.InotifyWatcher, 'add_tree', fail)
+    monkeypatch.setattr(main, 'inventory_watch_mode', None)
+    monkeypatch.setattr(main, 'run_polling_watcher', lambda interval: None)
+    main.addon_options = {'inventory_watcher': 'inotify'}
+    main.start_inventory_watcher()
+    assert len(closed) == 1 and closed[0] >= 0
+    assert main.inventory_watch_mode == 'polling'
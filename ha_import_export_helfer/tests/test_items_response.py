@@ -0,0 +1,56 @@
+import os
+
+import main
+from conftest import write_config, write_storage
+
+
+def count_scans(monkeypatch):
+    calls = []
+    original = main.scan_inventory_sections
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+    monkeypatch.setattr(main, 'scan_inventory_sections', counting)
+    return calls
+
+
+def test_unchanged_inventory_answers_304_without_scan(monkeypatch):
+    write_storage('input_boolean', {'items': [{'id': 'ib0', 'name': 'Schalter'}]})
+    calls = count_scans(monkeypatch)
+    client = main.app.test_client()
+    etag = client.get('/api/items').headers['ETag']
+    assert len(calls) == 1
+    response = client.get('/api/items', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert len(calls) == 1
+
+
+def test_external_write_is_seen_on_next_request(monkeypatch):
+    write_storage('input_boolean', {'items': [{'id': 'ib0', 'name': 'Schalter'}]})
+    client = main.app.test_client()
+    etag = client.get('/api/items').headers['ETag']
+    calls = count_scans(monkeypatch)
+    write_storage('input_boolean', {'items': [{'id': 'ib0', 'name': 'Schalter'}, {'id': 'ib1', 'name': 'Zweiter'}]})
+    response = client.get('/api/items', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert len(calls) == 1
+    assert 'Helfer::input_boolean::ib1' in {item['id'] for item in response.get_json()}
+
+
+def test_new_yaml_file_in_subdirectory_is_seen(monkeypatch):
+    write_config('packages/a.yaml', 'a: 1\n')
+    client = main.app.test_client()
+    etag = client.get('/api/items').headers['ETag']
+    write_config('packages/b.yaml', 'b: 1\n')
+    response = client.get('/api/items', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert 'YAML-Datei::' + os.path.join('packages', 'b.yaml') in {item['id'] for item in response.get_json()}
+
+
+def test_search_index_follows_inventory():
+    write_storage('input_boolean', {'items': [{'id': 'ib0', 'name': 'Schalter'}]})
+    client = main.app.test_client()
+    assert client.get('/api/items?q=Zweiter').get_json()['total'] == 0
+    write_storage('input_boolean', {'items': [{'id': 'ib0', 'name': 'Schalter'}, {'id': 'ib1', 'name': 'Zweiter'}]})
+    assert client.get('/api/items?q=Zweiter').get_json()['total'] == 1
@@ -0,0 +1,75 @@
+import pytest
+
+import main
+from conftest import write_config, write_storage
+
+
+@pytest.fixture
+def client():
+    write_storage('input_boolean', {'items': [{'id': f'ib{i}', 'name': f'Schalter {i}'} for i in range(5)]})
+    write_storage('core.automation', {'automation': {'flur': {'id': 'au1', 'alias': 'Licht Flur'}}})
+    write_config('automations.yaml', "- id: 'a1'\n  alias: Licht Bad\n- id: 'a2'\n  alias: Nachtlicht\n")
+    return main.app.test_client()
+
+
+def ids(page):
+    return [item['id'] for item in page['items']]
+
+
+def test_paging_covers_all_items_once(client):
+    seen = []
+    offset = 0
+    while True:
+        page = client.get(f'/api/items?sort=id&offset={offset}&limit=3').get_json()
+        assert page['total'] == 8 and page['inventory_total'] == 8
+        if not page['items']:
+            break
+        seen.extend(ids(page))
+        offset += 3
+    assert seen == sorted(seen)
+    assert len(set(seen)) == 8
+
+
+def test_contains_and_prefix_search_ignore_case(client):
+    contains = client.get('/api/items?q=LICHT').get_json()
+    assert sorted(ids(contains)) == ['Automation (YAML)::a1', 'Automation (YAML)::a2', 'Automation::au1']
+    prefix = client.get('/api/items?q=licht&match=prefix').get_json()
+    assert sorted(ids(prefix)) == ['Automation (YAML)::a1', 'Automation::au1']
+
+
+def test_type_filter_includes_yaml_variant(client):
+    page = client.get('/api/items?type=Automation').get_json()
+    assert page['total'] == 3
+    assert page['type_counts'] == {'Automation': 1, 'Automation (YAML)': 2}
+    assert client.get('/api/items?type=Automation%20(YAML)').get_json()['total'] == 2
+
+
+def test_source_filter_and_descending_sort(client):
+    page = client.get('/api/items?source=.storage/input_boolean&sort=name&order=desc').get_json()
+    assert [item['name'] for item in page['items']] == [f'Schalter {i}' for i in reversed(range(5))]
+
+
+def test_type_counts_ignore_paging(client):
+    page = client.get('/api/items?q=schalter&limit=2').get_json()
+    assert len(page['items']) == 2
+    assert page['total'] == 5
+    assert page['type_counts'] == {'Helfer': 5}
+
+
+@pytest.mark.parametrize('query', ['offset=-1', 'limit=0', f'limit={main.ITEMS_PAGE_MAX_LIMIT + 1}', 'limit=x', 'sort=alias', 'order=up', 'match=regex'])
+def test_invalid_parameters_are_rejected(client, query):
+    response = client.get(f'/api/items?{query}')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_search_index_is_reused_per_generation(client, monkeypatch):
+    client.get('/api/items?q=a')
+    calls = []
+    original = main.build_item_search_index
+    monkeypatch.setattr(main, 'build_item_search_index', lambda *args: calls.append(args) or original(*args))
+    client.get('/api/items?q=b')
+    assert calls == []
+    write_config('automations.yaml', "- id: 'a1'\n  alias: Licht Bad\n")
+    assert client.get('/api/items?type=Automation').get_json()['total'] == 2
+    assert len(calls) == 1
@@ -0,0 +1,47 @@
+import json
+import os
+import re
+
+import main
+
+
+def scrape():
+    response = main.app.test_client().get('/api/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    return response.get_data(as_text=True)
+
+
+def sample(text, series):
+    match = re.search(rf'^{re.escape(series)} (\S+)$', text, re.M)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_scrape_reports_own_requests():
+    main.app.test_client().get('/api/items').close()
+    text = scrape()
+    assert '# TYPE ieh_http_request_duration_seconds histogram' in text
+    assert sample(text, 'ieh_http_request_duration_seconds_count{endpoint="/api/items",method="GET",status="200"}') >= 1
+
+
+def test_scrape_adds_other_workers():
+    series = 'ieh_file_read_bytes_total{file="anderer_worker.yaml"}'
+    histogram = 'ieh_file_lock_wait_seconds_count{lock="anderer_worker"}'
+    os.makedirs(main.METRICS_PATH, exist_ok=True)
+    with open(os.path.join(main.METRICS_PATH, '1_abcdef01.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'ieh_file_read_bytes_total': [[[['file', 'anderer_worker.yaml']], 100]],
+            'ieh_file_lock_wait_seconds': [[[['lock', 'anderer_worker']], [[1] + [0] * len(main.METRICS_BUCKETS), 0.0005, 1]]]
+        }, f)
+    text = scrape()
+    assert sample(text, series) == 100
+    assert sample(text, histogram) == 1
+    main.count_file_read(os.path.join(main.CONFIG_PATH, 'anderer_worker.yaml'), 20)
+    assert sample(scrape(), series) == 120
+
+
+def test_own_store_is_not_counted_twice():
+    main.count_file_read(os.path.join(main.CONFIG_PATH, 'eigener_worker.yaml'), 7)
+    main.write_metrics_store()
+    main.write_metrics_store()
+    assert sample(scrape(), 'ieh_file_read_bytes_total{file="eigener_worker.yaml"}') == 7
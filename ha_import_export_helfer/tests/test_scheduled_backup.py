@@ -0,0 +1,64 @@
+import itertools
+import json
+import os
+import zipfile
+
+import pytest
+
+import main
+from conftest import write_storage
+
+
+@pytest.fixture
+def target(tmp_path, monkeypatch):
+    counter = itertools.count(1)
+    monkeypatch.setattr(main, 'BACKUP_TARGET_PATHS', {'backup': str(tmp_path)})
+    monkeypatch.setattr(main.time, 'strftime', lambda fmt, *args: f'20260101_{next(counter):06d}')
+    return os.path.join(str(tmp_path), 'import_export_helfer')
+
+
+def write_helpers(ids):
+    write_storage('input_boolean', {'items': [{'id': item_id, 'name': f'Schalter {item_id}'} for item_id in ids]})
+
+
+def archives(target):
+    return [name for name, is_full in main.list_scheduled_backups(target)]
+
+
+def read_incremental(target, name):
+    with zipfile.ZipFile(os.path.join(target, name)) as zf:
+        return json.loads(zf.read('export_incremental.json'))
+
+
+def test_incremental_backup_reports_deletions_and_rebases(target):
+    write_helpers(['ib0', 'ib1'])
+    main.run_scheduled_backup()
+    main.run_scheduled_backup()
+    assert archives(target) == ['Sicherung_20260101_000001_voll.zip']
+    write_helpers(['ib0'])
+    main.run_scheduled_backup()
+    names = archives(target)
+    assert names[-1].endswith('_inkrementell.zip')
+    assert read_incremental(target, names[-1])['deletions'] == ['Helfer::input_boolean::ib1']
+    assert set(main.load_export_baseline(main.SCHEDULED_BACKUP_BASELINE)['hashes']) == {'Helfer::input_boolean::ib0'}
+
+
+def test_full_backup_is_forced_after_configured_count(target):
+    main.addon_options = {'backup_full_every': 2}
+    for name in ('ib0', 'ib1', 'ib2'):
+        write_helpers([name])
+        main.run_scheduled_backup()
+    assert [name.rsplit('_', 1)[1] for name in archives(target)] == ['voll.zip', 'inkrementell.zip', 'voll.zip']
+
+
+@pytest.mark.parametrize('names, kept', [
+    (['1_voll', '2_inkrementell', '3_inkrementell'], ['1_voll', '2_inkrementell', '3_inkrementell']),
+    (['1_voll', '2_inkrementell', '3_voll', '4_inkrementell'], ['3_voll', '4_inkrementell']),
+])
+def test_pruning_keeps_chain_of_latest_full_backup(tmp_path, names, kept):
+    main.addon_options = {'backup_keep': 2}
+    for name in names:
+        (tmp_path / f'Sicherung_20260101_00000{name}.zip').write_bytes(b'')
+    (tmp_path / 'fremd.zip').write_bytes(b'')
+    main.prune_scheduled_backups(str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == sorted([f'Sicherung_20260101_00000{name}.zip' for name in kept] + ['fremd.zip'])
@@ -0,0 +1,81 @@
+import io
+import json
+
+import main
+from conftest import export_archive, write_storage
+
+
+def write_helpers(names):
+    write_storage('input_boolean', {'items': [{'id': f'ib{i}', 'name': name} for i, name in enumerate(names)]})
+    main.invalidate_inventory_snapshot()
+
+
+def analyze(client, data):
+    response = client.post('/api/analyze_import', data={'file': (io.BytesIO(data), 'backup.zip')}, content_type='multipart/form-data')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def execute(client, session_id):
+    return client.post('/api/execute_import', data={'session_id': session_id, 'policy': json.dumps({'conflict': 'overwrite'})}, content_type='multipart/form-data')
+
+
+def test_execute_reuses_analyzed_upload(monkeypatch):
+    write_helpers(['Alt A', 'Alt B'])
+    data = export_archive(['Helfer::input_boolean::ib0', 'Helfer::input_boolean::ib1'])
+    write_helpers(['Neu A', 'Neu B'])
+    client = main.app.test_client()
+    result = analyze(client, data)
+    assert {item['status'] for item in result['items']} == {'conflict'}
+    stored = []
+    original = main.store_upload_session
+    monkeypatch.setattr(main, 'store_upload_session', lambda file: stored.append(file) or original(file))
+    response = execute(client, result['session_id'])
+    assert response.status_code == 200
+    assert stored == []
+    names = [item['name'] for item in main.load_json(main.os.path.join(main.STORAGE_PATH, 'input_boolean'))['data']['items']]
+    assert names == ['Alt A', 'Alt B']
+
+
+def test_same_upload_maps_to_same_session():
+    write_helpers(['A'])
+    data = export_archive(['Helfer::input_boolean::ib0'])
+    client = main.app.test_client()
+    assert analyze(client, data)['session_id'] == analyze(client, data)['session_id']
+
+
+def test_memory_trim_evicts_older_sessions(monkeypatch):
+    write_helpers(['A', 'B'])
+    first = main.require_upload_session(analyze(main.app.test_client(), export_archive(['Helfer::input_boolean::ib0']))['session_id'])
+    second = main.require_upload_session(analyze(main.app.test_client(), export_archive(['Helfer::input_boolean::ib1']))['session_id'])
+    with first.open_archive() as zf:
+        first.read_item_data(zf, first.manifest[0])
+    monkeypatch.setattr(main, 'UPLOAD_SESSION_MEMORY_MAX_BYTES', first.size + 1)
+    with second.open_archive() as zf:
+        second.read_item_data(zf, second.manifest[0])
+    assert list(main.upload_sessions) == [second.session_id]
+
+
+def test_single_session_stays_within_memory_cap(monkeypatch):
+    write_helpers([f'Schalter {i}' for i in range(5)])
+    data = export_archive([f'Helfer::input_boolean::ib{i}' for i in range(5)])
+    session = main.require_upload_session(analyze(main.app.test_client(), data)['session_id'])
+    with session.open_archive() as zf:
+        one = main.estimate_document_size(main.read_import_item_data(zf, session.manifest[0]))
+        monkeypatch.setattr(main, 'UPLOAD_SESSION_MEMORY_MAX_BYTES', one * 2)
+        for manifest_item in session.manifest:
+            item_data = session.read_item_data(zf, manifest_item)
+            assert item_data['name'] == manifest_item['name']
+    assert len(session.entries) == 2
+    assert session.size <= main.UPLOAD_SESSION_MEMORY_MAX_BYTES
+    assert list(main.upload_sessions) == [session.session_id]
+
+
+def test_disk_budget_removes_oldest_upload():
+    main.addon_options = {'upload_session_max_mb': 0}
+    write_helpers(['A', 'B'])
+    client = main.app.test_client()
+    first = analyze(client, export_archive(['Helfer::input_boolean::ib0']))['session_id']
+    analyze(client, export_archive(['Helfer::input_boolean::ib1']))
+    response = execute(client, first)
+    assert response.status_code == 410
@@ -0,0 +1,137 @@
+import main
+from conftest import read_config, write_config
+
+AUTOMATIONS = """# Automationen
+- id: 'a1'
+  alias: Erste
+  trigger: []
+  action: []
+
+# Zwischen den Einträgen
+- id: 'a2'
+  alias: Zweite  # Inline-Kommentar
+  trigger: []
+  action: []
+"""
+
+SCRIPTS = """licht_an:
+  alias: Licht an
+  sequence: []
+# Kommentar zwischen Skripten
+licht_aus:
+  alias: Licht aus
+  sequence: []
+"""
+
+
+def open_target(name):
+    return main.load_import_target(('yaml_item', name), {})
+
+
+def test_append_keeps_existing_text(caplog):
+    write_config('automations.yaml', AUTOMATIONS)
+    target = open_target('automations.yaml')
+    assert target['splice'] is not None
+    target['splice'].set_entry('a3', {'id': 'a3', 'alias': 'Dritte', 'trigger': [], 'action': []}, append=True)
+    assert main.save_import_target(target)
+    assert 'verworfen' not in caplog.text
+    text = read_config('automations.yaml')
+    assert text.startswith(AUTOMATIONS)
+    assert [entry['id'] for entry in main.safe_yaml.load(text)] == ['a1', 'a2', 'a3']
+
+
+def test_replace_keeps_comments_between_entries(caplog):
+    write_config('automations.yaml', AUTOMATIONS)
+    target = open_target('automations.yaml')
+    target['splice'].set_entry('a1', {'id': 'a1', 'alias': 'Neu', 'trigger': [], 'action': []})
+    assert main.save_import_target(target)
+    assert 'verworfen' not in caplog.text
+    text = read_config('automations.yaml')
+    assert text.startswith('# Automationen\n')
+    assert text.endswith(AUTOMATIONS[AUTOMATIONS.index('\n# Zwischen'):])
+    assert [entry['alias'] for entry in main.safe_yaml.load(text)] == ['Neu', 'Zweite']
+
+
+def test_dict_form_replace_and_add(caplog):
+    write_config('scripts.yaml', SCRIPTS)
+    target = open_target('scripts.yaml')
+    assert target['splice'].form == 'dict'
+    target['splice'].set_entry('licht_aus', {'alias': 'Aus', 'sequence': []})
+    target['splice'].set_entry('neu', {'alias': 'Neu', 'sequence': []})
+    assert main.save_import_target(target)
+    assert 'verworfen' not in caplog.text
+    text = read_config('scripts.yaml')
+    assert text.startswith(SCRIPTS[:SCRIPTS.index('licht_aus:')])
+    assert main.safe_yaml.load(text) == {
+        'licht_an': {'alias': 'Licht an', 'sequence': []},
+        'licht_aus': {'alias': 'Aus', 'sequence': []},
+        'neu': {'alias': 'Neu', 'sequence': []},
+    }
+
+
+def test_empty_list_file_is_spliced():
+    write_config('scenes.yaml', '[]\n')
+    target = open_target('scenes.yaml')
+    target['splice'].set_entry('s1', {'id': 's1', 'name': 'Szene'}, append=True)
+    assert main.save_import_target(target)
+    assert main.safe_yaml.load(read_config('scenes.yaml')) == [{'id': 's1', 'name': 'Szene'}]
+
+
+def test_alias_falls_back_to_full_load(caplog):
+    write_config('automations.yaml', "- id: 'a1'\n  action: &aktion []\n- id: 'a2'\n  action: *aktion\n")
+    target = open_target('automations.yaml')
+    assert target['splice'] is None
+    assert 'gezieltes Ersetzen nicht möglich' in caplog.text
+    assert [entry['id'] for entry in target['document']] == ['a1', 'a2']
+
+
+def test_unknown_structure_falls_back_to_full_load(caplog):
+    write_config('automations.yaml', "---\n- id: 'a1'\n  action: []\n")
+    target = open_target('automations.yaml')
+    assert target['splice'] is None
+    assert 'gezieltes Ersetzen nicht möglich' in caplog.text
+    assert target['document'][0]['id'] == 'a1'
+
+
+def test_failed_segment_check_rewrites_whole_file(monkeypatch, caplog):
+    write_config('automations.yaml', AUTOMATIONS)
+    target = open_target('automations.yaml')
+    monkeypatch.setattr(main.YamlListSplice, 'render_entry', lambda self, *args: "- id: 'a1'\n")
+    target['splice'].set_entry('a1', {'id': 'a1', 'alias': 'Neu', 'trigger': [], 'action': []})
+    assert main.save_import_target(target)
+    assert 'gezieltes Ersetzen verworfen' in caplog.text
+    document = main.safe_yaml.load(read_config('automations.yaml'))
+    assert document[0] == {'id': 'a1', 'alias': 'Neu', 'trigger': [], 'action': []}
+    assert document[1]['id'] == 'a2'
+
+
+def test_failed_structure_check_rewrites_whole_file(caplog):
+    write_config('automations.yaml', AUTOMATIONS)
+    target = open_target('automations.yaml')
+    target['splice'].set_entry('a1', {'id': 'anders', 'alias': 'Neu', 'trigger': [], 'action': []})
+    assert main.save_import_target(target)
+    assert 'gezieltes Ersetzen verworfen' in caplog.text
+    document = main.safe_yaml.load(read_config('automations.yaml'))
+    assert [entry['id'] for entry in document] == ['anders', 'a2']
+
+
+def test_crlf_file_keeps_line_endings_and_id_quoting():
+    original = "- id: 'a1'\r\n  alias: A\r\n- id: 'a2'\r\n  alias: B\r\n"
+    path = write_config('automations.yaml', '')
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(original)
+    target = open_target('automations.yaml')
+    target['splice'].set_entry('a2', {'id': 'a2', 'alias': 'B2'})
+    target['splice'].set_entry('a3', {'id': 'a3', 'alias': 'C'}, append=True)
+    assert main.save_import_target(target)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+    assert text == "- id: 'a1'\r\n  alias: A\r\n- id: 'a2'\r\n  alias: B2\r\n- id: 'a3'\r\n  alias: C\r\n"
+
+
+def test_replaced_entry_keeps_double_quoted_id():
+    write_config('automations.yaml', '- id: "a1"\n  alias: A\n- alias: B\n  id: "a2"\n')
+    target = open_target('automations.yaml')
+    target['splice'].set_entry('a2', {'alias': 'B2', 'id': 'a2'})
+    assert main.save_import_target(target)
+    assert read_config('automations.yaml') == '- id: "a1"\n  alias: A\n- alias: B2\n  id: "a2"\n'